@@ -73,10 +73,13 @@ if [ ! -f "$BACKEND_VENV/bin/activate" ]; then
   echo "Virtualenv not found. Creating $BACKEND_VENV..."
   python3 -m venv "$BACKEND_VENV"
   "$BACKEND_VENV/bin/python" -m pip install --upgrade pip
-  echo "Installing backend requirements..."
-  "$BACKEND_VENV/bin/pip" install -r "$BACKEND_DIR/requirements.txt"
 fi
 
+# Every run, not just on a new venv: the app imports new requirements (e.g.
+# prometheus-client) at startup, so an existing venv must pick them up too
+echo "Installing backend requirements..."
+"$BACKEND_VENV/bin/pip" install -q -r "$BACKEND_DIR/requirements.txt"
+
 if [ ! -x "$BACKEND_VENV/bin/gunicorn" ]; then
   echo "gunicorn not found in venv. Installing gunicorn..."
   "$BACKEND_VENV/bin/pip" install gunicorn
@@ -85,6 +88,7 @@ fi
 # If there are existing prod processes, stop them first
 echo "Checking for existing production processes..."
 stop_pidfile "$BACKEND_DIR/gunicorn.pid" "backend" || echo "Warning: backend stop returned non-zero"
+stop_pidfile "$BACKEND_DIR/dispatcher.pid" "notification dispatcher" || echo "Warning: dispatcher stop returned non-zero"
 stop_pidfile "$FRONTEND_DIR/preview.pid" "frontend" || echo "Warning: frontend stop returned non-zero"
 
 # Also kill any orphaned vite preview processes for this project
@@ -92,10 +96,35 @@ echo "Cleaning up any orphaned vite preview processes..."
 pkill -f "theSimulation/web.*vite preview" || true
 sleep 1
 
+# Production mode: no X-DB-Queries/X-DB-Time debugging headers
+export APP_ENV="${APP_ENV:-production}"
+
+# Prometheus samples from every worker and the dispatcher, merged by /metrics;
+# stale files from the previous run would be counted again, so start empty
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-$PWD/$BACKEND_DIR/.prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# One worker, elected through a DB lease, rolls the day over right at EST
+# midnight (server/utils/rollover_scheduler.py)
+export ROLLOVER_SCHEDULER="${ROLLOVER_SCHEDULER:-1}"
+
+# Workers boot without touching the database (server/__init__.py); create or
+# migrate the schema and roll the day over once, here, instead
+export APP_INIT_DB="${APP_INIT_DB:-0}"
+echo "Applying schema migrations"
+"$BACKEND_VENV/bin/python" "$BACKEND_DIR/scripts/migrate.py"
+"$BACKEND_VENV/bin/python" "$BACKEND_DIR/scripts/tick_day.py" || echo "Warning: day tick returned non-zero"
+
 echo "Starting backend with gunicorn on 0.0.0.0:$PORT (workers=$WORKERS)"
-nohup "$BACKEND_VENV/bin/gunicorn" -w "$WORKERS" -b "0.0.0.0:$PORT" --timeout 120 server.app:app --log-level info > "$LOG_DIR/backend.log" 2>&1 &
+nohup "$BACKEND_VENV/bin/gunicorn" -c "$BACKEND_DIR/gunicorn.conf.py" -w "$WORKERS" -b "0.0.0.0:$PORT" server.app:app > "$LOG_DIR/backend.log" 2>&1 &
 echo $! > "$BACKEND_DIR/gunicorn.pid"
 
+# Notification dispatcher drains the outbox so requests never wait on Nolofication
+echo "Starting notification dispatcher"
+nohup "$BACKEND_VENV/bin/python" "$BACKEND_DIR/scripts/dispatch_notifications.py" > "$LOG_DIR/dispatcher.log" 2>&1 &
+echo $! > "$BACKEND_DIR/dispatcher.pid"
+
 # Frontend: ensure dependencies, build, then preview
 if [ ! -d "$FRONTEND_DIR/node_modules" ]; then
   echo "Installing frontend dependencies (this may take a moment)..."
@@ -117,8 +146,9 @@ echo "---"
 echo "Production run started"
 echo "Backend: http://0.0.0.0:$PORT (PID $(cat $BACKEND_DIR/gunicorn.pid))"
 echo "Frontend: http://0.0.0.0:$WEB_PORT (PID $(cat $FRONTEND_DIR/preview.pid))"
-echo "Logs: $LOG_DIR/backend.log, $LOG_DIR/frontend.log"
+echo "Dispatcher: PID $(cat $BACKEND_DIR/dispatcher.pid)"
+echo "Logs: $LOG_DIR/backend.log, $LOG_DIR/frontend.log, $LOG_DIR/dispatcher.log"
 
-echo "To stop: kill \\$(cat $BACKEND_DIR/gunicorn.pid) \\$(cat $FRONTEND_DIR/preview.pid)"
+echo "To stop: kill \\$(cat $BACKEND_DIR/gunicorn.pid) \\$(cat $BACKEND_DIR/dispatcher.pid) \\$(cat $FRONTEND_DIR/preview.pid)"
 
 exit 0
@@ -1,12 +1,20 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
 
-from .db import db
+from .db import db, configure_sqlite
 
 
-def create_app():
+def create_app(init_db: Optional[bool] = None):
+    """
+    Build the Flask app. With init_db (default: APP_INIT_DB, on) it also
+    creates missing tables, runs migrations and makes sure today's day exists;
+    gunicorn workers and cron scripts turn it off so that building the app
+    touches neither the database nor the network, and leave that work to
+    scripts/migrate.py and scripts/tick_day.py.
+    """
     # Load .env from project root if present
     env_path_root = os.path.join(os.path.dirname(__file__), '..', '.env')
     env_path_cwd = os.path.join(os.getcwd(), '.env')
@@ -18,6 +26,8 @@ def create_app():
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret')
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL') or f"sqlite:///{os.path.join(os.path.dirname(__file__), 'simulation.db')}"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # production hides debugging headers such as X-DB-Queries
+    app.config['APP_ENV'] = os.getenv('APP_ENV', 'development')
     
     # CORS - allow production domain and localhost
     allowed_origins = [
@@ -28,6 +38,21 @@ def create_app():
     CORS(app, supports_credentials=True, origins=allowed_origins)
 
     db.init_app(app)
+    with app.app_context():
+        # WAL, busy timeout, cache/mmap sizes (see db.sqlite_pragmas)
+        configure_sqlite(db.engine)
+
+    # Per-request query counts and DB time (utils/query_stats.py)
+    from .utils import query_stats
+    query_stats.init_app(app)
+
+    # Prometheus /metrics, aggregated across gunicorn workers (utils/metrics.py)
+    from .utils import metrics
+    metrics.init_app(app)
+
+    # Telemetry and LLM usage rows are buffered and bulk-inserted
+    from .utils import telemetry
+    telemetry.init_app(app)
 
     # assign anon id for visitors
     import uuid
@@ -38,7 +63,7 @@ def create_app():
             session['anon_id'] = uuid.uuid4().hex[:16]
 
     # register blueprints
-    from .routes.api import api_bp, ensure_today
+    from .routes.api import api_bp
     from .routes.auth import auth_bp
     from .routes.admin import admin_bp
 
@@ -46,10 +71,21 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
 
-    with app.app_context():
-        db.create_all()
-        # ensure today's day exists
-        ensure_today()
+    if init_db is None:
+        init_db = os.getenv('APP_INIT_DB', '1').lower() in ('1', 'true', 'yes')
+    if init_db:
+        prepare_database(app)
 
     return app
 
+
+def prepare_database(app, rollover: bool = True):
+    """Create missing tables and apply migrations; with rollover, also ensure today's day exists"""
+    with app.app_context():
+        db.create_all()
+        # create_all never alters existing tables; versioned migrations do
+        from .migrations import migrate
+        migrate()
+        if rollover:
+            from .routes.api import ensure_today
+            ensure_today()
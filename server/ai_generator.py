@@ -5,7 +5,8 @@ from .models import WorldState, Event
 
 logger = logging.getLogger(__name__)
 
-def generate_daily_event(world_state: WorldState, day_number: int, recent_history: list = None):
+def generate_daily_event(world_state: WorldState, day_number: int, recent_history: list = None,
+                         caller: str = 'event', fallback: str = 'template'):
     """
     Generate a unique daily event based on the current world state and recent history.
     """
@@ -67,7 +68,7 @@ Guidelines for Deltas:
     """
     
     try:
-        response = generate_text(system_prompt, user_prompt, temperature=0.8)
+        response = generate_text(system_prompt, user_prompt, temperature=0.8, caller=caller, fallback=fallback)
         if not response:
             return None
             
@@ -83,7 +84,8 @@ Guidelines for Deltas:
         logger.error(f"Error parsing AI event generation: {e}")
         return None
 
-def generate_day_summary(day_id: int, event_headline: str, chosen_option: str, outcome_deltas: dict, disaster: str = None):
+def generate_day_summary(day_id: int, event_headline: str, chosen_option: str, outcome_deltas: dict, disaster: str = None,
+                         caller: str = 'summary', fallback: str = 'template'):
     """
     Generate a narrative summary of the day's results.
     """
@@ -107,9 +109,10 @@ Tone: Gritty, realistic, slightly hopeful or despairing depending on the outcome
     Write the journal entry.
     """
     
-    return generate_text(system_prompt, user_prompt, temperature=0.7)
+    return generate_text(system_prompt, user_prompt, temperature=0.7, caller=caller, fallback=fallback)
 
-def generate_community_chatter(event_headline: str, world_state: WorldState):
+def generate_community_chatter(event_headline: str, world_state: WorldState,
+                               caller: str = 'chatter', fallback: str = 'template'):
     """
     Generate a list of fake user comments reacting to the current situation.
     """
@@ -141,7 +144,7 @@ Output MUST be a valid JSON array of objects:
     """
     
     try:
-        response = generate_text(system_prompt, user_prompt, temperature=0.8)
+        response = generate_text(system_prompt, user_prompt, temperature=0.8, caller=caller, fallback=fallback)
         if not response:
             return []
             
@@ -1,12 +1,95 @@
 import os
+import logging
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
 
 # Initialized in app factory
 
 db = SQLAlchemy()
 
+logger = logging.getLogger(__name__)
+
+
+def upsert_insert(bind):
+    """The dialect's insert() (supports on_conflict_do_update) for `bind`"""
+    if bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
 
 def sqlite_uri():
     # DB file in server folder by default
     path = os.path.join(os.path.dirname(__file__), 'simulation.db')
     return f'sqlite:///{path}'
+
+
+def sqlite_pragmas() -> dict:
+    """
+    Per-connection SQLite settings, overridable through env vars.
+    WAL lets readers run alongside the (single) writer and makes commits an
+    append instead of a journal rewrite; NORMAL sync is durable across app
+    crashes and only loses the last commits on power loss.
+    Set SQLITE_TUNING=0 to connect with SQLite's defaults.
+    """
+    return {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB, so 64 MiB
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+        # Only takes effect on a database with no tables yet; existing ones are
+        # converted once with scripts/rollup_telemetry.py --enable-incremental-vacuum
+        'auto_vacuum': os.getenv('SQLITE_AUTO_VACUUM', 'INCREMENTAL'),
+    }
+
+
+def configure_sqlite(engine):
+    """Apply sqlite_pragmas() to every new connection of `engine` (no-op for other databases)"""
+    if engine.dialect.name != 'sqlite' or os.getenv('SQLITE_TUNING', '1') == '0':
+        return
+    if getattr(engine, '_pragmas_configured', False):
+        return
+
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # busy_timeout first, so switching to WAL waits out a concurrent writer
+            cursor.execute(f"PRAGMA busy_timeout = {pragmas['busy_timeout']}")
+            cursor.execute(f"PRAGMA auto_vacuum = {pragmas['auto_vacuum']}")
+            cursor.execute(f"PRAGMA journal_mode = {pragmas['journal_mode']}")
+            cursor.execute(f"PRAGMA synchronous = {pragmas['synchronous']}")
+            cursor.execute(f"PRAGMA cache_size = {pragmas['cache_size']}")
+            cursor.execute(f"PRAGMA mmap_size = {pragmas['mmap_size']}")
+            cursor.execute(f"PRAGMA temp_store = {pragmas['temp_store']}")
+        finally:
+            cursor.close()
+
+    engine._pragmas_configured = True
+    logger.debug(f"SQLite pragmas: {pragmas}")
+
+
+def sqlite_maintenance(checkpoint: str = 'PASSIVE', optimize: bool = True) -> dict:
+    """
+    Fold the WAL back into the database file and refresh planner statistics.
+    PASSIVE never blocks readers or writers; TRUNCATE also shrinks the WAL
+    file but waits for readers. Call it periodically from a long-lived process.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return {}
+
+    result = {}
+    with db.engine.connect() as conn:
+        if checkpoint:
+            busy, log_frames, checkpointed = conn.execute(text(f"PRAGMA wal_checkpoint({checkpoint})")).one()
+            result['checkpoint'] = {'busy': busy, 'log_frames': log_frames, 'checkpointed': checkpointed}
+        if optimize:
+            conn.execute(text("PRAGMA optimize"))
+            result['optimized'] = True
+        conn.commit()
+    return result
@@ -0,0 +1,31 @@
+"""
+Gunicorn settings for run_prod.sh.
+
+Workers write Prometheus samples to PROMETHEUS_MULTIPROC_DIR (see
+utils/metrics.py); when one exits, its live-process files are cleaned up so
+/metrics only merges what is left.
+
+With ROLLOVER_SCHEDULER=1 each worker also starts a rollover scheduler thread
+once it has loaded the app; the workers elect one leader through a DB lease
+(see utils/rollover_scheduler.py).
+"""
+import os
+
+timeout = 120
+loglevel = 'info'
+
+
+def post_worker_init(worker):
+    from server.utils import rollover_scheduler
+    rollover_scheduler.start(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    from server.utils import rollover_scheduler
+    rollover_scheduler.stop()
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
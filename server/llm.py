@@ -1,22 +1,57 @@
 import os
-import requests
-import json
+import time
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 # Using a cost-effective but capable model
-DEFAULT_MODEL = "nex-agi/deepseek-v3.1-nex-n1:free" 
+DEFAULT_MODEL = "nex-agi/deepseek-v3.1-nex-n1:free"
 
-def generate_text(system_prompt: str, user_prompt: str, model: str = DEFAULT_MODEL, temperature: float = 0.7) -> str:
+
+def record_llm_usage(caller: str, model: str, status: str, latency_ms: int = 0, usage: Optional[dict] = None,
+                     http_status: Optional[int] = None, fallback: Optional[str] = None):
+    """
+    Record one OpenRouter call in the llm_usage table.
+    Rows go through the buffered usage writer, so they are kept even if the
+    caller's transaction rolls back. Never raises.
+    """
+    try:
+        from datetime import datetime
+        from .utils.telemetry import llm_usage_writer
+
+        usage = usage or {}
+        llm_usage_writer.add({
+            'caller': caller,
+            'model': model,
+            'status': status,
+            'http_status': http_status,
+            'prompt_tokens': int(usage.get('prompt_tokens') or 0),
+            'completion_tokens': int(usage.get('completion_tokens') or 0),
+            'latency_ms': latency_ms,
+            'cost': usage.get('cost'),
+            'fallback': fallback if status != 'ok' else None,
+            'created_at': datetime.utcnow()
+        })
+    except Exception as e:
+        logger.debug(f"Failed to record LLM usage: {e}")
+
+
+def generate_text(system_prompt: str, user_prompt: str, model: str = DEFAULT_MODEL, temperature: float = 0.7,
+                  caller: str = 'unknown', fallback: Optional[str] = None) -> str:
     """
     Generate text using OpenRouter API.
     Returns the content of the response or None if failed.
+
+    `caller` identifies the generation path (event, summary, chatter, test-ai) and
+    `fallback` names what the caller uses when this returns None; both are
+    recorded in llm_usage together with token counts and latency.
     """
     if not OPENROUTER_API_KEY:
         logger.warning("OPENROUTER_API_KEY not set. Skipping AI generation.")
+        record_llm_usage(caller, model, 'skipped', fallback=fallback)
         return None
 
     headers = {
@@ -32,20 +67,51 @@ def generate_text(system_prompt: str, user_prompt: str, model: str = DEFAULT_MOD
             {"role": "user", "content": user_prompt}
         ],
         "temperature": temperature,
-        "max_tokens": 1000
+        "max_tokens": 1000,
+        # Ask OpenRouter to include cost in the usage block
+        "usage": {"include": True}
     }
 
+    # Imported here: requests is slow to import and workers don't need it to boot
+    import requests
+
+    started = time.perf_counter()
+    status = 'error'
+    http_status = None
+    usage = None
+
     try:
         response = requests.post(OPENROUTER_URL, headers=headers, json=payload, timeout=60)
+        http_status = response.status_code
         response.raise_for_status()
         data = response.json()
-        
+        usage = data.get('usage')
+
         if 'choices' in data and len(data['choices']) > 0:
+            status = 'ok'
             return data['choices'][0]['message']['content']
         else:
+            status = 'invalid_response'
             logger.error(f"Invalid response from OpenRouter: {data}")
             return None
-            
+
+    except requests.exceptions.Timeout as e:
+        status = 'timeout'
+        logger.error(f"Timeout calling OpenRouter: {e}")
+        return None
+    except requests.exceptions.HTTPError as e:
+        status = 'http_error'
+        logger.error(f"Error calling OpenRouter: {e}")
+        return None
     except Exception as e:
         logger.error(f"Error calling OpenRouter: {e}")
         return None
+    finally:
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        record_llm_usage(caller, model, status, latency_ms, usage, http_status, fallback)
+        if status != 'skipped':
+            try:
+                from .utils.metrics import openrouter_seconds
+                openrouter_seconds.labels(caller, status).observe(latency_ms / 1000)
+            except Exception as e:
+                logger.debug(f"Failed to record OpenRouter metrics: {e}")
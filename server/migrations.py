@@ -0,0 +1,240 @@
+"""
+Versioned schema migrations.
+
+`db.create_all()` creates missing tables but never alters existing ones, so
+columns and indexes added after a table was first created need a migration.
+Each migration has a version number and runs once per database; applied
+versions are recorded in the `schema_version` table. Migrations are written
+to be idempotent, so one that was applied by hand (the old one-off scripts
+in scripts/) is simply recorded.
+
+Run them with `python server/scripts/migrate.py`.
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from .db import db
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable
+
+
+def _columns(conn, table: str) -> set:
+    return {col['name'] for col in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there"""
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        logger.info(f"Added {table}.{column}")
+
+
+# (name, table, columns). Also declared on the models, so new databases get
+# them from create_all and this migration is a no-op there.
+HOT_PATH_INDEXES = [
+    ('ix_votes_user_id', 'votes', ['user_id']),
+    ('ix_telemetry_event_type_created_at', 'telemetry', ['event_type', 'created_at']),
+    ('ix_telemetry_user_id', 'telemetry', ['user_id']),
+    ('ix_community_messages_day_parent', 'community_messages', ['day_id', 'parent_id']),
+    ('ix_project_votes_day_user', 'project_votes', ['day_id', 'user_id']),
+]
+
+
+def _create_hot_path_indexes(conn):
+    """CREATE INDEX for each of HOT_PATH_INDEXES whose columns exist yet"""
+    for name, table, columns in HOT_PATH_INDEXES:
+        if not set(columns) <= _columns(conn, table):
+            # e.g. community_messages.parent_id on a database from before
+            # replies; _legacy_columns adds it and creates the index then
+            logger.info(f"Skipping {name} until {table} has {', '.join(columns)}")
+            continue
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+def _hot_path_indexes(conn):
+    _create_hot_path_indexes(conn)
+    if conn.dialect.name == 'sqlite':
+        # Give the planner statistics for the new indexes
+        conn.execute(text("ANALYZE"))
+
+
+def _legacy_columns(conn):
+    """Columns previously added by the one-off scripts in scripts/"""
+    _add_column(conn, 'users', 'email', 'VARCHAR(255)')                                   # add_email_column.py
+    _add_column(conn, 'world_states', 'population', 'INTEGER DEFAULT 20')                 # migrate_add_population.py
+    if 'updated_at' not in _columns(conn, 'votes'):                                       # add_vote_updated_at.py
+        conn.execute(text("ALTER TABLE votes ADD COLUMN updated_at TIMESTAMP"))
+        conn.execute(text("UPDATE votes SET updated_at = created_at"))
+    _add_column(conn, 'community_messages', 'parent_id',
+                'INTEGER REFERENCES community_messages(id)')                              # fix_schema.py
+    _add_column(conn, 'projects', 'hidden', 'BOOLEAN DEFAULT 0')                          # update_schema_projects.py
+    _add_column(conn, 'announcements', 'html_content', 'TEXT')                            # update_schema_announcements_v2.py
+    _add_column(conn, 'announcements', 'show_popup', 'BOOLEAN DEFAULT 1')
+    _add_column(conn, 'announcements', 'send_notification', 'BOOLEAN DEFAULT 1')
+    # Indexes migration 1 had to skip because their columns were missing
+    _create_hot_path_indexes(conn)
+
+
+def _vote_arrival_buckets(conn):
+    """Histogram rows for votes cast before vote_arrival_buckets existed"""
+    from .utils.vote_buckets import backfill_vote_buckets
+    backfill_vote_buckets(conn)
+
+
+# Case-insensitive prefix search for the admin user list. SQLite only uses an
+# index for `LIKE 'abc%'` when the index has NOCASE collation; Postgres needs
+# a lower() expression index with pattern ops.
+USER_SEARCH_COLUMNS = ['display_name', 'email']
+
+
+def _user_search_indexes(conn):
+    for column in USER_SEARCH_COLUMNS:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_prefix "
+                              f"ON users (lower({column}) text_pattern_ops)"))
+        else:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_{column}_nocase "
+                              f"ON users ({column} COLLATE NOCASE)"))
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text("ANALYZE users"))
+
+
+def _user_stat_counters(conn):
+    """Seed the incrementally maintained user statistics"""
+    from .utils.user_stats import rebuild_user_stats
+    rebuild_user_stats(conn)
+
+
+def _notification_retry_recipients(conn):
+    _add_column(conn, 'notification_sends', 'retry_recipients', 'JSON')
+
+
+def _broadcast_retry_recipients(conn):
+    _add_column(conn, 'broadcast_jobs', 'retry_recipients', 'JSON')
+
+
+def _superseded_outbox_rows(conn):
+    """
+    Per-vote 'cancel_vote_reminders' outbox rows from before
+    reconcile_vote_reminders took over; nothing handles that kind any more
+    """
+    conn.execute(text(
+        "UPDATE notification_outbox SET status = 'skipped', locked_until = NULL,"
+        " last_error = 'Superseded by reconcile_vote_reminders'"
+        " WHERE kind = 'cancel_vote_reminders' AND status IN ('pending', 'sending', 'failed')"
+    ))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'hot_path_indexes', _hot_path_indexes),
+    Migration(2, 'legacy_columns', _legacy_columns),
+    Migration(3, 'vote_arrival_buckets', _vote_arrival_buckets),
+    Migration(4, 'user_search_indexes', _user_search_indexes),
+    Migration(5, 'user_stat_counters', _user_stat_counters),
+    Migration(6, 'notification_retry_recipients', _notification_retry_recipients),
+    Migration(7, 'broadcast_retry_recipients', _broadcast_retry_recipients),
+    Migration(8, 'superseded_outbox_rows', _superseded_outbox_rows),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        " version INTEGER PRIMARY KEY,"
+        " name VARCHAR(100) NOT NULL,"
+        " applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_versions() -> set:
+    with db.engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+
+def current_version() -> int:
+    return max(applied_versions(), default=0)
+
+
+def pending_migrations() -> List[Migration]:
+    done = applied_versions()
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in done]
+
+
+def migrate(target: int = None) -> List[int]:
+    """
+    Apply pending migrations in order, each in its own transaction.
+    Safe to run from several processes at once: a migration another process
+    recorded first is skipped. Returns the versions applied here.
+    """
+    applied = []
+    for migration in pending_migrations():
+        if target is not None and migration.version > target:
+            break
+        try:
+            with db.engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                    {'v': migration.version, 'n': migration.name, 't': datetime.utcnow()}
+                )
+        except IntegrityError:
+            logger.info(f"Migration {migration.version} was applied by another process")
+            continue
+        logger.info(f"Applied migration {migration.version}: {migration.name}")
+        applied.append(migration.version)
+    return applied
+
+
+# Hot-path queries and the index each one must use. server/tests/test_migrations.py
+# and scripts/migrate.py --check (both run in CI) fail if EXPLAIN QUERY PLAN
+# shows a query no longer using its index.
+PLAN_CHECKS = [
+    ("admin user detail: votes by user",
+     "SELECT * FROM votes WHERE user_id = 1 ORDER BY created_at DESC LIMIT 50", 'ix_votes_user_id'),
+    ("telemetry by type over a time range",
+     "SELECT * FROM telemetry WHERE event_type = 'vote' AND created_at >= '2024-01-01'",
+     'ix_telemetry_event_type_created_at'),
+    ("admin user detail: telemetry by user",
+     "SELECT * FROM telemetry WHERE user_id = 1 ORDER BY created_at DESC LIMIT 20", 'ix_telemetry_user_id'),
+    ("community feed: top-level messages for recent days",
+     "SELECT * FROM community_messages WHERE day_id >= 1 AND parent_id IS NULL",
+     'ix_community_messages_day_parent'),
+    ("project vote lookup for a user and day",
+     "SELECT * FROM project_votes WHERE day_id = 1 AND user_id = 1", 'ix_project_votes_day_user'),
+    ("admin user search by display name prefix",
+     "SELECT * FROM users WHERE display_name LIKE 'ab%' ESCAPE '\\'", 'ix_users_display_name_nocase'),
+    ("admin user search by email prefix",
+     "SELECT * FROM users WHERE email LIKE 'ab%' ESCAPE '\\'", 'ix_users_email_nocase'),
+]
+
+
+def explain(sql: str) -> List[str]:
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def check_query_plans() -> List[dict]:
+    """Run PLAN_CHECKS (SQLite only). Each result says whether the expected index was used."""
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    results = []
+    for description, sql, index in PLAN_CHECKS:
+        plan = explain(sql)
+        results.append({
+            'query': description,
+            'index': index,
+            'ok': any(index in line for line in plan),
+            'plan': plan
+        })
+    return results
@@ -1,11 +1,13 @@
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import Integer, String, DateTime, Date, ForeignKey, UniqueConstraint, JSON, Boolean, Text
+from sqlalchemy import Integer, String, DateTime, Date, ForeignKey, UniqueConstraint, JSON, Boolean, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import db
 # Import project models to ensure they are registered with SQLAlchemy
 from .models_projects import Project, ActiveProject, CompletedProject, ProjectVote
 from .models_custom_events import CustomEvent
+from .models_metrics import LlmUsage, TelemetryDaily, TickOutcome, VoteArrivalBucket, UserStatCounter, RolloverTrace
+from .models_notifications import NotificationOutbox, NotificationSend, BroadcastJob
 
 
 class User(db.Model):
@@ -82,6 +84,7 @@ class Vote(db.Model):
     __table_args__ = (
         UniqueConstraint('day_id', 'user_id', name='uq_vote_user_per_day'),
         UniqueConstraint('day_id', 'anon_id', name='uq_vote_anon_per_day'),
+        Index('ix_votes_user_id', 'user_id'),
     )
 
 
@@ -93,6 +96,11 @@ class Telemetry(db.Model):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     user_id: Mapped[Optional[int]] = mapped_column(ForeignKey('users.id'), nullable=True)
 
+    __table_args__ = (
+        Index('ix_telemetry_event_type_created_at', 'event_type', 'created_at'),
+        Index('ix_telemetry_user_id', 'user_id'),
+    )
+
 
 class SimulationStatus(db.Model):
     """Tracks the global status of the simulation"""
@@ -105,6 +113,21 @@ class SimulationStatus(db.Model):
     end_reason: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
 
+class RolloverLease(db.Model):
+    """
+    Which process runs the day rollover (utils/rollover_scheduler.py). The
+    holder keeps the lease by pushing expires_at forward on every heartbeat;
+    anyone may take it over once it has expired.
+    """
+    __tablename__ = 'rollover_leases'
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128))  # host:pid
+    acquired_at: Mapped[datetime] = mapped_column(DateTime)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+
+
 class CommunityMessage(db.Model):
     __tablename__ = 'community_messages'
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -120,3 +143,7 @@ class CommunityMessage(db.Model):
     replies: Mapped[list['CommunityMessage']] = relationship('CommunityMessage', backref=db.backref('parent', remote_side=[id]))
 
     day: Mapped[Day] = relationship(back_populates='messages')
+
+    __table_args__ = (
+        Index('ix_community_messages_day_parent', 'day_id', 'parent_id'),
+    )
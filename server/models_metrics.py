@@ -0,0 +1,144 @@
+"""
+Operational metrics models.
+Compact tables for tracking how the backend itself behaves (LLM usage, etc.)
+so admins can aggregate them with SQL instead of scanning Telemetry JSON.
+"""
+from datetime import datetime, date
+from typing import Optional
+from sqlalchemy import Integer, String, Text, DateTime, Date, Float, Boolean, JSON, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from .db import db
+
+
+class LlmUsage(db.Model):
+    """One row per OpenRouter call made by llm.generate_text"""
+    __tablename__ = 'llm_usage'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    caller: Mapped[str] = mapped_column(String(32))  # event, summary, chatter, test-ai
+    model: Mapped[str] = mapped_column(String(128))
+    status: Mapped[str] = mapped_column(String(32))  # ok, skipped, timeout, http_error, invalid_response, error
+    http_status: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    latency_ms: Mapped[int] = mapped_column(Integer, default=0)
+    cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # OpenRouter credits, when reported
+    fallback: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)  # what the caller fell back to, if anything
+
+    __table_args__ = (
+        Index('ix_llm_usage_created_at', 'created_at'),
+    )
+
+
+class TelemetryDaily(db.Model):
+    """
+    Daily rollup of raw telemetry, built by utils/telemetry_rollups.py.
+    `key` splits an event type further: the chosen option for votes, the
+    new option for vote changes, the category for notifications.
+    """
+    __tablename__ = 'telemetry_daily'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    date: Mapped[date] = mapped_column(Date)  # UTC date of the raw events
+    event_type: Mapped[str] = mapped_column(String(64))
+    key: Mapped[str] = mapped_column(String(64), default='')
+    events: Mapped[int] = mapped_column(Integer, default=0)
+    unique_users: Mapped[int] = mapped_column(Integer, default=0)
+    sent: Mapped[int] = mapped_column(Integer, default=0)  # notifications: successful + scheduled recipients
+    failed: Mapped[int] = mapped_column(Integer, default=0)  # notifications: failed recipients
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('date', 'event_type', 'key', name='uq_telemetry_daily_date_type_key'),
+    )
+
+
+class TickOutcome(db.Model):
+    """One row per finalized day, rolled up from its auto_tick telemetry"""
+    __tablename__ = 'tick_outcomes'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day_id: Mapped[int] = mapped_column(Integer, unique=True)
+    date: Mapped[date] = mapped_column(Date)  # UTC date the tick ran
+    chosen: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    votes: Mapped[int] = mapped_column(Integer, default=0)
+    disaster: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    morale: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    supplies: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    threat: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    population: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class VoteArrivalBucket(db.Model):
+    """
+    Votes cast per day, time bucket and option, incremented in the vote's own
+    transaction (utils/vote_buckets.py) so the admin turnout timeline never
+    scans the votes table. Each vote updates one 'minute' and one 'hour' row.
+    """
+    __tablename__ = 'vote_arrival_buckets'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day_id: Mapped[int] = mapped_column(Integer)
+    resolution: Mapped[str] = mapped_column(String(8))  # minute, hour
+    bucket_start: Mapped[datetime] = mapped_column(DateTime)  # UTC
+    option: Mapped[str] = mapped_column(String(50))
+    votes: Mapped[int] = mapped_column(Integer, default=0)  # first votes cast in the bucket
+    changes: Mapped[int] = mapped_column(Integer, default=0)  # votes changed to this option in the bucket
+
+    __table_args__ = (
+        UniqueConstraint('day_id', 'resolution', 'bucket_start', 'option', name='uq_vote_arrival_bucket'),
+    )
+
+
+class UserStatCounter(db.Model):
+    """
+    Admin user statistics, kept up to date by utils/user_stats.py as users
+    sign up, vote for the first time, change admin status or are deleted.
+    Keys: total_users, admin_users, active_users, provider:<name>,
+    signups:<YYYY-MM-DD>.
+    """
+    __tablename__ = 'user_stat_counters'
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SlowQuery(db.Model):
+    """
+    Statements that ran longer than SLOW_QUERY_MS, with their SQLite query
+    plan (utils/slow_queries.py). Kept as a ring buffer of the newest
+    SLOW_QUERY_KEEP rows.
+    """
+    __tablename__ = 'slow_queries'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    duration_ms: Mapped[float] = mapped_column(Float)
+    statement: Mapped[str] = mapped_column(Text)
+    params: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # types only, never values
+    route: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)  # endpoint, or thread name outside requests
+    plan: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # EXPLAIN QUERY PLAN, one step per line
+    full_scan: Mapped[bool] = mapped_column(Boolean, default=False)  # plan scans a table without an index
+
+
+class RolloverTrace(db.Model):
+    """
+    Phase timings of one rollover step (utils/rollover_trace.py): 'finalize'
+    for finalize_day, 'create_day' for the new day in ensure_today. `spans`
+    is a list of {name, start_ms, duration_ms} relative to started_at.
+    """
+    __tablename__ = 'rollover_traces'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    kind: Mapped[str] = mapped_column(String(16))  # finalize, create_day
+    status: Mapped[str] = mapped_column(String(16))  # ok, skipped (already finalized), race (day created elsewhere)
+    started_at: Mapped[datetime] = mapped_column(DateTime)
+    total_ms: Mapped[float] = mapped_column(Float)
+    spans: Mapped[list] = mapped_column(JSON)
+
+    __table_args__ = (
+        Index('ix_rollover_traces_day_id', 'day_id'),
+    )
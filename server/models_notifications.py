@@ -0,0 +1,93 @@
+"""
+Notification delivery models.
+Notifications are written to an outbox in the same transaction as the change
+that triggers them, and a separate dispatcher process delivers them.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, String, DateTime, JSON, Text, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from .db import db
+
+
+class NotificationOutbox(db.Model):
+    """A pending notification job, drained by scripts/dispatch_notifications.py"""
+    __tablename__ = 'notification_outbox'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), unique=True)  # e.g. day_results:42
+    kind: Mapped[str] = mapped_column(String(50))  # day_results, vote_reminders, ...
+    payload: Mapped[dict] = mapped_column(JSON)
+    status: Mapped[str] = mapped_column(String(20), default='pending')  # pending, sending, sent, failed, skipped
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # claim expiry while sending
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_notification_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+
+class NotificationSend(db.Model):
+    """
+    Send log for per-day broadcasts. The unique (category, day_id) row is
+    claimed before sending, so repeated ticks or dispatchers cannot double-send.
+    """
+    __tablename__ = 'notification_sends'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    category: Mapped[str] = mapped_column(String(50))  # day_results, vote_reminders
+    day_id: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(20), default='sending')  # sending, sent, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    claimed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # After a partial failure, the provider ids still owed this send; the
+    # next attempt goes to them only
+    retry_recipients: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('category', 'day_id', name='uq_notification_send_category_day'),
+    )
+
+
+
+class BroadcastJob(db.Model):
+    """
+    A notification sent to every user, delivered in the background.
+    `cursor_user_id` is the last users.id whose chunk was sent, so a job
+    interrupted by a crash or redeploy resumes from there. Recipients of
+    batches that failed are kept in `retry_recipients` and sent again once
+    the cursor reaches the end.
+    """
+    __tablename__ = 'broadcast_jobs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    category: Mapped[str] = mapped_column(String(50))  # announcement
+    announcement_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    title: Mapped[str] = mapped_column(String(200))
+    message: Mapped[str] = mapped_column(Text)
+    html_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default='queued')  # queued, running, completed, failed
+    cursor_user_id: Mapped[int] = mapped_column(Integer, default=0)
+    total_recipients: Mapped[int] = mapped_column(Integer, default=0)
+    processed: Mapped[int] = mapped_column(Integer, default=0)
+    delivered: Mapped[int] = mapped_column(Integer, default=0)  # successful + scheduled
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    retry_recipients: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # provider ids still owed it
+    attempts: Mapped[int] = mapped_column(Integer, default=0)  # consecutive failed chunks
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_broadcast_jobs_status_next_attempt', 'status', 'next_attempt_at'),
+    )
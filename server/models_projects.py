@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey, JSON, Float
+from sqlalchemy import Integer, String, Boolean, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import db
 from datetime import datetime
@@ -63,3 +63,7 @@ class ProjectVote(db.Model):
     day_id: Mapped[int] = mapped_column(ForeignKey('days.id'))
     
     created_at: Mapped[datetime] = mapped_column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_project_votes_day_user', 'day_id', 'user_id'),
+    )
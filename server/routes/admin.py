@@ -1,8 +1,13 @@
 from flask import Blueprint, jsonify, session, request
 from ..utils.decorators import require_admin
-from ..routes.api import get_current, tally_for_day
-from ..models import WorldState, Vote, Telemetry, Event, CustomEvent, User
+from ..utils.broadcasts import create_broadcast_job, job_to_dict, resume_job
+from ..utils.telemetry import record_event, flush_all as flush_telemetry
+from ..utils.user_stats import admin_changed, user_deleted, read_user_stats, rebuild_user_stats
+from ..routes.api import get_current, tally_for_day, day_details
+from ..models import WorldState, Vote, Telemetry, CustomEvent, User
 from ..models_projects import Project, ActiveProject, CompletedProject, ProjectVote
+from ..models_metrics import TelemetryDaily, TickOutcome, VoteArrivalBucket, SlowQuery, RolloverTrace, LlmUsage
+from ..models_notifications import NotificationOutbox, NotificationSend
 from ..db import db
 from ..events import deltas_for_option, ALL_EVENTS
 from datetime import datetime
@@ -100,10 +105,19 @@ def reset_simulation_route():
         CompletedProject.query.delete()
         Vote.query.delete()
         Telemetry.query.delete()
+        TelemetryDaily.query.delete()
+        TickOutcome.query.delete()
+        VoteArrivalBucket.query.delete()
+        # Keyed by day id, and day ids restart after the reset
+        RolloverTrace.query.delete()
+        NotificationOutbox.query.delete()
+        NotificationSend.query.delete()
         CommunityMessage.query.delete()
         Event.query.delete()
         WorldState.query.delete()
         Day.query.delete()
+        # With every vote gone, nobody counts as active any more
+        rebuild_user_stats(db.session)
         
         # Reset Status
         status = SimulationStatus.query.first()
@@ -236,13 +250,13 @@ def test_ai_generation():
             })
 
     # 1. Generate Event
-    event_data = generate_daily_event(ws, day.id + 1, recent_history)
+    event_data = generate_daily_event(ws, day.id + 1, recent_history, caller='test-ai', fallback=None)
     
     if not event_data:
         return jsonify({'error': 'Failed to generate event'}), 500
         
     # 2. Generate Chatter (based on the new event)
-    chatter_data = generate_community_chatter(event_data['headline'], ws)
+    chatter_data = generate_community_chatter(event_data['headline'], ws, caller='test-ai', fallback=None)
     
     # 3. Generate Summary (simulating a random choice)
     # Pick the first option as the "choice" for the test
@@ -254,9 +268,14 @@ def test_ai_generation():
         day.id + 1, 
         event_data['headline'], 
         choice_label, 
-        deltas
+        deltas,
+        caller='test-ai',
+        fallback=None
     )
     
+    # Nothing generated here is saved (LLM usage rows are written by the
+    # buffered usage writer)
+    
     return jsonify({
         'ok': True,
         'event': event_data,
@@ -400,46 +419,71 @@ def update_project(project_id):
 @require_admin
 def api_metrics():
     """Get current day metrics for admin"""
+    from sqlalchemy import func
     day, _, ev = get_current()
-    votes = Vote.query.filter_by(day_id=day.id).all()
-    tally = {}
-    anon_set = set()
-    user_set = set()
-    for v in votes:
-        tally[v.option] = tally.get(v.option, 0) + 1
-        if v.anon_id:
-            anon_set.add(v.anon_id)
-        if v.user_id:
-            user_set.add(v.user_id)
+    total_votes, unique_anon, unique_users = db.session.query(
+        func.count(Vote.id),
+        func.count(func.distinct(Vote.anon_id)),
+        func.count(func.distinct(Vote.user_id))
+    ).filter(Vote.day_id == day.id).one()
     
     return jsonify({
+        'day_id': day.id,
         'est_date': day.est_date.isoformat(),
         'event': {
             'headline': ev.headline,
             'description': ev.description,
             'options': ev.options,
         },
-        'tally': tally,
-        'unique_anon_voters': len(anon_set),
-        'unique_user_voters': len(user_set),
-        'total_votes': len(votes),
+        'tally': tally_for_day(day.id),
+        'unique_anon_voters': unique_anon,
+        'unique_user_voters': unique_users,
+        'total_votes': total_votes,
     })
 
 
+@admin_bp.route('/metrics/timeline', methods=['GET'])
+@require_admin
+def api_metrics_timeline():
+    """Vote arrivals per minute or hour for a day (default: the current one)"""
+    from ..utils.vote_buckets import RESOLUTIONS, timeline
+    resolution = request.args.get('resolution', 'minute')
+    if resolution not in RESOLUTIONS:
+        return jsonify({'error': f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+    day_id = request.args.get('day_id', type=int)
+    if day_id is None:
+        day, _, _ = get_current()
+        day_id = day.id
+    return jsonify(timeline(day_id, resolution))
+
+
 @admin_bp.route('/history', methods=['GET'])
 @require_admin
 def api_history():
     """Get full history for admin"""
     from ..models import Day
     days = Day.query.order_by(Day.id.asc()).all()
+    states, events, tallies = day_details([d.id for d in days])
+    # Latest finalize / create_day trace per day, for the rollover waterfall.
+    # Processes that lost the rollover to another one ('skipped', 'race') did
+    # no work worth showing and would hide the winner's timeline
+    traces = {}
+    for t in (RolloverTrace.query
+              .filter(RolloverTrace.day_id.in_([d.id for d in days]))
+              .filter(RolloverTrace.status.notin_(['skipped', 'race']))
+              .order_by(RolloverTrace.id)):
+        traces.setdefault(t.day_id, {})[t.kind] = {
+            'kind': t.kind,
+            'status': t.status,
+            'started_at': t.started_at.isoformat(),
+            'total_ms': t.total_ms,
+            'spans': t.spans
+        }
     result = []
     for d in days:
-        ws = WorldState.query.filter_by(day_id=d.id).first()
-        ev = Event.query.filter_by(day_id=d.id).first()
-        votes = Vote.query.filter_by(day_id=d.id).all()
-        tally = {}
-        for v in votes:
-            tally[v.option] = tally.get(v.option, 0) + 1
+        ws = states.get(d.id)
+        ev = events.get(d.id)
+        tally = tallies.get(d.id, {})
             
         # Get option label
         chosen_label = d.chosen_option
@@ -468,6 +512,7 @@ def api_history():
                     'options': ev.options if ev else [],
                 },
             'tally': tally,
+            'rollover': list(traces.get(d.id, {}).values()),
         })
     return jsonify(result)
 
@@ -476,6 +521,8 @@ def api_history():
 @require_admin
 def api_telemetry():
     """Get telemetry logs for admin"""
+    # Include this worker's buffered events
+    flush_telemetry()
     logs = Telemetry.query.order_by(Telemetry.id.desc()).limit(100).all()
     return jsonify([
         {'event_type': l.event_type, 'payload': l.payload, 'created_at': l.created_at.isoformat()} 
@@ -483,6 +530,195 @@ def api_telemetry():
     ])
 
 
+@admin_bp.route('/db-stats', methods=['GET'])
+@require_admin
+def api_db_stats():
+    """SQL queries and DB time per endpoint, for the worker that serves this request"""
+    from ..utils.query_stats import route_stats, reset_route_stats
+    import os
+    stats = route_stats()
+    if request.args.get('reset'):
+        reset_route_stats()
+    return jsonify({'pid': os.getpid(), 'routes': stats})
+
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@require_admin
+def api_slow_queries():
+    """Recent statements slower than SLOW_QUERY_MS with their query plans, and a per-statement summary"""
+    from ..utils.slow_queries import slow_query_writer, SLOW_QUERY_MS, SLOW_QUERY_KEEP
+    from sqlalchemy import func
+
+    slow_query_writer.flush()
+    limit = min(max(request.args.get('limit', 100, type=int), 1), SLOW_QUERY_KEEP)
+    query = SlowQuery.query
+    if request.args.get('full_scan'):
+        query = query.filter(SlowQuery.full_scan.is_(True))
+    rows = query.order_by(SlowQuery.id.desc()).limit(limit).all()
+
+    summary = db.session.query(
+        SlowQuery.statement,
+        func.count(SlowQuery.id),
+        func.avg(SlowQuery.duration_ms),
+        func.max(SlowQuery.duration_ms),
+        func.max(SlowQuery.created_at),
+        func.max(SlowQuery.full_scan)
+    ).group_by(SlowQuery.statement).order_by(func.sum(SlowQuery.duration_ms).desc()).limit(50).all()
+
+    return jsonify({
+        'threshold_ms': SLOW_QUERY_MS,
+        'keep': SLOW_QUERY_KEEP,
+        'queries': [{
+            'id': r.id,
+            'created_at': r.created_at.isoformat(),
+            'duration_ms': r.duration_ms,
+            'statement': r.statement,
+            'params': r.params,
+            'route': r.route,
+            'plan': r.plan,
+            'full_scan': r.full_scan
+        } for r in rows],
+        'statements': [{
+            'statement': statement,
+            'count': count,
+            'avg_ms': round(avg_ms or 0, 2),
+            'max_ms': max_ms,
+            'last_seen': last_seen.isoformat() if last_seen else None,
+            'full_scan': bool(full_scan)
+        } for statement, count, avg_ms, max_ms, last_seen, full_scan in summary]
+    })
+
+
+@admin_bp.route('/telemetry/daily', methods=['GET'])
+@require_admin
+def api_telemetry_daily():
+    """
+    Daily telemetry rollups (votes, vote changes, notifications) and tick outcomes.
+    Read-only: the dispatcher refreshes today's rollup hourly, and `updated_at`
+    says when it last did.
+    """
+    from sqlalchemy import func
+    from datetime import timedelta
+    
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    today = datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+    updated_at = db.session.query(func.max(TelemetryDaily.updated_at)).scalar()
+    
+    rows = TelemetryDaily.query.filter(TelemetryDaily.date >= since).order_by(
+        TelemetryDaily.date.desc(), TelemetryDaily.event_type, TelemetryDaily.key
+    ).all()
+    daily = {}
+    for r in rows:
+        entry = daily.setdefault(r.date.isoformat(), {
+            'date': r.date.isoformat(), 'votes': 0, 'vote_changes': 0,
+            'notifications_sent': 0, 'notifications_failed': 0, 'events': {}
+        })
+        entry['events'][r.event_type] = entry['events'].get(r.event_type, 0) + r.events
+        if r.event_type == 'vote':
+            entry['votes'] += r.events
+        elif r.event_type == 'vote_changed':
+            entry['vote_changes'] += r.events
+        elif r.event_type == 'notification':
+            entry['notifications_sent'] += r.sent
+            entry['notifications_failed'] += r.failed
+    
+    ticks = TickOutcome.query.filter(TickOutcome.date >= since).order_by(TickOutcome.day_id.desc()).all()
+    return jsonify({
+        'days': days,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+        'daily': list(daily.values()),
+        'breakdown': [{
+            'date': r.date.isoformat(),
+            'event_type': r.event_type,
+            'key': r.key,
+            'events': r.events,
+            'unique_users': r.unique_users,
+            'sent': r.sent,
+            'failed': r.failed
+        } for r in rows],
+        'ticks': [{
+            'day_id': t.day_id,
+            'date': t.date.isoformat(),
+            'chosen': t.chosen,
+            'votes': t.votes,
+            'disaster': t.disaster,
+            'morale': t.morale,
+            'supplies': t.supplies,
+            'threat': t.threat,
+            'population': t.population
+        } for t in ticks]
+    })
+
+
+@admin_bp.route('/llm-usage', methods=['GET'])
+@require_admin
+def api_llm_usage():
+    """Daily rollups of LLM calls by caller and model"""
+    from sqlalchemy import func, case
+    from datetime import timedelta
+    
+    flush_telemetry()
+    days = min(max(request.args.get('days', 7, type=int), 1), 90)
+    since = datetime.utcnow() - timedelta(days=days)
+    
+    day_col = func.date(LlmUsage.created_at)
+    failed = case((LlmUsage.status != 'ok', 1), else_=0)
+    fell_back = case((LlmUsage.fallback.isnot(None), 1), else_=0)
+    
+    rows = db.session.query(
+        day_col.label('date'),
+        LlmUsage.caller,
+        LlmUsage.model,
+        func.count(LlmUsage.id),
+        func.sum(failed),
+        func.sum(fell_back),
+        func.sum(LlmUsage.prompt_tokens),
+        func.sum(LlmUsage.completion_tokens),
+        func.avg(LlmUsage.latency_ms),
+        func.max(LlmUsage.latency_ms),
+        func.sum(LlmUsage.cost)
+    ).filter(
+        LlmUsage.created_at >= since
+    ).group_by(day_col, LlmUsage.caller, LlmUsage.model).order_by(day_col.desc(), LlmUsage.caller).all()
+    
+    daily = []
+    by_caller = {}
+    for date, caller, model, calls, failures, fallbacks, prompt_tokens, completion_tokens, avg_latency, max_latency, cost in rows:
+        daily.append({
+            'date': date,
+            'caller': caller,
+            'model': model,
+            'calls': calls,
+            'failures': failures or 0,
+            'fallbacks': fallbacks or 0,
+            'prompt_tokens': prompt_tokens or 0,
+            'completion_tokens': completion_tokens or 0,
+            'avg_latency_ms': int(avg_latency or 0),
+            'max_latency_ms': max_latency or 0,
+            'cost': cost or 0
+        })
+        
+        totals = by_caller.setdefault(caller, {'caller': caller, 'calls': 0, 'latency_ms': 0, 'max_latency_ms': 0, 'tokens': 0, 'cost': 0})
+        totals['calls'] += calls
+        totals['latency_ms'] += int((avg_latency or 0) * calls)
+        totals['max_latency_ms'] = max(totals['max_latency_ms'], max_latency or 0)
+        totals['tokens'] += (prompt_tokens or 0) + (completion_tokens or 0)
+        totals['cost'] += cost or 0
+    
+    callers = []
+    for totals in by_caller.values():
+        totals['avg_latency_ms'] = int(totals.pop('latency_ms') / totals['calls']) if totals['calls'] else 0
+        callers.append(totals)
+    
+    return jsonify({
+        'days': days,
+        'daily': daily,
+        'slowest': sorted(callers, key=lambda c: c['avg_latency_ms'], reverse=True),
+        'most_expensive': sorted(callers, key=lambda c: (c['cost'], c['tokens']), reverse=True)
+    })
+
+
 # ====== EVENT MANAGEMENT ENDPOINTS ======
 
 @admin_bp.route('/events', methods=['GET'])
@@ -700,54 +936,90 @@ def toggle_event(event_db_id):
 @admin_bp.route('/users', methods=['GET'])
 @require_admin
 def list_users():
-    """List all users with pagination"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
-    # Get all users with pagination
-    pagination = User.query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    
-    users_list = []
-    for user in pagination.items:
-        # Get user's vote count
-        vote_count = Vote.query.filter_by(user_id=user.id).count()
-        
-        users_list.append({
-            'id': user.id,
-            'provider': user.provider,
-            'provider_user_id': user.provider_user_id,
-            'display_name': user.display_name,
-            'email': user.email,
-            'is_admin': user.is_admin,
-            'created_at': user.created_at.isoformat(),
-            'vote_count': vote_count
-        })
+    """
+    List users, newest first, with keyset pagination: pass the returned
+    `next_cursor` as `cursor` to get the next page. `q` filters by display
+    name or email prefix (case-insensitive, uses the prefix indexes).
+    """
+    from sqlalchemy import func, or_, select
+    from sqlalchemy.orm import aliased
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    cursor = request.args.get('cursor', type=int)
+    search = (request.args.get('q') or '').strip()
+    
+    filters = []
+    if search:
+        filters.append(or_(_prefix_match(User.display_name, search), _prefix_match(User.email, search)))
+    total = db.session.query(func.count(User.id)).filter(*filters).scalar()
+    
+    page_query = select(User).filter(*filters)
+    if cursor:
+        # `+ 0` keeps SQLite from walking the primary key instead of the
+        # prefix indexes when searching; without a search it's the same plan
+        page_query = page_query.filter((User.id + 0 if search else User.id) < cursor)
+    page = page_query.order_by(User.id.desc()).limit(per_page + 1).subquery()
+    page_user = aliased(User, page)
+    
+    # Vote counts for just this page, in the same query
+    counts = select(Vote.user_id, func.count(Vote.id).label('vote_count')).where(
+        Vote.user_id.in_(select(page.c.id))
+    ).group_by(Vote.user_id).subquery()
+    rows = db.session.execute(
+        select(page_user, func.coalesce(counts.c.vote_count, 0))
+        .outerjoin(counts, counts.c.user_id == page_user.id)
+        .order_by(page_user.id.desc())
+    ).all()
+    
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    users_list = [{
+        'id': user.id,
+        'provider': user.provider,
+        'provider_user_id': user.provider_user_id,
+        'display_name': user.display_name,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'created_at': user.created_at.isoformat(),
+        'vote_count': vote_count
+    } for user, vote_count in rows]
     
     return jsonify({
         'users': users_list,
-        'total': pagination.total,
-        'page': page,
+        'total': total,
         'per_page': per_page,
-        'pages': pagination.pages
+        'cursor': cursor,
+        'next_cursor': users_list[-1]['id'] if has_more else None,
+        'q': search
     })
 
 
+def _prefix_match(column, prefix: str):
+    """Case-insensitive `column LIKE 'prefix%'` written so the prefix index applies"""
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy import func
+        return func.lower(column).like(escaped.lower() + '%', escape='\\')
+    # SQLite's LIKE is already case-insensitive and matches the NOCASE index
+    return column.like(escaped + '%', escape='\\')
+
+
 @admin_bp.route('/users/<int:user_id>', methods=['GET'])
 @require_admin
 def get_user(user_id):
     """Get detailed user information"""
+    from ..models import Day
     user = User.query.get(user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    # Get user's voting history
+    # Get user's voting history, with the days loaded in one query
     votes = Vote.query.filter_by(user_id=user.id).order_by(Vote.created_at.desc()).limit(50).all()
+    vote_count = Vote.query.filter_by(user_id=user.id).count()
+    day_ids = {vote.day_id for vote in votes}
+    days = {day.id: day for day in Day.query.filter(Day.id.in_(day_ids)).all()} if day_ids else {}
     vote_history = []
     for vote in votes:
-        from ..models import Day
-        day = Day.query.get(vote.day_id)
+        day = days.get(vote.day_id)
         vote_history.append({
             'day_id': vote.day_id,
             'date': day.est_date.isoformat() if day else None,
@@ -771,7 +1043,7 @@ def get_user(user_id):
         'email': user.email,
         'is_admin': user.is_admin,
         'created_at': user.created_at.isoformat(),
-        'vote_count': len(votes),
+        'vote_count': vote_count,
         'vote_history': vote_history,
         'telemetry': telemetry_list
     })
@@ -791,19 +1063,20 @@ def toggle_admin(user_id):
         return jsonify({'error': 'Cannot modify your own admin status'}), 400
     
     user.is_admin = not user.is_admin
-    db.session.commit()
+    admin_changed(user.is_admin)
     
-    # Log this action
+    # Log this action (durable: committed together with the change)
     admin_user_id = session.get('user_id')
-    db.session.add(Telemetry(
-        event_type='admin_toggle',
-        payload={
+    record_event(
+        'admin_toggle',
+        {
             'target_user_id': user.id,
             'new_admin_status': user.is_admin,
             'display_name': user.display_name
         },
-        user_id=admin_user_id
-    ))
+        user_id=admin_user_id,
+        durable=True
+    )
     db.session.commit()
     
     return jsonify({
@@ -829,18 +1102,20 @@ def delete_user(user_id):
     
     # Log this action before deletion
     admin_user_id = session.get('user_id')
-    db.session.add(Telemetry(
-        event_type='user_delete',
-        payload={
+    record_event(
+        'user_delete',
+        {
             'target_user_id': user.id,
             'display_name': user.display_name,
             'provider': user.provider
         },
-        user_id=admin_user_id
-    ))
+        user_id=admin_user_id,
+        durable=True
+    )
     
     # Delete the user (this will cascade to their votes and telemetry based on foreign key settings)
     # Or we could anonymize instead
+    user_deleted(user)
     db.session.delete(user)
     db.session.commit()
     
@@ -853,43 +1128,14 @@ def delete_user(user_id):
 @admin_bp.route('/users/stats', methods=['GET'])
 @require_admin
 def user_stats():
-    """Get overall user statistics"""
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(is_admin=True).count()
-    
-    # Provider breakdown
-    from sqlalchemy import func
-    provider_stats = db.session.query(
-        User.provider,
-        func.count(User.id).label('count')
-    ).group_by(User.provider).all()
-    
-    provider_breakdown = {provider: count for provider, count in provider_stats}
-    
-    # Recent signups (last 30 days)
-    from datetime import timedelta
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_signups = User.query.filter(User.created_at >= thirty_days_ago).count()
-    
-    # Active users (users who have voted)
-    active_users = db.session.query(Vote.user_id).distinct().count()
-    
-    return jsonify({
-        'total_users': total_users,
-        'admin_users': admin_users,
-        'regular_users': total_users - admin_users,
-        'provider_breakdown': provider_breakdown,
-        'recent_signups_30d': recent_signups,
-        'active_users': active_users,
-        'inactive_users': total_users - active_users
-    })
+    """Get overall user statistics (maintained incrementally, see utils/user_stats.py)"""
+    return jsonify(read_user_stats())
 
 
 @admin_bp.route('/announce', methods=['POST'])
 @require_admin
 def create_announcement():
-    from ..models import Announcement, User
-    from ..utils.nolofication import NoloficationService
+    from ..models import Announcement
     from ..utils.announcement_templates import TEMPLATES
     
     data = request.get_json()
@@ -922,29 +1168,63 @@ def create_announcement():
         created_by=session.get('user_id') # Use session user_id directly as g.user might not be set in all contexts
     )
     db.session.add(announcement)
-    db.session.commit()
+    db.session.flush()
     
-    # Broadcast via Nolofication
+    # Broadcast via Nolofication in the background; the dispatcher sends it.
+    # Queued in the announcement's transaction, so one never exists without the
+    # other. Without NOLOFICATION_API_KEY the job waits in the queue.
+    job = None
     if send_notification:
-        ns = NoloficationService()
-        if ns.is_configured():
-            # Get all users with provider_user_id
-            users = User.query.filter(User.provider_user_id.isnot(None)).all()
-            user_ids = [u.provider_user_id for u in users]
-            
-            # Send in batches of 50 to avoid hitting limits or timeouts
-            batch_size = 50
-            for i in range(0, len(user_ids), batch_size):
-                batch = user_ids[i:i + batch_size]
-                ns.send_bulk_notification(
-                    user_ids=batch,
-                    title=f"New Feature: {title}",
-                    message=content, # Plain text fallback
-                    notification_type='info',
-                    category='announcement',
-                    html_message=email_html
-                )
+        job = create_broadcast_job(
+            category='announcement',
+            title=f"New Feature: {title}",
+            message=content, # Plain text fallback
+            html_message=email_html,
+            announcement_id=announcement.id
+        )
+    db.session.commit()
         
-    return jsonify({'success': True, 'id': announcement.id})
+    return jsonify({
+        'success': True,
+        'id': announcement.id,
+        'broadcast_job': job_to_dict(job) if job else None
+    }), 202 if job else 200
+
+
+@admin_bp.route('/broadcasts', methods=['GET'])
+@require_admin
+def list_broadcasts():
+    from ..models_notifications import BroadcastJob
+    
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    jobs = BroadcastJob.query.order_by(BroadcastJob.id.desc()).limit(limit).all()
+    return jsonify({'jobs': [job_to_dict(j) for j in jobs]})
+
+
+@admin_bp.route('/broadcasts/<int:job_id>', methods=['GET'])
+@require_admin
+def get_broadcast(job_id):
+    from ..models_notifications import BroadcastJob
+    
+    job = db.session.get(BroadcastJob, job_id)
+    if not job:
+        return jsonify({'error': 'Broadcast job not found'}), 404
+    return jsonify(job_to_dict(job))
+
+
+@admin_bp.route('/broadcasts/<int:job_id>/resume', methods=['POST'])
+@require_admin
+def resume_broadcast(job_id):
+    from ..models_notifications import BroadcastJob
+    
+    job = db.session.get(BroadcastJob, job_id)
+    if not job:
+        return jsonify({'error': 'Broadcast job not found'}), 404
+    if job.status != 'failed':
+        return jsonify({'error': f'Only failed jobs can be resumed (job is {job.status})'}), 400
+    
+    resume_job(job)
+    db.session.commit()
+    return jsonify(job_to_dict(job))
 
 
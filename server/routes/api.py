@@ -2,12 +2,20 @@ from flask import Blueprint, jsonify, request, session
 from zoneinfo import ZoneInfo
 from datetime import datetime
 from ..db import db
-from ..models import Day, WorldState, Event, Vote, Telemetry, User
+from ..models import Day, WorldState, Event, Vote
 from ..models_projects import Project, ActiveProject, CompletedProject, ProjectVote
 from ..events import choose_template, find_template_by_options, EventTemplate, Option
 from ..ai_generator import generate_daily_event, generate_day_summary
+from ..utils.outbox import enqueue_notification
+from ..utils.telemetry import record_event
+from ..utils.vote_buckets import record_vote_arrival
+from ..utils.user_stats import has_voted_before, first_vote as count_first_vote
+from ..utils.metrics import votes_total
+from ..utils.rollover_trace import RolloverTrace
+from ..utils import rollover_scheduler
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import or_, func
+from sqlalchemy.orm import selectinload
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,6 +29,25 @@ def est_today():
 
 def finalize_day(day):
     """Apply the winning vote and update stats for a completed day"""
+    trace = RolloverTrace('finalize', day.id)
+    try:
+        return _finalize_day(day, trace)
+    except Exception:
+        _fail_trace(trace)
+        raise
+
+
+def _fail_trace(trace: RolloverTrace):
+    """Store the trace of a rollover that raised as 'error'"""
+    # Roll back first: this session may hold the write lock the trace insert needs
+    db.session.rollback()
+    if trace.kind == 'create_day':
+        # The new day's flushed id went with the rollback
+        trace.day_id = None
+    trace.finish('error')
+
+
+def _finalize_day(day, trace: RolloverTrace):
     from ..events import deltas_for_option, ALL_EVENTS
     from ..game_mechanics import (
         get_completed_project_buffs,
@@ -31,6 +58,7 @@ def finalize_day(day):
         calculate_population_change
     )
     
+    trace.phase('load')
     ws = WorldState.query.filter_by(day_id=day.id).first()
     ev = Event.query.filter_by(day_id=day.id).first()
     
@@ -67,10 +95,12 @@ def finalize_day(day):
     # === NEW GAME MECHANICS ===
     
     # Get buffs from completed projects
+    trace.phase('buffs')
     buffs = get_completed_project_buffs()
     logger.info(f"Active buffs: {buffs}")
     
     # Calculate passive decay
+    trace.phase('decay')
     current_pop = getattr(ws, 'population', 20)
     decay = calculate_passive_decay(ws.morale, ws.supplies, ws.threat, current_pop, buffs)
     logger.info(f"Passive decay: {decay}")
@@ -125,6 +155,7 @@ def finalize_day(day):
     new_population = max(0, current_pop + total_pop_change)
     
     # Apply production to active project
+    trace.phase('production')
     project_info = apply_production_to_project(ws, buffs)
     
     # Check if we should start a new project (if none active)
@@ -180,6 +211,7 @@ def finalize_day(day):
             db.session.add(sim_status)
     
     # Try AI summary
+    trace.phase('summary')
     try:
         summary = generate_day_summary(day.id, ev.headline, option_label, deltas, disaster['name'] if disaster else None)
         if summary:
@@ -199,6 +231,7 @@ def finalize_day(day):
     # midnight). We update the day row only if `chosen_option` is still NULL.
     from sqlalchemy import update
 
+    trace.phase('claim')
     res = db.session.execute(
         update(Day)
         .where(Day.id == day.id)
@@ -210,14 +243,16 @@ def finalize_day(day):
     if getattr(res, 'rowcount', 0) == 0:
         db.session.rollback()
         logger.info(f"Day {day.id} already finalized by another process; skipping notifications")
+        trace.finish('skipped')
         return
 
     # We successfully claimed finalization; persist world state and telemetry.
     day.chosen_option = top
     db.session.add(ws)
     db.session.add(day)
-    db.session.add(Telemetry(
-        event_type='auto_tick',
+    # Durable: written in the finalization transaction, not the telemetry buffer
+    record_event(
+        'auto_tick',
         payload={
             'day_id': day.id,
             'chosen': top,
@@ -241,8 +276,9 @@ def finalize_day(day):
             'project_info': project_info,
             'buffs': buffs
         },
-        user_id=None
-    ))
+        user_id=None,
+        durable=True
+    )
     
     # Generate reaction messages for the finalized day
     from ..utils.message_generator import generate_messages_for_day
@@ -259,6 +295,7 @@ def finalize_day(day):
     # So we can't add them to Day X+1 yet.
     # Let's add them to Day X as "late night" reactions.
     
+    trace.phase('messages')
     reaction_msgs = generate_messages_for_day(
         day.id, 
         ev.category if hasattr(ev, 'category') else 'general', 
@@ -278,21 +315,18 @@ def finalize_day(day):
             reply = CommunityMessage(**reply_data)
             db.session.add(reply)
 
+    # Queue the day results notification in the same transaction; the
+    # notification dispatcher delivers it so the rollover never waits on Nolofication
+    trace.phase('notify')
+    enqueue_notification('day_results', f"day_results:{day.id}", {
+        'day_id': day.id,
+        'chosen_option_label': option_label,
+        'new_state': {'morale': new_morale, 'supplies': new_supplies, 'threat': new_threat}
+    })
+
+    trace.phase('commit')
     db.session.commit()
-    
-    # Send notifications about the day results
-    # Nolofication will handle scheduling based on user preferences
-    from ..scripts.send_day_notifications import send_day_result_notifications
-    try:
-        send_day_result_notifications(
-            day.id,
-            option_label,
-            {'morale': new_morale, 'supplies': new_supplies, 'threat': new_threat}
-        )
-    except Exception as e:
-        # Don't fail the day finalization if notifications fail
-        import logging
-        logging.getLogger(__name__).error(f"Failed to send day result notifications: {e}")
+    trace.finish()
 
 
 def ensure_today():
@@ -308,11 +342,22 @@ def ensure_today():
     if day:
         return day
     
+    trace = RolloverTrace('create_day')
+    try:
+        return _create_day(today, trace)
+    except Exception:
+        _fail_trace(trace)
+        raise
+
+
+def _create_day(today, trace: RolloverTrace):
+    """The body of ensure_today() once it has found no day for `today`"""
     # Before creating new day, check if we need to finalize yesterday
     yesterday = Day.query.order_by(Day.id.desc()).first()
     if yesterday and yesterday.chosen_option is None:
         # Yesterday ended but wasn't ticked - auto-finalize it
-        finalize_day(yesterday)
+        with trace.span('finalize'):
+            finalize_day(yesterday)
     
     # Check again if today was created during finalization (race condition)
     day = Day.query.filter_by(est_date=today).first()
@@ -344,49 +389,50 @@ def ensure_today():
                 logger.info("Using forced Day 1 Genesis event")
                 break
     
-    # Try AI generation first if no template selected yet
-    if not template:
-        try:
-            # Fetch recent history (last 3 days)
-            recent_days = Day.query.order_by(Day.id.desc()).limit(3).all()
-            recent_history = []
-            for d in reversed(recent_days):
-                ev = Event.query.filter_by(day_id=d.id).first()
-                if ev:
-                    recent_history.append({
-                        'day': d.id,
-                        'headline': ev.headline,
-                        'choice': d.chosen_option or "None"
-                    })
-
-            # Create a temporary WorldState object for the generator
-            temp_ws = WorldState(morale=morale, supplies=supplies, threat=threat, last_event=last_event, population=population)
-            ai_event_data = generate_daily_event(temp_ws, day_count + 1, recent_history)
+    with trace.span('event'):
+        # Try AI generation first if no template selected yet
+        if not template:
+            try:
+                # Fetch recent history (last 3 days)
+                recent_days = Day.query.order_by(Day.id.desc()).limit(3).all()
+                recent_history = []
+                for d in reversed(recent_days):
+                    ev = Event.query.filter_by(day_id=d.id).first()
+                    if ev:
+                        recent_history.append({
+                            'day': d.id,
+                            'headline': ev.headline,
+                            'choice': d.chosen_option or "None"
+                        })
+
+                # Create a temporary WorldState object for the generator
+                temp_ws = WorldState(morale=morale, supplies=supplies, threat=threat, last_event=last_event, population=population)
+                ai_event_data = generate_daily_event(temp_ws, day_count + 1, recent_history)
             
-            if ai_event_data:
-                # Convert dict to EventTemplate-like object
-                options = [
-                    Option(
-                        key=opt['key'],
-                        label=opt['label'],
-                        deltas=opt['deltas'],
-                        description=opt.get('description')
+                if ai_event_data:
+                    # Convert dict to EventTemplate-like object
+                    options = [
+                        Option(
+                            key=opt['key'],
+                            label=opt['label'],
+                            deltas=opt['deltas'],
+                            description=opt.get('description')
+                        )
+                        for opt in ai_event_data['options']
+                    ]
+                    template = EventTemplate(
+                        id=f"ai_event_{day_count+1}",
+                        headline=ai_event_data['headline'],
+                        description=ai_event_data['description'],
+                        category=ai_event_data.get('category', 'general'),
+                        options=options
                     )
-                    for opt in ai_event_data['options']
-                ]
-                template = EventTemplate(
-                    id=f"ai_event_{day_count+1}",
-                    headline=ai_event_data['headline'],
-                    description=ai_event_data['description'],
-                    category=ai_event_data.get('category', 'general'),
-                    options=options
-                )
-                logger.info(f"Generated AI event for day {day_count+1}")
-        except Exception as e:
-            logger.error(f"AI event generation failed: {e}")
-
-    if not template:
-        template = choose_template(morale, supplies, threat, day_count + 1)
+                    logger.info(f"Generated AI event for day {day_count+1}")
+            except Exception as e:
+                logger.error(f"AI event generation failed: {e}")
+
+        if not template:
+            template = choose_template(morale, supplies, threat, day_count + 1)
 
     day = Day(est_date=today)
     db.session.add(day)
@@ -394,6 +440,7 @@ def ensure_today():
     # Wrap entire day creation in try/except to handle race conditions
     try:
         db.session.flush()
+        trace.day_id = day.id
         
         # Store option labels for display
         option_data = [{"key": o.key, "label": o.label, "description": o.description} for o in template.options]
@@ -409,35 +456,36 @@ def ensure_today():
         # Get context for messages
         # For a new day, we might not have a chosen option yet (it's the start of the day)
         # But we have the event headline
-        msgs_data = generate_messages_for_day(day.id, template.category, ws, event_headline=template.headline)
-        
-        for msg_data in msgs_data:
-            replies_data = msg_data.pop('replies', [])
-            msg = CommunityMessage(**msg_data)
-            db.session.add(msg)
-            db.session.flush() # Flush to get ID
+        with trace.span('messages'):
+            msgs_data = generate_messages_for_day(day.id, template.category, ws, event_headline=template.headline)
+        
+            for msg_data in msgs_data:
+                replies_data = msg_data.pop('replies', [])
+                msg = CommunityMessage(**msg_data)
+                db.session.add(msg)
+                db.session.flush() # Flush to get ID
             
-            for reply_data in replies_data:
-                reply_data['parent_id'] = msg.id
-                reply = CommunityMessage(**reply_data)
-                db.session.add(reply)
+                for reply_data in replies_data:
+                    reply_data['parent_id'] = msg.id
+                    reply = CommunityMessage(**reply_data)
+                    db.session.add(reply)
+        
+        # Queue the vote reminder for the new day; delivered by the notification dispatcher
+        with trace.span('notify'):
+            enqueue_notification('vote_reminders', f"vote_reminders:{day.id}", {'day_id': day.id})
             
-        db.session.commit()
-        
-        # Send vote reminder for the new day
-        # Nolofication will handle scheduling based on user preferences
-        from ..scripts.send_day_notifications import send_vote_reminder_for_new_day
-        try:
-            send_vote_reminder_for_new_day(day.id)
-        except Exception as e:
-            # Don't fail the day creation if notifications fail
-            logger.error(f"Failed to send vote reminders: {e}")
+        with trace.span('commit'):
+            db.session.commit()
+        trace.finish()
     
     except IntegrityError as e:
         # Another process created this day, fetch it and return
         logger.warning(f"Race condition creating day {today}: {e}")
         db.session.rollback()
         day = Day.query.filter_by(est_date=today).first()
+        # The flushed id was rolled back and may be the winner's id now
+        trace.day_id = day.id if day else None
+        trace.finish('race')
         if not day:
             # Still couldn't find it, something is wrong
             logger.error(f"Failed to create or fetch day {today}")
@@ -450,6 +498,10 @@ def ensure_today():
 def get_current():
     today = est_today()
     day = Day.query.filter_by(est_date=today).first()
+    if not day and rollover_scheduler.defer_rollover():
+        # The scheduler's leader is rolling over; keep serving the last
+        # committed day until the new one lands
+        day = Day.query.order_by(Day.id.desc()).first()
     if not day:
         day = ensure_today()
     ws = WorldState.query.filter_by(day_id=day.id).first()
@@ -462,6 +514,28 @@ def tally_for_day(day_id: int):
     return {option: count for option, count in results}
 
 
+def tallies_for_days(day_ids) -> dict:
+    """{day_id: tally} for several days in one grouped query"""
+    tallies = {}
+    if not day_ids:
+        return tallies
+    rows = db.session.query(Vote.day_id, Vote.option, func.count(Vote.id)).filter(
+        Vote.day_id.in_(day_ids)
+    ).group_by(Vote.day_id, Vote.option).all()
+    for day_id, option, count in rows:
+        tallies.setdefault(day_id, {})[option] = count
+    return tallies
+
+
+def day_details(day_ids):
+    """({day_id: WorldState}, {day_id: Event}, {day_id: tally}) for a page of days"""
+    if not day_ids:
+        return {}, {}, {}
+    states = {ws.day_id: ws for ws in WorldState.query.filter(WorldState.day_id.in_(day_ids))}
+    events = {ev.day_id: ev for ev in Event.query.filter(Event.day_id.in_(day_ids))}
+    return states, events, tallies_for_days(day_ids)
+
+
 @api_bp.route('/state')
 def api_state():
     day, ws, _ = get_current()
@@ -537,6 +611,8 @@ def api_vote():
         return jsonify({'error': 'Authentication required to vote'}), 401
     
     day, _, ev = get_current()
+    if day.est_date != est_today():
+        return jsonify({'error': 'The day is rolling over, try again in a moment'}), 409
     data = request.get_json(force=True)
     choice = data.get('choice')
     
@@ -552,50 +628,30 @@ def api_vote():
         old_choice = existing.option
         existing.option = choice
         existing.updated_at = datetime.utcnow()
-        db.session.add(Telemetry(
-            event_type='vote_changed', 
-            payload={'old_choice': old_choice, 'new_choice': choice}, 
-            user_id=user_id
-        ))
+        record_vote_arrival(day.id, choice, changed=True, at=existing.updated_at)
         db.session.commit()
+        record_event('vote_changed', {'old_choice': old_choice, 'new_choice': choice}, user_id=user_id)
+        votes_total.labels('changed').inc()
         tally = tally_for_day(day.id)
         return jsonify({'ok': True, 'choice': choice, 'tally': tally, 'changed': True})
     
+    first_vote = not has_voted_before(user_id)
     vote = Vote(day_id=day.id, option=choice, user_id=user_id, anon_id=None)
     db.session.add(vote)
-    db.session.add(Telemetry(event_type='vote', payload={'choice': choice}, user_id=user_id))
+    record_vote_arrival(day.id, choice)
+    if first_vote:
+        count_first_vote()
+    
+    # Pending vote reminders for voters are cancelled in bulk by the
+    # notification dispatcher (utils/vote_reminders.py), not here
     
     try:
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({'error': 'Already voted today'}), 409
-    
-    # Cancel any pending vote reminder notifications for this user
-    # Since they've now voted, they don't need to be reminded
-    try:
-        from ..utils.nolofication import nolofication
-        user = User.query.get(user_id)
-        
-        if user and user.provider_user_id and nolofication.is_configured():
-            # Get pending vote_reminders for this user
-            pending = nolofication.get_pending_notifications(
-                user_id=user.provider_user_id,
-                category='vote_reminders'
-            )
-            
-            # Cancel all pending vote reminders
-            cancelled_count = 0
-            for notif in pending.get('pending_notifications', []):
-                result = nolofication.cancel_pending_notification(notif['id'])
-                if result.get('message'):
-                    cancelled_count += 1
-            
-            if cancelled_count > 0:
-                logger.info(f"Cancelled {cancelled_count} pending vote reminder(s) for user {user.display_name}")
-    except Exception as e:
-        # Don't fail the vote if notification cancellation fails
-        logger.error(f"Failed to cancel pending notifications: {e}")
+    record_event('vote', {'choice': choice}, user_id=user_id)
+    votes_total.labels('new').inc()
     
     tally = tally_for_day(day.id)
     return jsonify({'ok': True, 'choice': choice, 'tally': tally})
@@ -660,16 +716,19 @@ def api_history():
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     days = pagination.items
 
+    # World states, events and tallies for the whole page in three queries
+    states, events, tallies = day_details([day.id for day in days])
+
     history: list = []
     for day in days:
-        ws = WorldState.query.filter_by(day_id=day.id).first()
-        ev = Event.query.filter_by(day_id=day.id).first()
+        ws = states.get(day.id)
+        ev = events.get(day.id)
         
         if not ws or not ev:
             continue
         
         # Get vote tally for this day
-        tally = tally_for_day(day.id)
+        tally = tallies.get(day.id, {})
         
         # Find the chosen option details
         chosen_option_label = day.chosen_option
@@ -714,10 +773,11 @@ def api_messages():
     
     # Get messages for the last 4 days (top-level only)
     # We want messages where day_id >= current_day_id - 3
-    from ..models import CommunityMessage, Day, Event
+    from ..models import CommunityMessage, Day
     
     start_day_id = max(1, day.id - 3)
-    messages = CommunityMessage.query.filter(
+    # Replies are loaded for all messages in one extra query, not one per message
+    messages = CommunityMessage.query.options(selectinload(CommunityMessage.replies)).filter(
         CommunityMessage.day_id >= start_day_id,
         CommunityMessage.parent_id == None
     ).order_by(CommunityMessage.created_at.desc()).all()
@@ -917,6 +977,8 @@ def api_project_vote():
         return jsonify({'error': 'Project currently under construction'}), 400
         
     day, _, _ = get_current()
+    if day.est_date != est_today():
+        return jsonify({'error': 'The day is rolling over, try again in a moment'}), 409
     
     # Check if user already voted for a project today
     existing = ProjectVote.query.filter_by(day_id=day.id, user_id=user_id).first()
@@ -1,10 +1,8 @@
-from flask import Blueprint, redirect, request, session, jsonify, current_app
+from flask import Blueprint, redirect, request, session, jsonify
 import os
 import uuid
-import requests
-from ..db import db
-from ..models import Telemetry
-from ..utils.auth import fetch_user_data, upsert_user_from_token
+from ..utils.telemetry import record_event
+from ..utils.auth import upsert_user_from_token
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -46,14 +44,14 @@ def auth_callback():
         'client_secret': os.getenv('KEYN_CLIENT_SECRET', ''),
         'redirect_uri': os.getenv('KEYN_REDIRECT_URI', 'https://localhost:5160/auth/callback'),
     }
+    import requests
     try:
         resp = requests.post(token_endpoint, data=data, timeout=10)
         if resp.status_code == 200:
             token = resp.json().get('access_token')
             session['access_token'] = token
             session['authenticated'] = True
-            db.session.add(Telemetry(event_type='auth_login', payload={'provider': 'keyn'}, user_id=None))
-            db.session.commit()
+            record_event('auth_login', {'provider': 'keyn'})
             # upsert user now or defer until /api/me
             upsert_user_from_token(token)
     except Exception:
@@ -67,6 +65,5 @@ def auth_callback():
 @auth_bp.route('/logout', methods=['POST'])
 def auth_logout():
     session.clear()
-    db.session.add(Telemetry(event_type='auth_logout', payload={}, user_id=None))
-    db.session.commit()
+    record_event('auth_logout')
     return jsonify({'ok': True})
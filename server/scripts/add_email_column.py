@@ -18,7 +18,7 @@ def migrate():
     from server import create_app
     from server.db import db
     
-    app = create_app()
+    app = create_app(init_db=False)
     
     with app.app_context():
         try:
@@ -21,7 +21,7 @@ def add_updated_at_column():
     from server import create_app
     from server.db import db
     
-    app = create_app()
+    app = create_app(init_db=False)
     
     with app.app_context():
         # Check if column exists
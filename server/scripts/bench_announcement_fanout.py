@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark announcement fan-out against the local Nolofication stand-in.
+
+Compares the old strategy (50-user batches sent one after another, a new
+connection per request) with NoloficationService.send_bulk_notification_batched
+(pooled keep-alive session, concurrent adaptive batches).
+
+Usage:
+  python server/scripts/bench_announcement_fanout.py --users 100000 --latency-ms 20
+  python server/scripts/bench_announcement_fanout.py --users 100000 --skip-sequential --json
+"""
+import sys
+import os
+import time
+import json
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import requests
+from server.scripts.nolofication_standin import start_standin
+
+
+def run_sequential(base_url: str, user_ids: list) -> float:
+    """The pre-pool behaviour of create_announcement"""
+    url = f"{base_url}/api/sites/thesimulation/notify"
+    headers = {'X-API-Key': 'bench', 'Content-Type': 'application/json'}
+    started = time.perf_counter()
+    for i in range(0, len(user_ids), 50):
+        requests.post(url, json={'user_ids': user_ids[i:i + 50], 'title': 't', 'message': 'm', 'category': 'announcement'},
+                      headers=headers, timeout=30)
+    return time.perf_counter() - started
+
+
+def run_batched(user_ids: list, workers: int, batch_size: int) -> tuple:
+    from server.utils.nolofication import NoloficationService
+    service = NoloficationService()
+    started = time.perf_counter()
+    result = service.send_bulk_notification_batched(
+        user_ids, title='t', message='m', category='announcement',
+        batch_size=batch_size, max_workers=workers
+    )
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark announcement fan-out')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--latency-ms', type=float, default=20, help='Simulated per-request service latency')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-batch', type=int, default=1000, help='Stand-in rejects larger batches with 413')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=100, help='Initial adaptive batch size')
+    parser.add_argument('--skip-sequential', action='store_true')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    server, state, url = start_standin(latency_ms=args.latency_ms, error_rate=args.error_rate, max_batch=args.max_batch)
+    os.environ['NOLOFICATION_URL'] = url
+    os.environ['NOLOFICATION_API_KEY'] = 'bench'
+
+    user_ids = [f"user-{i}" for i in range(args.users)]
+    report = {'users': args.users, 'latency_ms': args.latency_ms, 'workers': args.workers}
+
+    if not args.skip_sequential:
+        elapsed = run_sequential(url, user_ids)
+        report['sequential'] = {'seconds': round(elapsed, 2), 'users_per_second': int(args.users / elapsed)}
+
+    before = state.snapshot()
+    elapsed, result = run_batched(user_ids, args.workers, args.batch_size)
+    after = state.snapshot()
+    sizes = [b['size'] for b in result['batch_results']]
+    report['batched'] = {
+        'seconds': round(elapsed, 2),
+        'users_per_second': int(args.users / elapsed) if elapsed else None,
+        'batches': result['batches'],
+        'failed_batches': result['failed_batches'],
+        'delivered': after['recipients'] - before['recipients'],
+        'http_requests': after['requests'] - before['requests'],
+        'final_batch_size': sizes[-1] if sizes else 0,
+        'max_batch_size': max(sizes) if sizes else 0
+    }
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Fan-out to {args.users} users, {args.latency_ms}ms simulated latency")
+    if 'sequential' in report:
+        print(f"  sequential 50/batch : {report['sequential']['seconds']}s ({report['sequential']['users_per_second']} users/s)")
+    b = report['batched']
+    print(f"  pooled, {args.workers} workers : {b['seconds']}s ({b['users_per_second']} users/s), "
+          f"{b['batches']} batches (max size {b['max_batch_size']}), {b['failed_batches']} failed, "
+          f"{b['delivered']} delivered")
+
+
+if __name__ == '__main__':
+    main()
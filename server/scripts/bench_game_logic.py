@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for event selection, game mechanics and message generation.
+
+Inputs come from a seeded RNG and the module-level `random` is reseeded
+before every benchmark, so two runs on the same code do the same work.
+Catalog-dependent functions (choose_template, find_template_by_options,
+deltas_for_option without a template) run once per --sizes entry, with that
+many active custom events in a throwaway SQLite database on top of the
+built-in events.
+
+Each benchmark is timed as --repeat rounds of enough calls to take at least
+--min-time seconds. Baseline comparisons use the fastest round, which is the
+least affected by noise on shared CI machines.
+
+Usage:
+  python server/scripts/bench_game_logic.py
+  python server/scripts/bench_game_logic.py --sizes 0,100,1000,10000 --output bench.json
+  python server/scripts/bench_game_logic.py --baseline bench.json --max-slowdown 1.5   # exit 1 on regressions
+"""
+import sys
+import os
+import time
+import json
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Fixed world states (morale, supplies, threat, day) spanning crisis to stable
+STATES = 64
+CATEGORIES = ('general', 'crisis', 'opportunity', 'narrative')
+BUFFS = {
+    'morale_buff': 2, 'supplies_buff': 3, 'threat_reduction': 1,
+    'decay_reduction': 1, 'production_bonus': 2, 'population_capacity': 10
+}
+
+
+def _make_app():
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ.pop('NOLOFICATION_API_KEY', None)
+    import logging
+    logging.disable(logging.WARNING)
+    from server import create_app
+    return create_app(init_db=True)
+
+
+def load_custom_events(count: int, rng: random.Random):
+    """Replace the custom events with `count` active ones with random conditions"""
+    from server.db import db
+    from server.models import CustomEvent
+    CustomEvent.query.delete()
+    rows = []
+    for i in range(count):
+        low, high = sorted(rng.sample(range(0, 101), 2))
+        rows.append({
+            'event_id': f"bench_{i}",
+            'headline': f"Bench event {i}",
+            'description': 'Generated for bench_game_logic.py',
+            'category': rng.choice(CATEGORIES),
+            'weight': rng.randint(1, 3),
+            'min_morale': low if rng.random() < 0.3 else 0,
+            'max_morale': high if rng.random() < 0.3 else 100,
+            'min_supplies': 0, 'max_supplies': 100,
+            'min_threat': 0, 'max_threat': 100,
+            'requires_day': rng.randint(0, 30),
+            'options': [
+                {'key': f"bench_{i}_{k}", 'label': k, 'deltas': {'morale': rng.randint(-5, 5),
+                                                                'supplies': rng.randint(-5, 5),
+                                                                'threat': rng.randint(-5, 5)}}
+                for k in ('a', 'b', 'c')
+            ],
+            'is_active': True,
+        })
+    if rows:
+        db.session.execute(CustomEvent.__table__.insert(), rows)
+    db.session.commit()
+
+
+def timed(fn, inputs: list, seed: int, repeat: int, min_time: float) -> dict:
+    """Per-call timings of fn(*args) cycling through `inputs`"""
+    def run(number: int) -> float:
+        random.seed(seed)
+        n = len(inputs)
+        started = time.perf_counter()
+        for i in range(number):
+            fn(*inputs[i % n])
+        return time.perf_counter() - started
+
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    rounds = [run(number) / number for _ in range(repeat)]
+    return {
+        'median_us': round(statistics.median(rounds) * 1e6, 2),
+        'min_us': round(min(rounds) * 1e6, 2),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run_benchmarks(sizes: list, seed: int, repeat: int, min_time: float, only: str = None) -> dict:
+    from server.events import (
+        ALL_EVENTS, choose_template, find_template_by_options, deltas_for_option, get_all_available_events
+    )
+    from server.game_mechanics import (
+        calculate_passive_decay, check_cascade_failures, roll_random_disaster, calculate_population_change
+    )
+    from server.utils.message_generator import generate_messages_for_day
+    from server.models import WorldState
+
+    rng = random.Random(seed)
+    states = [(rng.randint(0, 100), rng.randint(0, 100), rng.randint(0, 100), rng.randint(1, 60))
+              for _ in range(STATES)]
+    results = {}
+
+    def bench(name: str, fn, inputs: list):
+        if only and only not in name:
+            return
+        results[name] = timed(fn, inputs, seed, repeat, min_time)
+
+    # Size-independent
+    bench('calculate_passive_decay', calculate_passive_decay,
+          [(m, s, t, rng.randint(5, 200), BUFFS if i % 2 else {}) for i, (m, s, t, _) in enumerate(states)])
+    bench('check_cascade_failures', check_cascade_failures, [(m, s, t) for m, s, t, _ in states])
+    bench('roll_random_disaster', roll_random_disaster, [(m, s, t) for m, s, t, _ in states])
+    bench('calculate_population_change', calculate_population_change,
+          [(m, s, t, rng.randint(5, 200)) for m, s, t, _ in states])
+    bench('deltas_for_option[template]', deltas_for_option,
+          [(o.key, e) for e in ALL_EVENTS for o in e.options][:STATES])
+    world_states = [WorldState(morale=m, supplies=s, threat=t, last_event='bench', population=20)
+                    for m, s, t, _ in states]
+    bench('generate_messages_for_day', generate_messages_for_day,
+          [(i + 1, CATEGORIES[i % len(CATEGORIES)], ws, f"Headline {i}") for i, ws in enumerate(world_states)])
+
+    # Catalog-dependent
+    for size in sizes:
+        load_custom_events(size, random.Random(seed))
+        catalog = get_all_available_events()
+        picks = random.Random(seed).sample(catalog, min(len(catalog), STATES - 1))
+        # Mostly hits across the catalog, plus one miss (a full scan)
+        option_sets = [([{'key': o.key} for o in e.options],) for e in picks] + [([{'key': 'missing'}],)]
+        option_keys = [(e.options[0].key, None) for e in picks] + [('missing', None)]
+        bench(f"choose_template[custom={size}]", choose_template, states)
+        bench(f"find_template_by_options[custom={size}]", find_template_by_options, option_sets)
+        bench(f"deltas_for_option[custom={size}]", deltas_for_option, option_keys)
+    return results
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float) -> list:
+    """[(name, baseline_us, current_us, ratio, regressed)] for benchmarks in both runs"""
+    rows = []
+    for name, current in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or not before['min_us']:
+            continue
+        ratio = current['min_us'] / before['min_us']
+        rows.append((name, before['min_us'], current['min_us'], round(ratio, 2), ratio > max_slowdown))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for event selection, mechanics and messages')
+    parser.add_argument('--sizes', default='0,100,1000,10000', help='Custom event catalog sizes (comma-separated)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per round')
+    parser.add_argument('--only', help='Run benchmarks whose name contains this')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--baseline', help='Results JSON from an earlier run to compare against')
+    parser.add_argument('--max-slowdown', type=float, default=1.5,
+                        help='With --baseline, fail if a benchmark is more than this many times slower')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    app = _make_app()
+    with app.app_context():
+        results = run_benchmarks(sizes, args.seed, args.repeat, args.min_time, args.only)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'sizes': sizes,
+            'repeat': args.repeat,
+            'min_time': args.min_time,
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'benchmark':<42} {'median us':>12} {'min us':>12} {'calls':>9}")
+        for name, r in results.items():
+            print(f"{name:<42} {r['median_us']:>12} {r['min_us']:>12} {r['number']:>9}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.max_slowdown)
+    regressions = [r for r in rows if r[4]]
+    print(f"\nAgainst {args.baseline} (fail above {args.max_slowdown}x):", file=sys.stderr)
+    for name, before, after, ratio, regressed in rows:
+        print(f"  {'SLOWER' if regressed else 'ok':<6} {name:<42} {before:>10} -> {after:>10} us ({ratio}x)", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Benchmark the "users who haven't voted today" query.
+
+Builds a throwaway SQLite database with --users users and --votes votes on
+one day, prints the query plan of the NOT EXISTS anti-join used by
+utils.recipients.iter_non_voter_ids(), and times streaming the whole
+non-voter column against the old approach (load all users and votes, filter
+in Python).
+
+Usage:
+  python server/scripts/bench_non_voters.py                      # 1M users, 500k votes
+  python server/scripts/bench_non_voters.py --users 200000 --votes 100000 --skip-python
+"""
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+def build_database(users: int, votes: int, seed: int):
+    from datetime import date
+    from server.db import db
+    from server.models import User, Day, Vote
+
+    db.create_all()
+    day = Day(est_date=date(2000, 1, 1))
+    db.session.add(day)
+    db.session.commit()
+
+    chunk = 50000
+    for start in range(0, users, chunk):
+        db.session.execute(User.__table__.insert(), [
+            {'provider': 'keyn', 'provider_user_id': f'keyn-{i}'}
+            for i in range(start + 1, min(users, start + chunk) + 1)
+        ])
+    voters = random.Random(seed).sample(range(1, users + 1), votes)
+    for start in range(0, votes, chunk):
+        db.session.execute(Vote.__table__.insert(), [
+            {'day_id': day.id, 'user_id': uid, 'option': 'a'}
+            for uid in voters[start:start + chunk]
+        ])
+    db.session.commit()
+    return day.id
+
+
+def explain(day_id: int) -> list:
+    from server.db import db
+    from server.utils.recipients import _non_voters
+    stmt = _non_voters(day_id)
+    compiled = stmt.compile(db.engine, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+def time_anti_join_in_database(day_id: int) -> tuple:
+    """The anti-join alone, counted inside SQLite"""
+    from sqlalchemy import select, func
+    from server.db import db
+    from server.utils.recipients import _non_voters
+    started = time.perf_counter()
+    count = db.session.execute(select(func.count()).select_from(_non_voters(day_id).subquery())).scalar()
+    return count, time.perf_counter() - started
+
+
+def time_anti_join(day_id: int) -> tuple:
+    """Streaming every non-voter id into Python, as the bulk sender does"""
+    from server.utils.recipients import iter_non_voter_ids
+    started = time.perf_counter()
+    first = None
+    count = 0
+    for _ in iter_non_voter_ids(day_id):
+        if first is None:
+            first = time.perf_counter() - started
+        count += 1
+    elapsed = time.perf_counter() - started
+
+    # Memory is measured on a second pass; tracemalloc slows the loop down
+    tracemalloc.start()
+    for _ in iter_non_voter_ids(day_id):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, first, peak
+
+
+def time_python_filter(day_id: int) -> tuple:
+    """The previous send_vote_reminders implementation"""
+    from server.models import User, Vote
+    tracemalloc.start()
+    started = time.perf_counter()
+    all_users = User.query.filter(User.provider_user_id.isnot(None)).all()
+    votes_today = Vote.query.filter_by(day_id=day_id).all()
+    voted_user_ids = {v.user_id for v in votes_today if v.user_id is not None}
+    ids = [u.provider_user_id for u in all_users if u.id not in voted_user_ids]
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(ids), elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the non-voter anti-join')
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--votes', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-python', action='store_true', help='Skip the old load-everything approach')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+    from flask import Flask
+    from server.db import db
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
+    db.init_app(app)
+
+    with app.app_context():
+        started = time.perf_counter()
+        day_id = build_database(args.users, args.votes, args.seed)
+        print(f"Built {args.users} users / {args.votes} votes in {time.perf_counter() - started:.1f}s")
+
+        print("Query plan:")
+        for line in explain(day_id):
+            print(f"  {line}")
+
+        count, elapsed = time_anti_join_in_database(day_id)
+        print(f"Anti-join (count in SQLite) : {count} non-voters in {elapsed:.3f}s")
+
+        count, elapsed, first, peak = time_anti_join(day_id)
+        print(f"Anti-join (streamed)        : {count} non-voters in {elapsed:.3f}s "
+              f"(first row after {first * 1000:.1f}ms, peak {peak / 1e6:.1f} MB)")
+
+        if not args.skip_python:
+            db.session.expunge_all()
+            count, elapsed, peak = time_python_filter(day_id)
+            print(f"Python set (old)            : {count} non-voters in {elapsed:.3f}s (peak {peak / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
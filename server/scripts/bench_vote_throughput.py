@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent vote throughput with and without the SQLite tuning layer.
+
+Each run uses a fresh database. --writers processes (like gunicorn workers)
+post votes through the real /api/vote handler while --readers processes poll
+/api/tally and /api/state. The run is repeated with SQLITE_TUNING=0 (SQLite
+defaults: rollback journal, FULL sync) and with the tuned pragmas from
+server/db.py.
+
+Usage:
+  python server/scripts/bench_vote_throughput.py
+  python server/scripts/bench_vote_throughput.py --writers 3 --readers 3 --seconds 10 --json
+"""
+import sys
+import os
+import time
+import json
+import argparse
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+def _make_app(db_path: str, tuned: bool):
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['SQLITE_TUNING'] = '1' if tuned else '0'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ.pop('NOLOFICATION_API_KEY', None)
+    import logging
+    logging.disable(logging.WARNING)
+    from server import create_app
+    return create_app(init_db=True)
+
+
+def seed(db_path: str, tuned: bool, users: int):
+    app = _make_app(db_path, tuned)
+    from server.db import db
+    from server.models import User
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'provider': 'keyn', 'provider_user_id': f'bench-{i}'} for i in range(users)
+        ])
+        db.session.commit()
+
+
+def writer(db_path: str, tuned: bool, user_ids: list, deadline: float, out):
+    app = _make_app(db_path, tuned)
+    client = app.test_client()
+    options = [o['key'] for o in client.get('/api/event').get_json()['options']]
+    latencies, errors, i = [], 0, 0
+    while time.time() < deadline:
+        user_id = user_ids[i % len(user_ids)]
+        with client.session_transaction() as s:
+            s['user_id'] = user_id
+        started = time.perf_counter()
+        try:
+            res = client.post('/api/vote', json={'choice': options[i % len(options)]})
+            ok = res.status_code == 200
+        except Exception:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors += 1
+        i += 1
+    out.put(('writer', latencies, errors))
+
+
+def reader(db_path: str, tuned: bool, deadline: float, out):
+    app = _make_app(db_path, tuned)
+    client = app.test_client()
+    latencies, errors, i = [], 0, 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            ok = client.get('/api/tally' if i % 2 else '/api/state').status_code == 200
+        except Exception:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors += 1
+        i += 1
+    out.put(('reader', latencies, errors))
+
+
+def _pct(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1)
+
+
+def run(tuned: bool, writers: int, readers: int, seconds: float, users: int) -> dict:
+    ctx = mp.get_context('spawn')
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed_proc = ctx.Process(target=seed, args=(db_path, tuned, users))
+    seed_proc.start()
+    seed_proc.join()
+
+    out = ctx.Queue()
+    # Give every process time to import and build its app before the clock starts
+    deadline = time.time() + 5 + seconds
+    procs = []
+    per_writer = users // max(writers, 1)
+    for w in range(writers):
+        ids = list(range(w * per_writer + 1, (w + 1) * per_writer + 1))
+        procs.append(ctx.Process(target=writer, args=(db_path, tuned, ids, deadline, out)))
+    for _ in range(readers):
+        procs.append(ctx.Process(target=reader, args=(db_path, tuned, deadline, out)))
+    for p in procs:
+        p.start()
+
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    votes = [l for kind, lats, _ in results if kind == 'writer' for l in lats]
+    reads = [l for kind, lats, _ in results if kind == 'reader' for l in lats]
+    return {
+        'tuned': tuned,
+        'votes': len(votes),
+        'votes_per_second': round(len(votes) / seconds, 1),
+        'vote_errors': sum(e for kind, _, e in results if kind == 'writer'),
+        'vote_p50_ms': _pct(votes, 0.50),
+        'vote_p95_ms': _pct(votes, 0.95),
+        'vote_p99_ms': _pct(votes, 0.99),
+        'reads_per_second': round(len(reads) / seconds, 1),
+        'read_errors': sum(e for kind, _, e in results if kind == 'reader'),
+        'read_p95_ms': _pct(reads, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent vote throughput')
+    parser.add_argument('--writers', type=int, default=3, help='Voting processes (gunicorn workers)')
+    parser.add_argument('--readers', type=int, default=2, help='Processes polling tally/state')
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--users', type=int, default=3000)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    report = [run(tuned, args.writers, args.readers, args.seconds, args.users) for tuned in (False, True)]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds}s")
+    for r in report:
+        label = 'tuned (WAL)   ' if r['tuned'] else 'defaults      '
+        print(f"  {label}: {r['votes_per_second']} votes/s (p50 {r['vote_p50_ms']}ms, p95 {r['vote_p95_ms']}ms, "
+              f"p99 {r['vote_p99_ms']}ms, {r['vote_errors']} errors), "
+              f"{r['reads_per_second']} reads/s (p95 {r['read_p95_ms']}ms, {r['read_errors']} errors)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Run every api/admin endpoint against a seeded throwaway database and
+check it stays within its query budget (server/utils/query_budget.py).
+
+Usage:
+  python server/scripts/check_query_budgets.py            # exit 1 on any failure
+  python server/scripts/check_query_budgets.py --verbose  # list each endpoint's statements
+"""
+import sys
+import os
+import argparse
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from server.utils.query_budget import BUDGETS, budget_env, measure, missing_budgets
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check per-endpoint SQL query budgets')
+    parser.add_argument('--verbose', action='store_true', help='Print the statements each endpoint ran')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = budget_env(directory)
+        failures = 0
+        for budget in BUDGETS:
+            label = f"{budget.method:6} {budget.endpoint}"
+            if budget.skip:
+                print(f"  skip  {label} ({budget.skip})")
+                continue
+            result = measure(env, budget)
+            ok = result['status'] < 500 and result['queries'] <= budget.max_queries
+            failures += not ok
+            print(f"  {'ok  ' if ok else 'FAIL'}  {label}: {result['queries']}/{budget.max_queries} queries, "
+                  f"HTTP {result['status']}")
+            if args.verbose or not ok:
+                for statement in result['statements']:
+                    print(f"          {statement.splitlines()[0][:140]}")
+
+        missing = missing_budgets(env['app'])
+        for endpoint in missing:
+            print(f"  FAIL  no budget for {endpoint}")
+        failures += len(missing)
+
+    print(f"{failures} failure(s)" if failures else "All endpoints within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
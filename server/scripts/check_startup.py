@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Measure what a gunicorn worker pays to boot the app and hold it to a budget.
+
+Each run is a fresh interpreter that imports `server` and calls
+create_app(init_db=False) against a database path that doesn't exist yet.
+The run fails if either step goes over its time budget (median of --runs),
+if the app opens a database connection (SQLite would create the file), or if
+it opens a network connection.
+
+Usage:
+  python server/scripts/check_startup.py                 # exit 1 on any failure
+  python server/scripts/check_startup.py --importtime 15 # also list the slowest imports
+  python server/scripts/check_startup.py --json > startup.json
+"""
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+# Median milliseconds on a warm disk cache
+IMPORT_BUDGET_MS = 400
+CREATE_APP_BUDGET_MS = 250
+
+PROBE = r"""
+import json, os, socket, sys, time
+sys.path.insert(0, os.environ['STARTUP_ROOT'])
+
+network = []
+_connect = socket.socket.connect
+def _watch_connect(self, address):
+    network.append(repr(address))
+    return _connect(self, address)
+socket.socket.connect = _watch_connect
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+connections = []
+event.listen(Engine, 'connect', lambda dbapi_connection, record: connections.append(1))
+
+t0 = time.perf_counter()
+import server
+t1 = time.perf_counter()
+app = server.create_app(init_db=False)
+t2 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'db_connections': len(connections),
+    'network': network,
+}))
+"""
+
+
+def _env(db_path: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        'STARTUP_ROOT': ROOT,
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'PYTHONDONTWRITEBYTECODE': '1',
+    })
+    return env
+
+
+def probe(db_path: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', PROBE], env=_env(db_path), capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result['db_file_created'] = os.path.exists(db_path)
+    return result
+
+
+def slowest_imports(db_path: str, count: int) -> list:
+    """(cumulative ms, module) for the modules the probe imports and what they import, slowest first"""
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE], env=_env(db_path),
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Two levels deep: `server` and friends, and their direct imports
+        if len(name) - len(name.lstrip()) <= 3:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check app import and create_app() time against a budget')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (median is compared)')
+    parser.add_argument('--max-import-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--max-create-app-ms', type=float, default=CREATE_APP_BUDGET_MS)
+    parser.add_argument('--importtime', type=int, default=0, metavar='N', help='List the N slowest imports')
+    parser.add_argument('--json', action='store_true', help='Print a JSON report instead')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'startup.db')
+        # The first run warms the disk cache and isn't counted
+        probe(db_path)
+        runs = [probe(db_path) for _ in range(args.runs)]
+        imports = slowest_imports(db_path, args.importtime) if args.importtime else []
+
+    import_ms = statistics.median(r['import_ms'] for r in runs)
+    create_app_ms = statistics.median(r['create_app_ms'] for r in runs)
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import server took {import_ms:.0f} ms (budget {args.max_import_ms:.0f})")
+    if create_app_ms > args.max_create_app_ms:
+        failures.append(f"create_app() took {create_app_ms:.0f} ms (budget {args.max_create_app_ms:.0f})")
+    if any(r['db_connections'] or r['db_file_created'] for r in runs):
+        failures.append("create_app(init_db=False) connected to the database")
+    network = sorted({address for r in runs for address in r['network']})
+    if network:
+        failures.append(f"startup opened network connections: {', '.join(network)}")
+
+    if args.json:
+        print(json.dumps({
+            'import_ms': round(import_ms, 1),
+            'create_app_ms': round(create_app_ms, 1),
+            'budget': {'import_ms': args.max_import_ms, 'create_app_ms': args.max_create_app_ms},
+            'runs': runs,
+            'slowest_imports': [{'module': name, 'ms': round(ms, 1)} for ms, name in imports],
+            'failures': failures,
+        }, indent=2))
+        return 1 if failures else 0
+
+    print(f"  import server              {import_ms:7.1f} ms (budget {args.max_import_ms:.0f})")
+    print(f"  create_app(init_db=False)  {create_app_ms:7.1f} ms (budget {args.max_create_app_ms:.0f})")
+    if imports:
+        print("  slowest imports:")
+        for ms, name in imports:
+            print(f"    {ms:7.1f} ms  {name}")
+    for failure in failures:
+        print(f"  FAIL  {failure}")
+    print(f"{len(failures)} failure(s)" if failures else "Startup within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,11 +4,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from server import create_app
 from server.db import db
-from server.models import Day, Event, WorldState, CommunityMessage, Vote
+from server.utils.user_stats import rebuild_user_stats
+from server.models import Day, Event, WorldState, CommunityMessage, Vote, VoteArrivalBucket, RolloverTrace, NotificationOutbox, NotificationSend
 from server.models_projects import ProjectVote
 
 def delete_latest():
-    app = create_app()
+    app = create_app(init_db=False)
     with app.app_context():
         # Get latest day
         day = Day.query.order_by(Day.id.desc()).first()
@@ -23,10 +24,19 @@ def delete_latest():
         WorldState.query.filter_by(day_id=day.id).delete()
         CommunityMessage.query.filter_by(day_id=day.id).delete()
         Vote.query.filter_by(day_id=day.id).delete()
+        VoteArrivalBucket.query.filter_by(day_id=day.id).delete()
+        RolloverTrace.query.filter_by(day_id=day.id).delete()
+        # The next day created reuses this id, so its notifications must not look already sent
+        NotificationOutbox.query.filter(NotificationOutbox.idempotency_key.in_(
+            [f"day_results:{day.id}", f"vote_reminders:{day.id}"]
+        )).delete(synchronize_session=False)
+        NotificationSend.query.filter_by(day_id=day.id).delete()
         ProjectVote.query.filter_by(day_id=day.id).delete()
         
         # Delete day
         db.session.delete(day)
+        # Users whose only votes were on this day are no longer active
+        rebuild_user_stats(db.session)
         db.session.commit()
         print("Done.")
 
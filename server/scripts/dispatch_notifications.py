@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Drain the notification outbox.
+
+Rollovers and votes only write rows to `notification_outbox`; this process
+delivers them to Nolofication with retries and backoff. It also advances
+queued broadcast jobs (announcements) and periodically cancels pending vote
+reminders for users who have already voted, rolls telemetry up into daily
+aggregates (pruning raw rows past the retention window once a day), and runs
+SQLite maintenance (WAL checkpoint, PRAGMA optimize, incremental vacuum). Run
+it alongside the web workers (run_prod.sh starts it), or once from cron with
+--once.
+
+Usage:
+  python server/scripts/dispatch_notifications.py            # run forever
+  python server/scripts/dispatch_notifications.py --once     # drain and exit
+"""
+import sys
+import os
+import time
+import argparse
+import logging
+from datetime import timezone
+from dotenv import load_dotenv
+
+# Load environment variables before importing server modules
+env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env'))
+if os.path.exists(env_path):
+    load_dotenv(env_path)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from server import create_app
+from server.db import db, sqlite_maintenance
+from server.utils.outbox import dispatch_pending, prune_outbox
+from server.utils.broadcasts import process_broadcasts
+from server.utils.vote_reminders import reconcile_vote_reminders
+from server.utils.telemetry_rollups import rollup_telemetry, run_nightly, last_nightly_run
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRUNE_EVERY_SECONDS = 3600
+OPTIMIZE_EVERY_SECONDS = 3600
+ROLLUP_EVERY_SECONDS = 3600
+RETENTION_EVERY_SECONDS = 24 * 3600
+
+
+def run(interval: float, batch_size: int, once: bool, reconcile_interval: float, reconcile_workers: int,
+        broadcast_chunks: int, checkpoint_interval: float):
+    app = create_app(init_db=False)
+    last_prune = 0.0
+    last_reconcile = 0.0
+    last_checkpoint = time.time()
+    last_optimize = time.time()
+    last_rollup = 0.0
+    with app.app_context():
+        # Pick up the retention schedule where the last run (here or from cron) left it
+        last_run = last_nightly_run()
+        last_retention = last_run.replace(tzinfo=timezone.utc).timestamp() if last_run else 0.0
+        while True:
+            try:
+                stats = dispatch_pending(batch_size)
+                busy = stats['claimed'] == batch_size
+                if stats['claimed']:
+                    logger.info(f"Dispatched outbox batch: {stats}")
+
+                # Outbox items are small and time-sensitive, so broadcasts only
+                # get a bounded number of chunks per pass
+                job = process_broadcasts(max_chunks=broadcast_chunks)
+                if job:
+                    logger.info(f"Broadcast job {job['id']}: {job['status']}, {job['processed']}/{job['total_recipients']}")
+                    # Handed back unfinished (not backing off after an error)
+                    busy = busy or (job['status'] == 'queued' and not job['last_error'])
+
+                if time.time() - last_reconcile > reconcile_interval:
+                    reconcile_vote_reminders(max_workers=reconcile_workers)
+                    last_reconcile = time.time()
+
+                if time.time() - last_prune > PRUNE_EVERY_SECONDS:
+                    pruned = prune_outbox()
+                    if pruned:
+                        logger.info(f"Pruned {pruned} delivered outbox rows")
+                    last_prune = time.time()
+
+                if time.time() - last_retention > RETENTION_EVERY_SECONDS:
+                    run_nightly()
+                    last_retention = last_rollup = time.time()
+                elif time.time() - last_rollup > ROLLUP_EVERY_SECONDS:
+                    rollup_telemetry()
+                    last_rollup = time.time()
+
+                if time.time() - last_checkpoint > checkpoint_interval:
+                    optimize = time.time() - last_optimize > OPTIMIZE_EVERY_SECONDS
+                    result = sqlite_maintenance(optimize=optimize)
+                    if result.get('checkpoint', {}).get('busy'):
+                        logger.info(f"WAL checkpoint could not complete (busy): {result['checkpoint']}")
+                    last_checkpoint = time.time()
+                    if optimize:
+                        last_optimize = last_checkpoint
+            except Exception as e:
+                db.session.rollback()
+                logger.exception(f"Outbox dispatch failed: {e}")
+                busy = False
+            finally:
+                db.session.remove()
+
+            if busy:
+                # More work is probably waiting; go again straight away
+                continue
+            if once:
+                break
+            time.sleep(interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Deliver queued notifications')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty')
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--once', action='store_true', help='Drain due items and exit')
+    parser.add_argument('--reconcile-interval', type=float, default=300.0,
+                        help='Seconds between vote reminder reconciliation passes')
+    parser.add_argument('--reconcile-workers', type=int, default=8,
+                        help='Maximum concurrent reminder cancellations')
+    parser.add_argument('--broadcast-chunks', type=int, default=20,
+                        help='Broadcast chunks to send per pass before checking the outbox again')
+    parser.add_argument('--checkpoint-interval', type=float, default=300.0,
+                        help='Seconds between SQLite WAL checkpoints')
+    args = parser.parse_args()
+    run(args.interval, args.batch_size, args.once, args.reconcile_interval, args.reconcile_workers,
+        args.broadcast_chunks, args.checkpoint_interval)
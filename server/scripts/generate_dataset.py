@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Generate a large synthetic database that looks like years of operation.
+
+Fills a new SQLite file, through the app's own tables, with:
+
+- --days days ending today, each with its Event (from the built-in catalog),
+  WorldState (a random walk), a chosen option for every finalized day, and
+  community messages with replies from the message generator's templates
+- --users users signing up on an accelerating curve
+- votes from a --participation share of the users signed up so far, plus
+  --anon-share anonymous votes, arriving as a burst after midnight EST and
+  then by a daily curve peaking in the evening; some are changed later
+- project votes, completed and active projects
+- the telemetry those actions record (vote, vote_changed, auth_login,
+  auto_tick)
+
+then builds the derived tables the app keeps (user stat counters, vote
+arrival buckets, telemetry rollups and tick outcomes) with the app's own
+rebuild functions. Rows are bulk-inserted with explicit ids in chunks, and
+everything comes from one seeded RNG, so the same arguments on the same
+date give the same database.
+
+Point the tooling at the result: loadtest.py --dataset copies it for a run,
+and DATABASE_URL=sqlite:///<file> works for everything else.
+
+Usage:
+  python server/scripts/generate_dataset.py --output /tmp/big.db
+  python server/scripts/generate_dataset.py --output /tmp/huge.db --days 3000 --users 1000000 --participation 0.02
+"""
+import sys
+import os
+import time
+import random
+import argparse
+from datetime import date, datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+EST = ZoneInfo('America/New_York')
+CHUNK = 20000
+# Share of a day's votes in the post-midnight burst, and how fast it decays
+BURST_SHARE = 0.15
+BURST_MEAN_SECONDS = 600
+# Relative votes per local hour outside the burst: quiet overnight, evening peak
+HOURLY = (2, 1, 1, 1, 1, 2, 4, 6, 7, 7, 6, 6, 7, 6, 6, 6, 7, 9, 11, 13, 14, 12, 8, 4)
+CHANGE_SHARE = 0.05
+PROJECT_VOTE_SHARE = 0.25
+LOGIN_SHARE = 0.3
+
+
+def _make_app(db_path: str):
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ.pop('NOLOFICATION_API_KEY', None)
+    import logging
+    logging.disable(logging.WARNING)
+    from server import create_app
+    return create_app(init_db=True)
+
+
+def _midnight_utc(day: date) -> datetime:
+    """00:00 EST on `day` as naive UTC, like the app's utcnow() timestamps"""
+    return datetime.combine(day, dt_time.min, EST).astimezone(ZoneInfo('UTC')).replace(tzinfo=None)
+
+
+class BulkWriter:
+    """Per-table row buffers, inserted CHUNK rows at a time on one connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = {}
+        self.counts = {}
+        self.next_ids = {}
+
+    def next_id(self, table) -> int:
+        n = self.next_ids.get(table.name, 1)
+        self.next_ids[table.name] = n + 1
+        return n
+
+    def add(self, table, row: dict):
+        buf = self.rows.setdefault(table, [])
+        buf.append(row)
+        if len(buf) >= CHUNK:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for t in [table] if table is not None else list(self.rows):
+            buf = self.rows.get(t)
+            if buf:
+                self.conn.execute(t.insert(), buf)
+                self.counts[t.name] = self.counts.get(t.name, 0) + len(buf)
+                self.rows[t] = []
+
+
+def _arrival_offsets(rng: random.Random, n: int) -> list:
+    """Seconds after local midnight for n votes"""
+    hours = rng.choices(range(24), weights=HOURLY, k=n)
+    return sorted(
+        min(rng.expovariate(1 / BURST_MEAN_SECONDS), 86399) if rng.random() < BURST_SHARE
+        else hour * 3600 + rng.uniform(0, 3599)
+        for hour in hours
+    )
+
+
+def _walk(value: int, rng: random.Random, step: int, low: int = 0, high: int = 100) -> int:
+    return max(low, min(high, value + rng.randint(-step, step)))
+
+
+def _messages(rng: random.Random, day_id: int, category: str, ws, headline: str, label: str = None) -> list:
+    """
+    Template chatter the way utils/message_generator.py falls back to it
+    without an OpenRouter key, drawn from `rng` and without its LLM usage rows
+    """
+    from server.utils.message_generator import NAMES, TEMPLATES, CONTEXT_TEMPLATES, REPLY_TEMPLATES
+
+    context = category if category in TEMPLATES else 'general'
+    groups = TEMPLATES[context]
+    pool = list(groups.get('general', []))
+    for key, applies in (('high_threat', ws.threat > 70), ('low_supplies', ws.supplies < 30),
+                         ('low_morale', ws.morale < 30), ('high_supplies', ws.supplies > 70)):
+        if applies:
+            pool.extend(groups.get(key, []))
+    pool = pool or TEMPLATES['general']['general']
+    pool += [rng.choice(CONTEXT_TEMPLATES).format(option_label=label or 'the decision', event_headline=headline)
+             for _ in range(3)]
+    sentiment = 'negative' if context == 'crisis' or ws.morale < 40 else (
+        'positive' if context == 'opportunity' or ws.morale > 70 else 'neutral')
+
+    messages = []
+    for _ in range(rng.randint(3, 6)):
+        author = rng.choice(NAMES)
+        replies = []
+        if rng.random() < 0.4:
+            for _ in range(rng.randint(1, 2)):
+                reply_author = rng.choice([n for n in NAMES if n != author])
+                replies.append({
+                    'day_id': day_id, 'author_name': reply_author,
+                    'avatar_seed': f"{reply_author}_{rng.randint(0, 1000)}",
+                    'content': rng.choice(REPLY_TEMPLATES[rng.choice(list(REPLY_TEMPLATES))]), 'sentiment': 'neutral'
+                })
+        messages.append({
+            'day_id': day_id, 'author_name': author, 'avatar_seed': f"{author}_{rng.randint(0, 1000)}",
+            'content': rng.choice(pool)[:280], 'sentiment': sentiment, 'replies': replies
+        })
+    return messages
+
+
+def generate(app, args) -> dict:
+    from server.db import db
+    from server.models import (
+        User, Day, Event, WorldState, Vote, CommunityMessage, Telemetry, NotificationOutbox, RolloverTrace,
+        Project, ActiveProject, CompletedProject, ProjectVote
+    )
+    from server.events import ALL_EVENTS
+    from server.scripts.init_balanced_projects import PROJECTS
+
+    rng = random.Random(args.seed)
+    today = datetime.now(EST).date()
+    first = today - timedelta(days=args.days - 1)
+    first_utc = _midnight_utc(first)
+    span = (_midnight_utc(today + timedelta(days=1)) - first_utc).total_seconds()
+    tables = {m.__tablename__: m.__table__ for m in (
+        User, Day, Event, WorldState, Vote, CommunityMessage, Telemetry, Project, ActiveProject,
+        CompletedProject, ProjectVote
+    )}
+
+    with app.app_context():
+        # create_app() made today's day; start from empty app tables
+        for model in (CommunityMessage, Vote, ProjectVote, WorldState, Event, NotificationOutbox, RolloverTrace,
+                      Telemetry, ActiveProject, CompletedProject, Day, Project, User):
+            model.query.delete()
+        db.session.commit()
+
+        with db.engine.connect() as conn:
+            out = BulkWriter(conn)
+
+            # Users sign up on an accelerating curve: cumulative users grow with time^2
+            signups = [first_utc + timedelta(seconds=span * ((i + 1) / args.users) ** 0.5)
+                       for i in range(args.users)]
+            for i, created_at in enumerate(signups):
+                out.add(tables['users'], {
+                    'id': i + 1, 'provider': 'keyn', 'provider_user_id': f'synthetic-{i + 1}',
+                    'display_name': f'Survivor {i + 1}', 'email': None,
+                    'created_at': created_at, 'is_admin': i == 0
+                })
+            out.flush()
+            conn.commit()
+
+            for i, p in enumerate(PROJECTS):
+                out.add(tables['projects'], {
+                    'id': i + 1, 'name': p['name'], 'description': p['description'], 'cost': p['cost'],
+                    'buff_type': p['buff_type'], 'buff_value': p['buff_value'], 'icon': p['icon'],
+                    'required_project_id': None, 'is_active': True, 'hidden': False
+                })
+            # Projects complete at even intervals through the history; the next one is being built
+            completed_at = {i + 1: args.days * (i + 1) // (len(PROJECTS) + 1) for i in range(len(PROJECTS) - 1)}
+
+            morale, supplies, threat, population = 70, 80, 30, 20
+            last_event = 'Genesis'
+            joined = 0
+            started = time.perf_counter()
+            for n in range(args.days):
+                day_id = n + 1
+                day = first + timedelta(days=n)
+                midnight = _midnight_utc(day)
+                next_midnight = _midnight_utc(day + timedelta(days=1))
+                finalized = day < today
+
+                template = ALL_EVENTS[rng.randrange(len(ALL_EVENTS))]
+                keys = [o.key for o in template.options]
+                out.add(tables['events'], {
+                    'id': day_id, 'day_id': day_id, 'headline': template.headline, 'description': template.description,
+                    'options': [{'key': o.key, 'label': o.label, 'description': o.description} for o in template.options]
+                })
+                ws = WorldState(morale=morale, supplies=supplies, threat=threat)
+                out.add(tables['world_states'], {
+                    'id': day_id, 'day_id': day_id, 'morale': morale, 'supplies': supplies, 'threat': threat,
+                    'last_event': last_event[:200], 'population': population
+                })
+
+                # Votes from users signed up by the end of the day
+                while joined < args.users and signups[joined] < next_midnight:
+                    joined += 1
+                voters = rng.sample(range(1, joined + 1), min(joined, int(joined * args.participation * rng.uniform(0.7, 1.3))))
+                anon = int(len(voters) * args.anon_share / (1 - args.anon_share)) if args.anon_share < 1 else 0
+                ballots = voters + [None] * anon
+                rng.shuffle(ballots)
+                preference = [rng.random() + 0.1 for _ in keys]
+                tally = {}
+                for user_id, offset in zip(ballots, _arrival_offsets(rng, len(ballots))):
+                    created_at = midnight + timedelta(seconds=offset)
+                    option = rng.choices(keys, weights=preference)[0]
+                    updated_at = created_at
+                    if rng.random() < CHANGE_SHARE and len(keys) > 1:
+                        old = option
+                        option = rng.choice([k for k in keys if k != old])
+                        updated_at = min(created_at + timedelta(seconds=rng.expovariate(1 / 1800)),
+                                         next_midnight - timedelta(seconds=1))
+                        out.add(tables['telemetry'], {
+                            'id': out.next_id(tables['telemetry']), 'event_type': 'vote_changed',
+                            'payload': {'old_choice': old, 'new_choice': option},
+                            'created_at': updated_at, 'user_id': user_id
+                        })
+                    tally[option] = tally.get(option, 0) + 1
+                    out.add(tables['votes'], {
+                        'id': out.next_id(tables['votes']), 'day_id': day_id, 'user_id': user_id,
+                        'anon_id': None if user_id else f"{rng.getrandbits(64):016x}",
+                        'option': option, 'created_at': created_at, 'updated_at': updated_at
+                    })
+                    out.add(tables['telemetry'], {
+                        'id': out.next_id(tables['telemetry']), 'event_type': 'vote',
+                        'payload': {'choice': option}, 'created_at': created_at, 'user_id': user_id
+                    })
+                    if user_id and rng.random() < LOGIN_SHARE:
+                        out.add(tables['telemetry'], {
+                            'id': out.next_id(tables['telemetry']), 'event_type': 'auth_login',
+                            'payload': {'provider': 'keyn'},
+                            'created_at': created_at - timedelta(seconds=rng.uniform(5, 120)), 'user_id': None
+                        })
+
+                open_projects = [pid for pid in range(1, len(PROJECTS) + 1) if completed_at.get(pid, args.days) > n]
+                for user_id in voters[:int(len(voters) * PROJECT_VOTE_SHARE)]:
+                    out.add(tables['project_votes'], {
+                        'id': out.next_id(tables['project_votes']), 'user_id': user_id,
+                        'project_id': rng.choice(open_projects), 'day_id': day_id,
+                        'created_at': midnight + timedelta(seconds=rng.uniform(0, 86399))
+                    })
+
+                # The new day's messages, then the reactions written when it is finalized
+                batches = [(midnight, _messages(rng, day_id, template.category, ws, template.headline))]
+                chosen = None
+                if finalized:
+                    top = max(tally.values()) if tally else 0
+                    chosen = sorted(k for k, c in tally.items() if c == top)[0] if tally else keys[0]
+                    label = next(o.label for o in template.options if o.key == chosen)
+                    batches.append((next_midnight - timedelta(seconds=30),
+                                    _messages(rng, day_id, template.category, ws, template.headline, label)))
+                for at, msgs in batches:
+                    for msg in msgs:
+                        replies = msg.pop('replies', [])
+                        parent_id = out.next_id(tables['community_messages'])
+                        out.add(tables['community_messages'], dict(msg, id=parent_id, created_at=at, parent_id=None))
+                        for reply in replies:
+                            out.add(tables['community_messages'], dict(
+                                reply, id=out.next_id(tables['community_messages']),
+                                created_at=at + timedelta(seconds=rng.uniform(60, 7200)), parent_id=parent_id
+                            ))
+
+                out.add(tables['days'], {'id': day_id, 'est_date': day, 'created_at': midnight, 'chosen_option': chosen})
+                if finalized:
+                    morale, supplies, threat = _walk(morale, rng, 6), _walk(supplies, rng, 6), _walk(threat, rng, 5)
+                    population = _walk(population, rng, 3, 5, 500)
+                    last_event = template.headline
+                    out.add(tables['telemetry'], {
+                        'id': out.next_id(tables['telemetry']), 'event_type': 'auto_tick',
+                        'payload': {
+                            'day_id': day_id, 'chosen': chosen, 'tally': tally, 'disaster': None,
+                            'new_state': {'morale': morale, 'supplies': supplies, 'threat': threat,
+                                          'population': population}
+                        },
+                        'created_at': next_midnight, 'user_id': None
+                    })
+                for pid, done in completed_at.items():
+                    if done == n:
+                        out.add(tables['completed_projects'], {
+                            'id': out.next_id(tables['completed_projects']), 'project_id': pid, 'completed_at': next_midnight
+                        })
+
+                # Small transactions keep the WAL from growing to the size of the data
+                if day_id % 10 == 0:
+                    out.flush()
+                    conn.commit()
+                if day_id % 100 == 0 and not args.quiet:
+                    print(f"  day {day_id}/{args.days}: {out.counts.get('votes', 0):,} votes "
+                          f"({time.perf_counter() - started:.0f}s)", flush=True)
+
+            current = len(PROJECTS)
+            out.add(tables['active_projects'], {
+                'id': 1, 'project_id': current, 'progress': rng.randint(0, PROJECTS[current - 1]['cost'] - 1),
+                'started_at': first_utc + timedelta(seconds=span * 0.9)
+            })
+            out.flush()
+            conn.commit()
+            return dict(out.counts)
+
+
+def _checkpoint(engine):
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def build_derived(app, args) -> dict:
+    """The tables the app maintains incrementally, rebuilt from the generated rows"""
+    from server.db import db
+    from server.models import VoteArrivalBucket, TelemetryDaily, TickOutcome
+    from server.utils.user_stats import rebuild_user_stats
+    from server.utils.vote_buckets import backfill_vote_buckets
+    from server.utils.telemetry_rollups import rollup_telemetry, prune_telemetry
+
+    with app.app_context():
+        for model in (VoteArrivalBucket, TelemetryDaily, TickOutcome):
+            model.query.delete()
+        db.session.commit()
+        # Planner statistics, as the dispatcher's periodic PRAGMA optimize would
+        # have gathered; without them the rollups scan all of telemetry per date.
+        # Open connections keep their old plans, so reconnect afterwards.
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+        db.session.remove()
+        db.engine.dispose()
+        with db.engine.begin() as conn:
+            rebuild_user_stats(conn)
+            buckets = backfill_vote_buckets(conn)
+        _checkpoint(db.engine)
+        first = datetime.now(EST).date() - timedelta(days=args.days)
+        rollups = rollup_telemetry(since=first)
+        pruned = prune_telemetry() if args.prune_telemetry else 0
+        # One self-contained file, ready to copy
+        _checkpoint(db.engine)
+    return {'vote_arrival_buckets': buckets, 'telemetry_daily_rows': rollups['rows'], 'telemetry_pruned': pruned}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a large, deterministic synthetic database')
+    parser.add_argument('--output', required=True, help='SQLite file to create')
+    parser.add_argument('--force', action='store_true', help='Overwrite --output if it exists')
+    parser.add_argument('--days', type=int, default=1460, help='Days of history, ending today')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--participation', type=float, default=0.05,
+                        help='Share of signed-up users voting on a given day')
+    parser.add_argument('--anon-share', type=float, default=0.1, help='Share of votes cast without an account')
+    parser.add_argument('--prune-telemetry', action='store_true',
+                        help='Drop raw telemetry past the retention window, as the nightly job would')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args()
+
+    path = os.path.abspath(args.output)
+    if os.path.exists(path):
+        if not args.force:
+            parser.error(f"{path} exists (use --force to overwrite)")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    started = time.perf_counter()
+    app = _make_app(path)
+    counts = generate(app, args)
+    generated = time.perf_counter() - started
+    derived = build_derived(app, args)
+
+    print(f"Generated {path} in {generated:.0f}s, derived tables in {time.perf_counter() - started - generated:.0f}s")
+    for table, n in sorted(counts.items()):
+        print(f"  {table:<22} {n:>12,}")
+    for name, n in derived.items():
+        print(f"  {name:<22} {n:>12,}")
+    print(f"  {'file size':<22} {os.path.getsize(path) / 1e6:>10,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,7 @@ import os
 # Add parent directory to path to import server modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from server import create_app
+from server import create_app, prepare_database
 from server.db import db
 from server.models_projects import Project
 
@@ -140,7 +140,9 @@ PROJECTS = [
 
 def init_projects():
     """Initialize or update projects in database"""
-    app = create_app()
+    app = create_app(init_db=False)
+    # May run before the server has ever started, so make sure the tables exist
+    prepare_database(app, rollover=False)
     with app.app_context():
         print("Initializing balanced projects...")
         
@@ -5,7 +5,7 @@ from server.db import db
 from server.models_projects import Project, ActiveProject, CompletedProject, ProjectVote
 
 def init_projects():
-    app = create_app()
+    app = create_app(init_db=False)
     with app.app_context():
         # Create tables
         print("Creating project tables...")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Load-test the public API the way the web client uses it.
+
+Starts gunicorn against a throwaway SQLite database seeded with users and
+finalized history, then runs --clients simulated browser sessions, each
+signed in with its own session cookie:
+
+- on arrival, the Home page bootstrap: /api/state, /api/event, /api/me (twice:
+  header and page), /api/my-vote, /api/history page 1, /api/messages,
+  /api/projects, /api/tally and /api/announcement
+- /api/tally every 5s and /api/projects every 10s, like the open page
+- /api/history paging (pages 1..--history-pages) every 15s for a third of
+  the clients
+- a midnight-style burst: every client votes once at a random moment in
+  the --burst-seconds window starting at --burst-at, and a fifth of them
+  change their vote shortly after
+
+Reports throughput and p50/p95/p99 per endpoint. Use --json and keep the
+output to compare releases.
+
+Usage:
+  python server/scripts/loadtest.py
+  python server/scripts/loadtest.py --workers 3 --clients 200 --seconds 60 --json > before.json
+  python server/scripts/loadtest.py --dataset /tmp/big.db   # a copy of a generate_dataset.py database
+  python server/scripts/loadtest.py --base-url http://127.0.0.1:5060 --secret-key ...   # existing instance
+"""
+import sys
+import os
+import time
+import json
+import random
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import multiprocessing as mp
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+TALLY_EVERY = 5.0
+PROJECTS_EVERY = 10.0
+HISTORY_EVERY = 15.0
+HISTORY_PER_PAGE = 6  # what the Home page asks for
+
+
+def seed(db_path: str, users: int, days: int):
+    """Users and `days` finalized past days, then today"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ.pop('NOLOFICATION_API_KEY', None)
+    import logging
+    logging.disable(logging.WARNING)
+    from server import create_app
+    from server.db import db
+    from server.models import User, Day, Event, WorldState, CommunityMessage, NotificationOutbox
+    from server.routes.api import ensure_today
+    from server.utils.user_stats import rebuild_user_stats
+
+    app = create_app(init_db=True)
+    with app.app_context():
+        today = Day.query.first()
+        template = Event.query.filter_by(day_id=today.id).first()
+        options = template.options
+        # Recreate today after the history so day ids run in date order
+        CommunityMessage.query.delete()
+        WorldState.query.delete()
+        Event.query.delete()
+        Day.query.delete()
+        NotificationOutbox.query.delete()
+        db.session.execute(User.__table__.insert(), [
+            {'provider': 'keyn', 'provider_user_id': f'load-{i}', 'display_name': f'Load {i}'}
+            for i in range(users)
+        ])
+        db.session.execute(Day.__table__.insert(), [
+            {'id': n + 1, 'est_date': today.est_date - timedelta(days=days - n), 'chosen_option': options[n % len(options)]['key']}
+            for n in range(days)
+        ])
+        db.session.execute(Event.__table__.insert(), [
+            {'day_id': n + 1, 'headline': f'Seeded day {n + 1}', 'description': 'Load test history', 'options': options}
+            for n in range(days)
+        ])
+        db.session.execute(WorldState.__table__.insert(), [
+            {'day_id': n + 1, 'morale': 60, 'supplies': 60, 'threat': 30, 'last_event': 'Seeded', 'population': 20}
+            for n in range(days)
+        ])
+        rebuild_user_stats(db.session)
+        db.session.commit()
+        ensure_today()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, workers: int, secret_key: str) -> tuple:
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", SECRET_KEY=secret_key, APP_ENV='production')
+    for key in ('OPENROUTER_API_KEY', 'NOLOFICATION_API_KEY', 'PROMETHEUS_MULTIPROC_DIR'):
+        env.pop(key, None)
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'server', 'gunicorn.conf.py'),
+         '-w', str(workers), '-b', f"127.0.0.1:{port}", '--log-level', 'warning', 'server.app:app'],
+        cwd=ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/state", timeout=2).ok:
+                return proc, base_url
+        except requests.RequestException:
+            pass
+        if proc.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError('gunicorn did not come up within 30s')
+
+
+def session_cookie(secret_key: str, user_id: int) -> str:
+    """A Flask session cookie signed like the server's, logging in `user_id`"""
+    from flask import Flask
+    from flask.sessions import SecureCookieSessionInterface
+    app = Flask('loadtest')
+    app.secret_key = secret_key
+    return SecureCookieSessionInterface().get_signing_serializer(app).dumps({'user_id': user_id})
+
+
+class Client(threading.Thread):
+    """One browser tab on the Home page"""
+
+    def __init__(self, base_url: str, cookie: str, options: list, started: float, args, rng: random.Random):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.http = requests.Session()
+        self.http.cookies.set('session', cookie)
+        self.options = options
+        self.started = started
+        self.args = args
+        self.rng = rng
+        self.samples = []  # (endpoint, seconds, ok)
+
+    def get(self, path: str, label: str = None):
+        self._call('GET', path, label)
+
+    def _call(self, method: str, path: str, label: str = None, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            ok = self.http.request(method, self.base_url + path, timeout=30, **kwargs).status_code < 400
+        except requests.RequestException:
+            ok = False
+        self.samples.append((label or path.split('?')[0], time.perf_counter() - t0, ok))
+
+    def bootstrap(self):
+        for path in ('/api/state', '/api/event', '/api/me', '/api/me', '/api/my-vote',
+                     f"/api/history?page=1&per_page={HISTORY_PER_PAGE}", '/api/messages',
+                     '/api/projects', '/api/tally', '/api/announcement'):
+            self.get(path)
+
+    def run(self):
+        args, rng = self.args, self.rng
+        end = self.started + args.seconds
+        now = time.time()
+        # Clients arrive over the first poll interval so they don't poll in lockstep
+        arrive = self.started + rng.uniform(0, TALLY_EVERY)
+        time.sleep(max(0.0, arrive - now))
+        self.bootstrap()
+        now = time.time()
+        due = {
+            'tally': now + TALLY_EVERY,
+            'projects': now + PROJECTS_EVERY,
+            'history': now + rng.uniform(0, HISTORY_EVERY) if rng.random() < 1 / 3 else float('inf'),
+            'vote': self.started + args.burst_at + rng.uniform(0, args.burst_seconds),
+        }
+        change = rng.random() < 0.2
+        page = 1
+        while True:
+            task = min(due, key=due.get)
+            if due[task] >= end:
+                return
+            time.sleep(max(0.0, due[task] - time.time()))
+            if task == 'tally':
+                self.get('/api/tally')
+                due['tally'] += TALLY_EVERY
+            elif task == 'projects':
+                self.get('/api/projects')
+                due['projects'] += PROJECTS_EVERY
+            elif task == 'history':
+                page = page % args.history_pages + 1
+                self.get(f"/api/history?page={page}&per_page={HISTORY_PER_PAGE}")
+                due['history'] += HISTORY_EVERY
+            else:
+                self._call('POST', '/api/vote', json={'choice': rng.choice(self.options)})
+                # The client refreshes the tally right after voting
+                self.get('/api/tally')
+                due['vote'] = time.time() + rng.uniform(1, 5) if change else float('inf')
+                change = False
+
+
+def _pct(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 1)
+
+
+def summarize(samples: list, seconds: float) -> dict:
+    by_endpoint = {}
+    for endpoint, latency, ok in samples:
+        by_endpoint.setdefault(endpoint, []).append((latency, ok))
+    rows = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        latencies = [l for l, _ in values]
+        rows[endpoint] = {
+            'requests': len(values),
+            'rps': round(len(values) / seconds, 1),
+            'errors': sum(1 for _, ok in values if not ok),
+            'p50_ms': _pct(latencies, 0.50),
+            'p95_ms': _pct(latencies, 0.95),
+            'p99_ms': _pct(latencies, 0.99),
+        }
+    latencies = [l for _, l, _ in samples]
+    rows['TOTAL'] = {
+        'requests': len(samples),
+        'rps': round(len(samples) / seconds, 1),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'p50_ms': _pct(latencies, 0.50),
+        'p95_ms': _pct(latencies, 0.95),
+        'p99_ms': _pct(latencies, 0.99),
+    }
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the public API with simulated Home page clients')
+    parser.add_argument('--workers', type=int, default=3, help='gunicorn workers')
+    parser.add_argument('--clients', type=int, default=100, help='Simulated browser sessions (one user each)')
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--days', type=int, default=60, help='Finalized history days to seed')
+    parser.add_argument('--history-pages', type=int, default=5, help='History pages the paging clients cycle through')
+    parser.add_argument('--burst-at', type=float, default=None, help='Seconds into the run the vote burst starts (default: halfway)')
+    parser.add_argument('--burst-seconds', type=float, default=5.0, help='Length of the vote burst')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for client behaviour')
+    parser.add_argument('--dataset', help='Serve a copy of this database (e.g. from generate_dataset.py) instead of seeding')
+    parser.add_argument('--base-url', help='Test a running instance instead (its users 1..clients must exist)')
+    parser.add_argument('--secret-key', help="The instance's SECRET_KEY, to sign session cookies (with --base-url)")
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    if args.burst_at is None:
+        args.burst_at = args.seconds / 2
+
+    server = None
+    if args.base_url:
+        if not args.secret_key:
+            parser.error('--base-url needs --secret-key')
+        base_url, secret_key = args.base_url.rstrip('/'), args.secret_key
+    else:
+        secret_key = os.urandom(16).hex()
+        db_path = os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+        if args.dataset:
+            # The run votes, so never touch the original
+            shutil.copyfile(args.dataset, db_path)
+        else:
+            seeder = mp.get_context('spawn').Process(target=seed, args=(db_path, args.clients, args.days))
+            seeder.start()
+            seeder.join()
+            if seeder.exitcode != 0:
+                sys.exit('Seeding failed')
+        server, base_url = start_server(db_path, args.workers, secret_key)
+
+    try:
+        options = [o['key'] for o in requests.get(f"{base_url}/api/event", timeout=10).json()['options']]
+        rng = random.Random(args.seed)
+        started = time.time() + 1
+        clients = [
+            Client(base_url, session_cookie(secret_key, user_id), options, started, args, random.Random(rng.random()))
+            for user_id in range(1, args.clients + 1)
+        ]
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    samples = [s for c in clients for s in c.samples]
+    report = {
+        'config': {k: getattr(args, k) for k in ('workers', 'clients', 'seconds', 'days', 'dataset', 'history_pages',
+                                                 'burst_at', 'burst_seconds', 'seed')},
+        'endpoints': summarize(samples, args.seconds)
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.clients} clients, {args.workers} workers, {args.seconds}s "
+          f"(vote burst at {args.burst_at}s for {args.burst_seconds}s)")
+    print(f"  {'endpoint':<20} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, r in report['endpoints'].items():
+        print(f"  {endpoint:<20} {r['requests']:>9} {r['rps']:>8} {r['errors']:>7} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Create missing tables and apply versioned schema migrations (server/migrations.py).
+
+Run it before starting gunicorn with APP_INIT_DB=0, which leaves the schema
+alone at startup (run_prod.sh does both).
+
+Usage:
+  python server/scripts/migrate.py              # create tables, apply pending migrations
+  python server/scripts/migrate.py --status     # show applied / pending versions
+  python server/scripts/migrate.py --check      # verify hot-path queries use their indexes
+"""
+import sys
+import os
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables before importing server modules
+env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env'))
+if os.path.exists(env_path):
+    load_dotenv(env_path)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from server import create_app
+from server.db import db
+from server.migrations import MIGRATIONS, applied_versions, migrate, check_query_plans
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply schema migrations')
+    parser.add_argument('--status', action='store_true', help='List migrations and whether they are applied')
+    parser.add_argument('--check', action='store_true', help='Check EXPLAIN QUERY PLAN for the hot-path indexes')
+    parser.add_argument('--target', type=int, default=None, help='Stop after this version')
+    args = parser.parse_args()
+
+    app = create_app(init_db=False)
+    with app.app_context():
+        if args.status:
+            done = applied_versions()
+            for m in sorted(MIGRATIONS, key=lambda m: m.version):
+                print(f"  {'✓' if m.version in done else ' '} {m.version:>3}  {m.name}")
+            return 0
+
+        if args.check:
+            failures = 0
+            for result in check_query_plans():
+                mark = '✓' if result['ok'] else '✗'
+                print(f"{mark} {result['query']} -> {result['index']}")
+                if not result['ok']:
+                    failures += 1
+                    for line in result['plan']:
+                        print(f"      {line}")
+            return 1 if failures else 0
+
+        db.create_all()
+        applied = migrate(args.target)
+        print(f"Applied {len(applied)} migration(s): {applied}" if applied else "Schema is up to date")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,7 +14,7 @@ from server.db import db
 
 def migrate_add_population():
     """Add population column to world_states"""
-    app = create_app()
+    app = create_app(init_db=False)
     with app.app_context():
         try:
             # Check if column already exists
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-in for the Nolofication API.
+
+Implements the endpoints NoloficationService uses (notify, list pending,
+cancel pending) in memory, with configurable latency, error rate and
+maximum batch size, so notification fan-out can be benchmarked and tested
+without touching the real service.
+
+Usage:
+  python server/scripts/nolofication_standin.py --port 5099 --latency-ms 40
+  NOLOFICATION_URL=http://127.0.0.1:5099 NOLOFICATION_API_KEY=dev python ...
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+NOTIFY_RE = re.compile(r'^/api/sites/[^/]+/notify$')
+PENDING_RE = re.compile(r'^/api/sites/[^/]+/pending-notifications$')
+PENDING_ITEM_RE = re.compile(r'^/api/sites/[^/]+/pending-notifications/(\d+)$')
+
+
+class StandinState:
+    """Counters and the in-memory pending queue, shared by all handler threads"""
+
+    def __init__(self, latency_ms: float = 0, error_rate: float = 0, max_batch: int = 0, schedule: bool = False,
+                 error_status: int = 503, retry_after: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.max_batch = max_batch
+        self.schedule = schedule  # keep notifications as 'pending' instead of delivering them
+        self.error_status = error_status  # status for injected failures
+        self.retry_after = retry_after  # Retry-After seconds sent with them (0: none)
+        # Notify requests that include any of these user ids fail with error_status
+        self.fail_user_ids = set()
+        self.deliveries = {}  # user id -> notifications delivered (or scheduled)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.notify_requests = 0
+        self.recipients = 0
+        self.errors = 0
+        self.by_category = {}
+        self.idempotency_keys = {}
+        self.pending = {}
+        self.next_id = 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'notify_requests': self.notify_requests,
+                'recipients': self.recipients,
+                'errors': self.errors,
+                'by_category': dict(self.by_category),
+                'duplicate_idempotency_keys': sum(1 for c in self.idempotency_keys.values() if c > 1),
+                'duplicate_recipients': sum(1 for c in self.deliveries.values() if c > 1),
+                'pending': len(self.pending)
+            }
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, so pooled clients actually reuse connections
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _begin(self) -> bool:
+            """Common per-request behaviour: auth, latency and injected failures"""
+            length = int(self.headers.get('Content-Length') or 0)
+            self._body = self.rfile.read(length) if length else b''
+            with state.lock:
+                state.requests += 1
+            if not self.headers.get('X-API-Key'):
+                self._reply(401, {'error': 'Missing API key'})
+                return False
+            if state.latency_ms:
+                time.sleep(state.latency_ms / 1000.0)
+            if state.error_rate and random.random() < state.error_rate:
+                self._fail()
+                return False
+            return True
+
+        def _fail(self):
+            with state.lock:
+                state.errors += 1
+            headers = {'Retry-After': str(state.retry_after)} if state.retry_after else None
+            self._reply(state.error_status, {'error': 'Injected failure'}, headers)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if not self._begin():
+                return
+            if not NOTIFY_RE.match(path):
+                return self._reply(404, {'error': 'Not found'})
+
+            payload = json.loads(self._body or b'{}')
+            user_ids = payload.get('user_ids') or ([payload['user_id']] if payload.get('user_id') else [])
+            if state.max_batch and len(user_ids) > state.max_batch:
+                with state.lock:
+                    state.errors += 1
+                return self._reply(413, {'error': f'Batch larger than {state.max_batch}'})
+            if state.fail_user_ids.intersection(user_ids):
+                return self._fail()
+
+            category = payload.get('category') or 'default'
+            key = self.headers.get('Idempotency-Key')
+            with state.lock:
+                state.notify_requests += 1
+                state.recipients += len(user_ids)
+                state.by_category[category] = state.by_category.get(category, 0) + len(user_ids)
+                for uid in user_ids:
+                    state.deliveries[uid] = state.deliveries.get(uid, 0) + 1
+                if key:
+                    state.idempotency_keys[key] = state.idempotency_keys.get(key, 0) + 1
+                if state.schedule:
+                    for uid in user_ids:
+                        state.pending[state.next_id] = {
+                            'id': state.next_id,
+                            'user_id': uid,
+                            'category': category,
+                            'title': payload.get('title'),
+                            'metadata': payload.get('metadata') or {}
+                        }
+                        state.next_id += 1
+
+            if state.schedule:
+                return self._reply(200, {'success': True, 'scheduled': len(user_ids), 'successful': 0, 'failed': 0})
+            return self._reply(200, {'success': True, 'successful': len(user_ids), 'scheduled': 0, 'failed': 0})
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if not self._begin():
+                return
+            if not PENDING_RE.match(parsed.path):
+                return self._reply(404, {'error': 'Not found'})
+
+            params = parse_qs(parsed.query)
+            user_id = params.get('user_id', [None])[0]
+            category = params.get('category', [None])[0]
+            limit = min(int(params.get('limit', ['100'])[0]), 1000)
+            offset = int(params.get('offset', ['0'])[0])
+            with state.lock:
+                items = [
+                    n for n in state.pending.values()
+                    if (not user_id or n['user_id'] == user_id) and (not category or n['category'] == category)
+                ]
+            page = items[offset:offset + limit]
+            return self._reply(200, {'pending_notifications': page, 'total': len(items)})
+
+        def do_DELETE(self):
+            path = urlparse(self.path).path
+            if not self._begin():
+                return
+            match = PENDING_ITEM_RE.match(path)
+            if not match:
+                return self._reply(404, {'error': 'Not found'})
+            with state.lock:
+                removed = state.pending.pop(int(match.group(1)), None)
+            if not removed:
+                return self._reply(404, {'error': 'Pending notification not found'})
+            return self._reply(200, {'message': 'Pending notification cancelled'})
+
+    return Handler
+
+
+def start_standin(port: int = 0, **options):
+    """
+    Start the stand-in on a background thread.
+    Returns (server, state, base_url); call server.shutdown() to stop it.
+    """
+    state = StandinState(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local Nolofication stand-in')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=int, default=0, help='Retry-After seconds sent with injected failures')
+    parser.add_argument('--max-batch', type=int, default=0, help='Reject bulk sends larger than this with 413')
+    parser.add_argument('--schedule', action='store_true', help='Keep notifications pending instead of delivering')
+    args = parser.parse_args()
+
+    server, state, url = start_standin(
+        args.port,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        max_batch=args.max_batch,
+        schedule=args.schedule,
+        error_status=args.error_status,
+        retry_after=args.retry_after
+    )
+    print(f"Nolofication stand-in listening on {url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(state.snapshot())
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Race several processes across the midnight rollover on one SQLite file.
+
+Seeds a throwaway database with users, yesterday's day (--date minus one)
+and votes for it, with the EST clock frozen at yesterday. Then --processes
+spawned workers each build the app, move their clock to --date and wait on a
+barrier, and all do one of the following at once (round-robin):
+
+- ensure_today(), like the first request after midnight
+- finalize_day(yesterday) then ensure_today(), like scripts/tick_day.py
+- GET /api/state through the test client
+
+Afterwards --dispatchers processes drain the notification outbox at the same
+time against a local Nolofication stand-in. The run passes if yesterday was
+finalized exactly once, exactly one new day exists, each day's messages came
+from one process, one day_results and one vote_reminders outbox row exist,
+and no notification batch was sent twice.
+
+Per worker it reports the time spent in write statements (with busy_timeout
+that time is mostly waiting for the write lock), the slowest write, and
+"database is locked" errors; the rollover traces show how many processes lost
+the finalize claim or the day-creation race and backed off.
+
+Usage:
+  python server/scripts/race_midnight.py
+  python server/scripts/race_midnight.py --processes 16 --rounds 5
+  python server/scripts/race_midnight.py --json > race.json   # exit 1 if any check fails
+"""
+import sys
+import os
+import time
+import json
+import random
+import sqlite3
+import argparse
+import statistics
+import tempfile
+import multiprocessing as mp
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+ROLES = ('ensure_today', 'tick_day', 'api_state')
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _make_app(db_path: str, clock: list):
+    """create_app() with est_today() reading clock[0]"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    import logging
+    logging.disable(logging.WARNING)
+    import server.routes.api as api_module
+    api_module.est_today = lambda: clock[0]
+    from server import create_app
+    return create_app(init_db=True)
+
+
+def seed(db_path: str, yesterday: date, users: int, seed_value: int):
+    """Yesterday's day (from create_app) with `users` users voting on it"""
+    from server.db import db
+    from server.models import User, Vote, Event, NotificationOutbox, RolloverTrace
+
+    app = _make_app(db_path, [yesterday])
+    rng = random.Random(seed_value)
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'provider': 'keyn', 'provider_user_id': f'race-{i}', 'display_name': f'Race {i}'}
+            for i in range(users)
+        ])
+        db.session.flush()
+        event = Event.query.first()
+        keys = [o['key'] for o in event.options]
+        user_ids = [row[0] for row in db.session.query(User.id).all()]
+        db.session.execute(Vote.__table__.insert(), [
+            {'day_id': event.day_id, 'user_id': uid, 'option': rng.choice(keys)} for uid in user_ids
+        ])
+        # Leave only the race's own notifications and traces to count
+        NotificationOutbox.query.delete()
+        RolloverTrace.query.delete()
+        db.session.commit()
+        return event.day_id
+
+
+def _tag_messages(tag: str):
+    """Prefix the avatar seed of every generated message with this process's tag"""
+    from server.utils import message_generator
+    original = message_generator.generate_messages_for_day
+
+    def tagged(*args, **kwargs):
+        messages = original(*args, **kwargs)
+        for msg in messages:
+            for m in [msg] + msg.get('replies', []):
+                m['avatar_seed'] = f"{tag}|{m['avatar_seed']}"[:64]
+        return messages
+
+    message_generator.generate_messages_for_day = tagged
+
+
+def _watch_writes(engine, stats: dict):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info['race_started'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('race_started', None)
+        if started is None or not statement.lstrip().upper().startswith(WRITES):
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        stats['writes'] += 1
+        stats['write_ms'] += elapsed
+        stats['max_write_ms'] = max(stats['max_write_ms'], elapsed)
+
+    @event.listens_for(engine, 'handle_error')
+    def on_error(context):
+        conn = context.connection
+        if conn is not None:
+            conn.info.pop('race_started', None)
+        if 'database is locked' in str(context.original_exception):
+            stats['locked_errors'] += 1
+
+
+def worker(index: int, db_path: str, yesterday: date, today: date, barrier, results):
+    role = ROLES[index % len(ROLES)]
+    clock = [yesterday]
+    app = _make_app(db_path, clock)
+    from server.db import db
+    from server.models import Day
+    from server.routes.api import finalize_day, ensure_today
+
+    _tag_messages(f"p{index}")
+    stats = {'writes': 0, 'write_ms': 0.0, 'max_write_ms': 0.0, 'locked_errors': 0}
+    report = {'index': index, 'role': role, 'error': None}
+    with app.app_context():
+        _watch_writes(db.engine, stats)
+        client = app.test_client()
+        clock[0] = today
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            if role == 'ensure_today':
+                ensure_today()
+            elif role == 'tick_day':
+                day = Day.query.filter_by(est_date=yesterday).first()
+                if day and day.chosen_option is None:
+                    finalize_day(day)
+                ensure_today()
+            else:
+                response = client.get('/api/state')
+                if response.status_code != 200:
+                    report['error'] = f"/api/state returned {response.status_code}"
+        except Exception as e:
+            db.session.rollback()
+            report['error'] = f"{type(e).__name__}: {e}"
+        report['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    report.update({k: round(v, 2) if isinstance(v, float) else v for k, v in stats.items()})
+    results.put(report)
+
+
+def dispatcher(db_path: str, today: date, barrier, results):
+    app = _make_app(db_path, [today])
+    from server.utils.outbox import dispatch_pending
+
+    totals = {'claimed': 0, 'sent': 0, 'failed': 0, 'skipped': 0, 'error': None}
+    with app.app_context():
+        barrier.wait()
+        try:
+            while True:
+                stats = dispatch_pending(batch_size=1)
+                for key in ('claimed', 'sent', 'failed', 'skipped'):
+                    totals[key] += stats[key]
+                if not stats['claimed']:
+                    break
+        except Exception as e:
+            totals['error'] = f"{type(e).__name__}: {e}"
+    results.put(totals)
+
+
+def _run_all(ctx, target, count: int, args: tuple) -> list:
+    """Start `count` processes of target(*args, barrier, queue) together; return their results"""
+    barrier = ctx.Barrier(count)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=target, args=(*(args(i) if callable(args) else args), barrier, results))
+             for i in range(count)]
+    for p in procs:
+        p.start()
+    collected = [results.get(timeout=300) for _ in procs]
+    for p in procs:
+        p.join()
+    return collected
+
+
+def verify(db_path: str, yesterday_id: int, today: date, sent_keys: dict) -> tuple:
+    """([(check, passed, detail)], {(trace kind, status): count})"""
+    con = sqlite3.connect(db_path)
+    q = lambda sql, *params: con.execute(sql, params).fetchall()
+
+    chosen = q("SELECT chosen_option FROM days WHERE id = ?", yesterday_id)[0][0]
+    auto_ticks = q("SELECT COUNT(*) FROM telemetry WHERE event_type = 'auto_tick' "
+                   "AND json_extract(payload, '$.day_id') = ?", yesterday_id)[0][0]
+    new_days = q("SELECT id FROM days WHERE est_date = ?", today.isoformat())
+    today_id = new_days[0][0] if len(new_days) == 1 else None
+    traces = dict(((kind, status), n) for kind, status, n in
+                  q("SELECT kind, status, COUNT(*) FROM rollover_traces GROUP BY kind, status"))
+
+    def writers(day_id):
+        seeds = [row[0] for row in q("SELECT avatar_seed FROM community_messages WHERE day_id = ?", day_id)]
+        return sorted({s.split('|', 1)[0] for s in seeds if '|' in s})
+
+    outbox = dict(q("SELECT idempotency_key, COUNT(*) FROM notification_outbox GROUP BY idempotency_key"))
+    outbox_status = dict(q("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status"))
+    reaction_writers = writers(yesterday_id)
+    day_writers = writers(today_id) if today_id else []
+    con.close()
+
+    duplicates = sorted(k for k, n in sent_keys.items() if n > 1)
+    results_keys = [k for k in sent_keys if k.startswith(f"day_results:{yesterday_id}")]
+    return [
+        ('yesterday finalized once', chosen is not None and auto_ticks == 1
+         and traces.get(('finalize', 'ok'), 0) == 1,
+         f"chosen={chosen}, auto_tick rows={auto_ticks}, finalize traces ok={traces.get(('finalize', 'ok'), 0)}"),
+        ('one new day', len(new_days) == 1 and traces.get(('create_day', 'ok'), 0) == 1,
+         f"days for {today}={len(new_days)}, create_day traces ok={traces.get(('create_day', 'ok'), 0)}"),
+        ('one set of reaction messages', len(reaction_writers) == 1, f"written by {reaction_writers or 'nobody'}"),
+        ('one set of new-day messages', len(day_writers) == 1, f"written by {day_writers or 'nobody'}"),
+        ('one outbox row per notification', outbox.get(f"day_results:{yesterday_id}") == 1
+         and outbox.get(f"vote_reminders:{today_id}") == 1 and len(outbox) == 2,
+         ', '.join(f"{k} x{n}" for k, n in sorted(outbox.items())) or 'empty'),
+        ('notifications sent once', not duplicates and results_keys and outbox_status.get('sent') == len(outbox),
+         f"{len(sent_keys)} batch keys, duplicates={duplicates}, outbox={outbox_status}"),
+    ], traces
+
+
+def run_round(ctx, args, today: date, seed_value: int, state) -> dict:
+    yesterday = today - timedelta(days=1)
+    db_path = os.path.join(tempfile.mkdtemp(), 'race.db')
+    with ctx.Pool(1) as pool:
+        yesterday_id = pool.apply(seed, (db_path, yesterday, args.users, seed_value))
+
+    workers = _run_all(ctx, worker, args.processes, lambda i: (i, db_path, yesterday, today))
+    state.idempotency_keys.clear()
+    dispatchers = _run_all(ctx, dispatcher, args.dispatchers, (db_path, today))
+    checks, traces = verify(db_path, yesterday_id, today, dict(state.idempotency_keys))
+
+    errors = [f"worker {w['index']} ({w['role']}): {w['error']}" for w in workers if w['error']]
+    errors += [f"dispatcher: {d['error']}" for d in dispatchers if d['error']]
+    checks.insert(0, ('no errors', not errors, '; '.join(errors) or 'none'))
+    return {
+        'seed': seed_value,
+        'passed': all(ok for _, ok, _ in checks),
+        'checks': [{'check': name, 'passed': bool(ok), 'detail': detail} for name, ok, detail in checks],
+        'traces': {f"{kind}.{status}": n for (kind, status), n in sorted(traces.items())},
+        'workers': sorted(workers, key=lambda w: w['index']),
+        'dispatchers': dispatchers,
+        'elapsed_ms_p50': round(statistics.median(w['elapsed_ms'] for w in workers), 2),
+        'elapsed_ms_max': max(w['elapsed_ms'] for w in workers),
+        'write_ms_max': max(w['write_ms'] for w in workers),
+        'slowest_write_ms': max(w['max_write_ms'] for w in workers),
+        'locked_errors': sum(w['locked_errors'] for w in workers),
+    }
+
+
+def print_round(n: int, r: dict):
+    print(f"Round {n} (seed {r['seed']}): {'PASS' if r['passed'] else 'FAIL'}")
+    for c in r['checks']:
+        print(f"  {'ok' if c['passed'] else 'FAIL':<4} {c['check']:<34} {c['detail']}")
+    print(f"  traces: {', '.join(f'{k}={v}' for k, v in r['traces'].items())}")
+    print(f"  rollover latency p50 {r['elapsed_ms_p50']} ms, max {r['elapsed_ms_max']} ms; "
+          f"write time max {r['write_ms_max']} ms/process, slowest write {r['slowest_write_ms']} ms; "
+          f"'database is locked' errors {r['locked_errors']}")
+    print(f"  {'worker':>6} {'role':<13} {'ms':>9} {'writes':>7} {'write ms':>9} {'max write':>10} {'locked':>7}")
+    for w in r['workers']:
+        print(f"  {w['index']:>6} {w['role']:<13} {w['elapsed_ms']:>9} {w['writes']:>7} {w['write_ms']:>9} "
+              f"{w['max_write_ms']:>10} {w['locked_errors']:>7}{'  ' + w['error'] if w['error'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Race processes across the midnight rollover on one SQLite file')
+    parser.add_argument('--processes', type=int, default=8, help='Workers racing the rollover')
+    parser.add_argument('--dispatchers', type=int, default=3, help='Outbox dispatchers racing afterwards')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=1, help='Repeat with a fresh database')
+    parser.add_argument('--date', type=date.fromisoformat, default=date(2030, 1, 2),
+                        help='The new day (the frozen clock after midnight)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    from server.scripts.nolofication_standin import start_standin
+    server, state, base_url = start_standin()
+    # Inherited by every spawned process
+    os.environ['NOLOFICATION_URL'] = base_url
+    os.environ['NOLOFICATION_API_KEY'] = 'race'
+
+    ctx = mp.get_context('spawn')
+    rounds = []
+    try:
+        for n in range(args.rounds):
+            r = run_round(ctx, args, args.date, args.seed + n, state)
+            rounds.append(r)
+            if not args.json:
+                print_round(n + 1, r)
+    finally:
+        server.shutdown()
+
+    failed = sum(1 for r in rounds if not r['passed'])
+    if args.json:
+        print(json.dumps({
+            'meta': {'processes': args.processes, 'dispatchers': args.dispatchers, 'users': args.users,
+                     'date': args.date.isoformat(), 'ran_at': datetime.utcnow().isoformat()},
+            'rounds': rounds
+        }, indent=2))
+    else:
+        print(f"\n{len(rounds) - failed}/{len(rounds)} rounds passed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
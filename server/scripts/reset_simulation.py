@@ -12,11 +12,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from server import create_app
 from server.db import db
-from server.models import Day, Event, WorldState, Vote, Telemetry
+from server.utils.user_stats import rebuild_user_stats
+from server.models import Day, Event, WorldState, Vote, Telemetry, VoteArrivalBucket, RolloverTrace, NotificationOutbox, NotificationSend
 
 def reset_simulation():
     """Clear all simulation data but keep users"""
-    app = create_app()
+    app = create_app(init_db=False)
     
     with app.app_context():
         print("Resetting simulation...")
@@ -24,6 +25,11 @@ def reset_simulation():
         # Delete in correct order (foreign key constraints)
         deleted_votes = Vote.query.delete()
         print(f"  ✓ Deleted {deleted_votes} votes")
+        VoteArrivalBucket.query.delete()
+        # Keyed by day id, and day ids restart after the reset
+        RolloverTrace.query.delete()
+        NotificationOutbox.query.delete()
+        NotificationSend.query.delete()
         
         deleted_telemetry = Telemetry.query.delete()
         print(f"  ✓ Deleted {deleted_telemetry} telemetry entries")
@@ -37,11 +43,14 @@ def reset_simulation():
         deleted_days = Day.query.delete()
         print(f"  ✓ Deleted {deleted_days} days")
         
+        rebuild_user_stats(db.session)
+        print("  ✓ Recomputed user statistics")
+        
         db.session.commit()
         
         print("\n✓ Simulation reset complete!")
         print("  Starting stats: Morale 70, Supplies 80, Threat 30")
-        print("  Next server start will create Day 1 with a fresh event")
+        print("  The next request or tick_day.py run will create Day 1 with a fresh event")
         print("  User accounts preserved")
 
 if __name__ == '__main__':
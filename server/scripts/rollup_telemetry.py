@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Roll raw telemetry up into daily aggregates, prune old rows and vacuum.
+
+Usage (e.g. nightly from cron; dispatch_notifications.py also runs it):
+  python server/scripts/rollup_telemetry.py
+  python server/scripts/rollup_telemetry.py --retention-days 14
+  python server/scripts/rollup_telemetry.py --since 2025-01-01      # rebuild older rollups
+  python server/scripts/rollup_telemetry.py --enable-incremental-vacuum   # one-time, for existing databases
+"""
+import sys
+import os
+import argparse
+import logging
+from datetime import date
+from dotenv import load_dotenv
+
+# Load environment variables before importing server modules
+env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env'))
+if os.path.exists(env_path):
+    load_dotenv(env_path)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from server import create_app
+from server.utils.telemetry_rollups import (
+    RETENTION_DAYS, rollup_telemetry, prune_telemetry, incremental_vacuum, enable_incremental_vacuum
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Telemetry rollups and retention')
+    parser.add_argument('--since', type=date.fromisoformat, default=None,
+                        help='Re-roll from this UTC date (default: last rolled-up date)')
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS,
+                        help=f'Keep raw telemetry this many days (default {RETENTION_DAYS})')
+    parser.add_argument('--no-prune', action='store_true', help='Only roll up, keep all raw rows')
+    parser.add_argument('--vacuum-pages', type=int, default=0,
+                        help='Max pages to free with incremental_vacuum (0 = all)')
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help='Convert an existing database to auto_vacuum=INCREMENTAL (full VACUUM, run once while idle)')
+    args = parser.parse_args()
+
+    app = create_app(init_db=False)
+    with app.app_context():
+        if args.enable_incremental_vacuum:
+            changed = enable_incremental_vacuum()
+            logger.info('Enabled incremental vacuum' if changed else 'Incremental vacuum already enabled')
+
+        stats = rollup_telemetry(since=args.since)
+        logger.info(f"Rolled up {stats['dates']} date(s), {stats['rows']} row(s)")
+        if not args.no_prune:
+            pruned = prune_telemetry(args.retention_days)
+            logger.info(f"Pruned {pruned} raw telemetry row(s) older than {args.retention_days} days")
+            logger.info(f"Vacuum: {incremental_vacuum(args.vacuum_pages)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,18 +11,20 @@ import os
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from server.db import db
-from server.models import User, Day, Vote, Event, WorldState
+from server.models import Day, Event, WorldState
 from server.utils.nolofication import nolofication
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from server.utils.notification_sends import (
+    claim_notification_send, complete_notification_send, unclaimed_send_result, recipients_for
+)
+from server.utils.telemetry import record_event
+from server.utils.recipients import has_recipients, BATCH_SIZE
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def send_day_result_notifications(day_id: int, chosen_option_label: str, new_state: dict):
+def send_day_result_notifications(day_id: int, chosen_option_label: str, new_state: dict, idempotency_key: str = None):
     """
     Send notification about the day's results to all users.
     Uses 'day_results' category which users can schedule.
@@ -31,41 +33,13 @@ def send_day_result_notifications(day_id: int, chosen_option_label: str, new_sta
         day_id: ID of the completed day
         chosen_option_label: Label of the winning option
         new_state: Dict with morale, supplies, threat values
+        idempotency_key: Outbox key, forwarded so Nolofication can drop retried sends
     """
     if not nolofication.is_configured():
         logger.warning("Nolofication not configured - skipping day result notifications")
         return
     
-    # Avoid sending if Nolofication already has pending/sent notifications for this day
-    try:
-        from server.models import Telemetry
-
-        # Check recent telemetry for notifications for this day
-        recent_notifs = Telemetry.query.filter_by(event_type='notification').order_by(Telemetry.created_at.desc()).limit(200).all()
-        for t in recent_notifs:
-            payload = t.payload or {}
-            if payload.get('category') == 'day_results' and payload.get('day_id') == day_id:
-                logger.info(f"Day {day_id} result notification already recorded in telemetry; skipping duplicate send")
-                return {'skipped': True, 'reason': 'already_recorded_in_telemetry'}
-    except Exception:
-        # If Telemetry table isn't available or query fails, continue and rely on Nolofication checks below
-        logger.debug("Telemetry check for existing day result notifications failed or unavailable")
-
-    # Also check Nolofication pending notifications for this category/day
-    try:
-        pending = nolofication.get_pending_notifications(category='day_results')
-        for notif in pending.get('pending_notifications', []):
-            meta = notif.get('metadata') or {}
-            if meta.get('day_id') == day_id:
-                logger.info(f"Day {day_id} result notification already pending in Nolofication; skipping duplicate send")
-                return {'skipped': True, 'reason': 'already_pending_in_nolofication'}
-    except Exception:
-        logger.debug("Failed to query Nolofication pending notifications for day results")
-
-    # Get all registered users
-    all_users = User.query.filter(User.provider_user_id.isnot(None)).all()
-    
-    if not all_users:
+    if not has_recipients():
         logger.info("No registered users found - skipping day result notifications")
         return
     
@@ -77,9 +51,6 @@ def send_day_result_notifications(day_id: int, chosen_option_label: str, new_sta
         logger.warning(f"Missing day or event data for day {day_id}")
         return
     
-    # Get KeyN user IDs
-    keyn_user_ids = [u.provider_user_id for u in all_users]
-    
     # Create notification content
     title = "📊 The Simulation Day Results"
     message = f"Day {day_id} results: Community chose '{chosen_option_label}'. Morale: {new_state['morale']}, Supplies: {new_state['supplies']}, Threat: {new_state['threat']}"
@@ -137,10 +108,18 @@ def send_day_result_notifications(day_id: int, chosen_option_label: str, new_sta
     </div>
     """
     
+    # Claim the (day_results, day) send log row; if another tick or dispatcher
+    # already sent (or is sending) these results, don't send them again
+    send = claim_notification_send('day_results', day_id)
+    if not send:
+        return unclaimed_send_result('day_results', day_id)
+    
     # Send bulk notification with 'day_results' category
     # Users can configure when they want to receive these (instant, daily digest, weekly, etc.)
-    result = nolofication.send_bulk_notification(
-        user_ids=keyn_user_ids,
+    # KeyN user IDs are streamed from the database straight into the batches
+    # (on a retry after a partial failure, only the ones still owed it)
+    result = nolofication.send_bulk_notification_batched(
+        recipients_for(send),
         title=title,
         message=message,
         notification_type='info',
@@ -152,21 +131,23 @@ def send_day_result_notifications(day_id: int, chosen_option_label: str, new_sta
             'morale': new_state['morale'],
             'supplies': new_state['supplies'],
             'threat': new_state['threat']
-        }
+        },
+        idempotency_key=idempotency_key,
+        batch_size=BATCH_SIZE,
+        min_batch_size=BATCH_SIZE,
+        max_batch_size=BATCH_SIZE
     )
     
+    result.pop('batch_results', None)
+    failed_recipients = result.pop('failed_recipients', None)
+    complete_notification_send(send, result, result.get('success') is not False, failed_recipients)
+    
     # Log a telemetry entry recording that we attempted to send notifications
-    try:
-        from server.models import Telemetry
-        db.session.add(Telemetry(event_type='notification', payload={
-            'category': 'day_results',
-            'day_id': day_id,
-            'result': result
-        }, user_id=None))
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        logger.debug("Failed to write telemetry for day result notification")
+    record_event('notification', {
+        'category': 'day_results',
+        'day_id': day_id,
+        'result': result
+    })
 
     # Check if notifications were sent/scheduled successfully
     if result.get('scheduled', 0) > 0 or result.get('successful', 0) > 0:
@@ -178,41 +159,19 @@ def send_day_result_notifications(day_id: int, chosen_option_label: str, new_sta
     return result
 
 
-def send_vote_reminder_for_new_day(new_day_id: int):
+def send_vote_reminder_for_new_day(new_day_id: int, idempotency_key: str = None):
     """
     Send vote reminder for the NEW day to users who haven't voted yet.
     Uses 'vote_reminders' category which users can schedule.
     
     Args:
         new_day_id: ID of the new day that needs votes
+        idempotency_key: Outbox key, forwarded so Nolofication can drop retried sends
     """
     if not nolofication.is_configured():
         logger.warning("Nolofication not configured - skipping vote reminders")
         return
     
-    # Avoid sending if Nolofication already has pending/sent vote_reminders for this day
-    try:
-        from server.models import Telemetry
-        recent_notifs = Telemetry.query.filter_by(event_type='notification').order_by(Telemetry.created_at.desc()).limit(200).all()
-        for t in recent_notifs:
-            payload = t.payload or {}
-            if payload.get('category') == 'vote_reminders' and payload.get('day_id') == new_day_id:
-                logger.info(f"Vote reminders for day {new_day_id} already recorded in telemetry; skipping duplicate send")
-                return {'skipped': True, 'reason': 'already_recorded_in_telemetry'}
-    except Exception:
-        logger.debug("Telemetry check for existing vote reminders failed or unavailable")
-
-    # Also check Nolofication pending notifications for this category/day
-    try:
-        pending = nolofication.get_pending_notifications(category='vote_reminders')
-        for notif in pending.get('pending_notifications', []):
-            meta = notif.get('metadata') or {}
-            if meta.get('day_id') == new_day_id:
-                logger.info(f"Vote reminders for day {new_day_id} already pending in Nolofication; skipping duplicate send")
-                return {'skipped': True, 'reason': 'already_pending_in_nolofication'}
-    except Exception:
-        logger.debug("Failed to query Nolofication pending notifications for vote reminders")
-
     # Get the new day and event
     day = Day.query.get(new_day_id)
     event = Event.query.filter_by(day_id=new_day_id).first()
@@ -221,16 +180,14 @@ def send_vote_reminder_for_new_day(new_day_id: int):
         logger.warning(f"Missing day or event data for new day {new_day_id}")
         return
     
-    # Get all registered users
-    all_users = User.query.filter(User.provider_user_id.isnot(None)).all()
-    
-    if not all_users:
+    if not has_recipients():
         logger.info("No registered users found - skipping vote reminders")
         return
     
-    # For a brand new day, nobody has voted yet, so send to everyone
-    # Later in the day, this could be called again to only remind non-voters
-    keyn_user_ids = [u.provider_user_id for u in all_users]
+    # For a brand new day, nobody has voted yet, so send to everyone. This
+    # deliberately doesn't use iter_non_voter_ids(): a retry later in the day
+    # would re-slice the batches under the same idempotency keys. Reminders for
+    # users who vote are cancelled by the reconciler instead.
     
     # Create notification content
     title = "🗳️ New Day in The Simulation - Vote Now!"
@@ -273,10 +230,17 @@ def send_vote_reminder_for_new_day(new_day_id: int):
     </div>
     """
     
+    # Claim the (vote_reminders, day) send log row so repeated ticks can't double-send
+    send = claim_notification_send('vote_reminders', new_day_id)
+    if not send:
+        return unclaimed_send_result('vote_reminders', new_day_id)
+    
     # Send bulk notification with 'vote_reminders' category
     # Users can configure when they want to receive these
-    result = nolofication.send_bulk_notification(
-        user_ids=keyn_user_ids,
+    # KeyN user IDs are streamed from the database straight into the batches
+    # (on a retry after a partial failure, only the ones still owed it)
+    result = nolofication.send_bulk_notification_batched(
+        recipients_for(send),
         title=title,
         message=message,
         notification_type='info',
@@ -286,21 +250,23 @@ def send_vote_reminder_for_new_day(new_day_id: int):
             'day_id': new_day_id,
             'event_headline': event.headline,
             'action_url': 'https://thesim.bynolo.ca'
-        }
+        },
+        idempotency_key=idempotency_key,
+        batch_size=BATCH_SIZE,
+        min_batch_size=BATCH_SIZE,
+        max_batch_size=BATCH_SIZE
     )
     
+    result.pop('batch_results', None)
+    failed_recipients = result.pop('failed_recipients', None)
+    complete_notification_send(send, result, result.get('success') is not False, failed_recipients)
+    
     # Log telemetry for this send attempt
-    try:
-        from server.models import Telemetry
-        db.session.add(Telemetry(event_type='notification', payload={
-            'category': 'vote_reminders',
-            'day_id': new_day_id,
-            'result': result
-        }, user_id=None))
-        db.session.commit()
-    except Exception:
-        db.session.rollback()
-        logger.debug("Failed to write telemetry for vote reminder notification")
+    record_event('notification', {
+        'category': 'vote_reminders',
+        'day_id': new_day_id,
+        'result': result
+    })
 
     # Check if notifications were sent/scheduled successfully
     if result.get('scheduled', 0) > 0 or result.get('successful', 0) > 0:
@@ -315,7 +281,7 @@ def send_vote_reminder_for_new_day(new_day_id: int):
 if __name__ == '__main__':
     # For testing - send notifications for the current day
     from server import create_app
-    app = create_app()
+    app = create_app(init_db=False)
     
     with app.app_context():
         current_day = Day.query.order_by(Day.id.desc()).first()
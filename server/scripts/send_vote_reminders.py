@@ -34,9 +34,9 @@ print()
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from server.db import db
-from server.models import User, Day, Vote
+from server.models import Day
 from server.utils.nolofication import nolofication
+from server.utils.recipients import has_recipients, iter_non_voter_ids
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import logging
@@ -71,28 +71,13 @@ def send_vote_reminders(app):
             logger.info(f"No day record found for {today} - skipping vote reminders")
             return
         
-        # Get all users who are registered
-        all_users = User.query.filter(User.provider_user_id.isnot(None)).all()
-        
-        if not all_users:
+        if not has_recipients():
             logger.info("No registered users found - skipping vote reminders")
             return
         
-        # Get all votes for today
-        votes_today = Vote.query.filter_by(day_id=day.id).all()
-        voted_user_ids = {v.user_id for v in votes_today if v.user_id is not None}
-        
-        # Find users who haven't voted
-        users_to_remind = [u for u in all_users if u.id not in voted_user_ids]
-        
-        if not users_to_remind:
-            logger.info(f"All {len(all_users)} registered users have voted - no reminders needed")
-            return
-        
-        logger.info(f"Sending vote reminders to {len(users_to_remind)} users (out of {len(all_users)} total)")
-        
-        # Get KeyN user IDs for bulk notification
-        keyn_user_ids = [u.provider_user_id for u in users_to_remind]
+        # KeyN user IDs of users who haven't voted, computed by the database
+        # as an anti-join and streamed into the batches
+        keyn_user_ids = iter_non_voter_ids(day.id)
         
         # Create notification content
         title = "⏰ Don't Forget to Vote in The Simulation!"
@@ -116,9 +101,9 @@ def send_vote_reminders(app):
         </div>
         """
         
-        # Send bulk notification
-        result = nolofication.send_bulk_notification(
-            user_ids=keyn_user_ids,
+        # Send bulk notifications as the recipients are read
+        result = nolofication.send_bulk_notification_batched(
+            keyn_user_ids,
             title=title,
             message=message,
             notification_type='info',
@@ -131,7 +116,7 @@ def send_vote_reminders(app):
         )
         
         if result.get('success'):
-            logger.info(f"Successfully sent vote reminders to {len(keyn_user_ids)} users")
+            logger.info(f"Successfully sent vote reminders to {result.get('recipients', 0)} users")
         else:
             logger.error(f"Failed to send vote reminders: {result.get('error')}")
         
@@ -141,5 +126,5 @@ def send_vote_reminders(app):
 if __name__ == '__main__':
     # When run directly (for testing)
     from server import create_app
-    app = create_app()
+    app = create_app(init_db=False)
     send_vote_reminders(app)
@@ -30,10 +30,18 @@ def ensure_column():
         conn.commit()
     conn.close()
 
+def refresh_admin_count(s):
+    # Keep the admin dashboard's counter (utils/user_stats.py) in step
+    s.execute(text(
+        "UPDATE user_stat_counters SET value = (SELECT COUNT(*) FROM users WHERE is_admin = 1) "
+        "WHERE key = 'admin_users'"
+    ))
+
 def mark_admin_by_user_id(user_id: int):
     engine = create_engine(DB_URI)
     with Session(engine) as s:
         s.execute(text("UPDATE users SET is_admin = 1 WHERE id = :id"), {'id': user_id})
+        refresh_admin_count(s)
         s.commit()
     print(f'Marked user id={user_id} as admin (if existed)')
 
@@ -41,6 +49,7 @@ def mark_admin_by_provider(provider_id: str):
     engine = create_engine(DB_URI)
     with Session(engine) as s:
         s.execute(text("UPDATE users SET is_admin = 1 WHERE provider_user_id = :pid"), {'pid': provider_id})
+        refresh_admin_count(s)
         s.commit()
     print(f'Marked provider_user_id={provider_id} as admin (if existed)')
 
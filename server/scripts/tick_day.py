@@ -4,10 +4,15 @@
 This script finalizes the previous EST day (if not already finalized)
 and ensures the current EST day exists. Designed to be invoked by cron
 or a systemd timer at midnight EST (or equivalent UTC time).
+
+It takes the same rollover lease as the in-app scheduler
+(server/utils/rollover_scheduler.py) and exits if someone else holds it,
+unless the rollover is overdue (today's day is still missing
+ROLLOVER_GRACE_SECONDS after midnight) - then it rolls over regardless.
 """
 import sys
 from zoneinfo import ZoneInfo
-from datetime import datetime, date, timedelta
+from datetime import datetime, timedelta
 import logging
 import os
 from dotenv import load_dotenv
@@ -21,9 +26,9 @@ if os.path.exists(env_path):
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from server import create_app
-from server.db import db
 from server.models import Day
 from server.routes.api import finalize_day, ensure_today
+from server.utils import rollover_scheduler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,28 +39,41 @@ def est_today():
 
 
 def run_tick():
-    app = create_app()
+    app = create_app(init_db=False)
     with app.app_context():
-        today = est_today()
-        yesterday = today - timedelta(days=1)
+        holder = rollover_scheduler.holder_id('tick_day:')
+        leased = rollover_scheduler.acquire(holder, rollover_scheduler.ROLLOVER_HOLD_SECONDS)
+        if not leased:
+            if not rollover_scheduler.rollover_overdue():
+                logger.info("Another process holds the rollover lease - skipping tick")
+                return
+            # The leader is alive but hasn't rolled over; ensure_today() and
+            # finalize_day() are safe to race with it
+            logger.warning("Another process holds the rollover lease but today is overdue - ticking anyway")
+        try:
+            today = est_today()
+            yesterday = today - timedelta(days=1)
+
+            # Try to finalize yesterday if it exists and hasn't been finalized
+            day_y = Day.query.filter_by(est_date=yesterday).first()
+            if day_y:
+                logger.info(f"Attempting finalize_day for {day_y.id} ({yesterday})")
+                try:
+                    finalize_day(day_y)
+                except Exception as e:
+                    logger.exception(f"Error finalizing day {day_y.id}: {e}")
+            else:
+                logger.info(f"No Day row for yesterday ({yesterday}) - skipping finalize")
 
-        # Try to finalize yesterday if it exists and hasn't been finalized
-        day_y = Day.query.filter_by(est_date=yesterday).first()
-        if day_y:
-            logger.info(f"Attempting finalize_day for {day_y.id} ({yesterday})")
+            # Ensure today exists (this will create the new day and send vote reminders)
             try:
-                finalize_day(day_y)
+                d = ensure_today()
+                logger.info(f"ensure_today returned day {d.id} ({d.est_date})")
             except Exception as e:
-                logger.exception(f"Error finalizing day {day_y.id}: {e}")
-        else:
-            logger.info(f"No Day row for yesterday ({yesterday}) - skipping finalize")
-
-        # Ensure today exists (this will create the new day and send vote reminders)
-        try:
-            d = ensure_today()
-            logger.info(f"ensure_today returned day {d.id} ({d.est_date})")
-        except Exception as e:
-            logger.exception(f"Error ensuring today: {e}")
+                logger.exception(f"Error ensuring today: {e}")
+        finally:
+            if leased:
+                rollover_scheduler.release(holder)
 
 
 if __name__ == '__main__':
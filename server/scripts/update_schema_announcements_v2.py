@@ -9,7 +9,7 @@ from server import create_app
 from server.db import db
 
 def update_schema():
-    app = create_app()
+    app = create_app(init_db=False)
     with app.app_context():
         print("Updating announcements table...")
         with db.engine.connect() as conn:
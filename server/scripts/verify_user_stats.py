@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Check the incrementally maintained user statistics against a full recount.
+
+Usage:
+  python server/scripts/verify_user_stats.py          # report drift, exit 1 if any
+  python server/scripts/verify_user_stats.py --fix    # rewrite the counters from scratch
+"""
+import sys
+import os
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables before importing server modules
+env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.env'))
+if os.path.exists(env_path):
+    load_dotenv(env_path)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from server import create_app
+from server.db import db
+from server.utils.user_stats import verify_user_stats, rebuild_user_stats
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify user statistics counters')
+    parser.add_argument('--fix', action='store_true', help='Recompute and store every counter')
+    args = parser.parse_args()
+
+    app = create_app(init_db=False)
+    with app.app_context():
+        drift = verify_user_stats()
+        for key in sorted(drift):
+            stored, actual = drift[key]
+            print(f"  {key}: stored {stored}, actual {actual}")
+        if not drift:
+            print("User statistics are up to date")
+            return 0
+        if args.fix:
+            rebuild_user_stats(db.session)
+            db.session.commit()
+            print(f"Rebuilt user statistics ({len(drift)} counter(s) were off)")
+            return 0
+        print(f"{len(drift)} counter(s) out of date; run with --fix to rebuild")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""Schema migrations and hot-path query plans (server/migrations.py)."""
+import os
+
+import pytest
+
+from server.migrations import PLAN_CHECKS, MIGRATIONS, check_query_plans, applied_versions
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    os.environ['DATABASE_URL'] = f"sqlite:///{tmp_path_factory.mktemp('db') / 'migrations.db'}"
+    from server import create_app, prepare_database
+    app = create_app(init_db=False)
+    prepare_database(app, rollover=False)
+    return app
+
+
+def test_fresh_database_is_fully_migrated(app):
+    with app.app_context():
+        assert applied_versions() == {m.version for m in MIGRATIONS}
+
+
+@pytest.mark.parametrize('check', PLAN_CHECKS, ids=lambda c: c[0])
+def test_hot_path_query_uses_its_index(app, check):
+    description, _, index = check
+    with app.app_context():
+        result = next(r for r in check_query_plans() if r['query'] == description)
+    assert result['ok'], f"{description} should use {index}, plan was: {result['plan']}"
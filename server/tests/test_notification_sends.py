@@ -0,0 +1,78 @@
+"""Per-day notification sends (server/utils/notification_sends.py) against the Nolofication stand-in."""
+import os
+from datetime import date
+
+import pytest
+
+from server.scripts import send_day_notifications
+from server.scripts.nolofication_standin import start_standin
+from server.utils.nolofication import nolofication
+
+USERS = 35
+BATCH = 10
+STATE = {'morale': 50, 'supplies': 50, 'threat': 50}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    os.environ['DATABASE_URL'] = f"sqlite:///{tmp_path / 'sends.db'}"
+    from server import create_app, prepare_database
+    from server.db import db
+    from server.models import User, Day, Event
+
+    app = create_app(init_db=False)
+    prepare_database(app, rollover=False)
+    server, state, url = start_standin()
+    monkeypatch.setattr(nolofication, 'base_url', url)
+    monkeypatch.setattr(nolofication, 'api_key', 'test')
+    monkeypatch.setattr(send_day_notifications, 'BATCH_SIZE', BATCH)
+    with app.app_context():
+        day = Day(est_date=date(2000, 1, 1))
+        db.session.add(day)
+        db.session.flush()
+        db.session.add(Event(day_id=day.id, headline='Storm', description='A storm hits', options=['a', 'b']))
+        db.session.add_all([User(provider='keyn', provider_user_id=f'u{i:03d}') for i in range(USERS)])
+        db.session.commit()
+        yield {'state': state, 'day_id': day.id}
+    server.shutdown()
+
+
+def send(env):
+    return send_day_notifications.send_day_result_notifications(env['day_id'], 'Shelter', STATE, idempotency_key='k')
+
+
+def test_retry_after_a_failed_batch_sends_nobody_twice(env):
+    state = env['state']
+    state.error_status = 400
+    state.fail_user_ids = {'u015'}
+
+    first = send(env)
+    assert first['success'] is False
+    assert first['failed_batches'] == 1
+    assert 'u015' not in state.deliveries
+    assert len(state.deliveries) == USERS - BATCH
+
+    # The outbox retries the send once the service recovers
+    state.fail_user_ids = set()
+    second = send(env)
+    assert second['success'] is True
+    assert second['recipients'] == BATCH
+    assert len(state.deliveries) == USERS
+    assert all(count == 1 for count in state.deliveries.values())
+
+    assert send(env) == {'skipped': True, 'reason': 'already_sent'}
+    assert all(count == 1 for count in state.deliveries.values())
+
+
+def test_send_with_no_confirmed_batch_is_retried_in_full(env):
+    state = env['state']
+    state.error_status = 400
+    state.fail_user_ids = {f'u{i:03d}' for i in range(0, USERS, BATCH)}
+
+    assert send(env)['success'] is False
+    assert state.deliveries == {}
+
+    state.fail_user_ids = set()
+    assert send(env)['recipients'] == USERS
+    assert len(state.deliveries) == USERS
+    assert all(count == 1 for count in state.deliveries.values())
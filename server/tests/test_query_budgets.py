@@ -0,0 +1,18 @@
+"""Per-endpoint SQL query budgets (server/utils/query_budget.py)."""
+import pytest
+
+from server.utils.query_budget import BUDGETS, budget_env, assert_query_budget, missing_budgets
+
+
+@pytest.fixture(scope='module')
+def env(tmp_path_factory):
+    return budget_env(tmp_path_factory.mktemp('db'))
+
+
+@pytest.mark.parametrize('budget', BUDGETS, ids=lambda b: f"{b.method} {b.endpoint}")
+def test_query_budget(env, budget):
+    assert_query_budget(env, budget)
+
+
+def test_every_endpoint_has_a_budget(env):
+    assert missing_budgets(env['app']) == []
@@ -1,11 +1,12 @@
 import os
-import requests
 from flask import session
 from ..models import User
 from ..db import db
+from .user_stats import user_created
 
 
 def fetch_user_data(token: str):
+    import requests
     try:
         resp = requests.get(
             f"{os.getenv('KEYN_AUTH_SERVER_URL', 'https://auth-keyn.bynolo.ca')}/api/user-scoped",
@@ -33,6 +34,7 @@ def upsert_user_from_token(token: str):
         )
         db.session.add(user)
         db.session.flush()
+        user_created(user)
     else:
         user.display_name = data.get('display_name') or data.get('username') or user.display_name
         # Update email if available
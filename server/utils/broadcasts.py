@@ -0,0 +1,261 @@
+"""
+Background broadcast jobs.
+
+Admin endpoints call create_broadcast_job() and return straight away; the
+dispatcher (scripts/dispatch_notifications.py) calls process_broadcasts(),
+which walks users in id order one chunk at a time. The job's cursor is only
+advanced after a chunk is sent, so a crash or redeploy resumes from the last
+sent chunk. Chunks are split into fixed-size batches with deterministic
+idempotency keys.
+
+Failures follow the same policy as per-day sends (utils/notification_sends):
+a chunk where no batch was confirmed is retried whole, with backoff; when only
+some batches failed, the cursor moves on and their recipients are kept in
+retry_recipients. Once the cursor reaches the end they are sent again, with
+the same backoff, so nobody in a confirmed batch gets the broadcast twice and
+nobody in a failed one is dropped.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import os
+import logging
+
+from sqlalchemy import update, or_, and_
+
+from ..db import db
+from ..models_notifications import BroadcastJob
+from .recipients import count_recipients, recipient_page
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = int(os.getenv('BROADCAST_CHUNK_SIZE', '1000'))
+BATCH_SIZE = int(os.getenv('BROADCAST_BATCH_SIZE', '100'))
+# A running job whose lock expires is picked up again by the next dispatcher
+LOCK_SECONDS = 300
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def create_broadcast_job(category: str, title: str, message: str,
+                         html_message: Optional[str] = None,
+                         announcement_id: Optional[int] = None) -> BroadcastJob:
+    """Queue a broadcast as part of the caller's transaction"""
+    job = BroadcastJob(
+        category=category,
+        title=title,
+        message=message,
+        html_message=html_message,
+        announcement_id=announcement_id,
+        total_recipients=count_recipients()
+    )
+    db.session.add(job)
+    return job
+
+
+def job_to_dict(job: BroadcastJob) -> dict:
+    total = job.total_recipients or 0
+    return {
+        'id': job.id,
+        'category': job.category,
+        'announcement_id': job.announcement_id,
+        'title': job.title,
+        'status': job.status,
+        'total_recipients': total,
+        'processed': job.processed,
+        'delivered': job.delivered,
+        'failed': job.failed,
+        'retry_recipients': len(job.retry_recipients or []),
+        'progress': round(min(job.processed / total, 1.0) * 100, 1) if total else (100.0 if job.status == 'completed' else 0.0),
+        'cursor_user_id': job.cursor_user_id,
+        'attempts': job.attempts,
+        'last_error': job.last_error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+def _claimable(now: datetime):
+    return and_(
+        BroadcastJob.next_attempt_at <= now,
+        or_(
+            BroadcastJob.status == 'queued',
+            and_(BroadcastJob.status == 'running', BroadcastJob.locked_until < now)
+        )
+    )
+
+
+def claim_job() -> Optional[BroadcastJob]:
+    """Atomically take the oldest due job (or one abandoned by a crashed dispatcher)"""
+    now = datetime.utcnow()
+    candidates = db.session.query(BroadcastJob.id).filter(_claimable(now)).order_by(BroadcastJob.id).limit(5).all()
+    for (job_id,) in candidates:
+        res = db.session.execute(
+            update(BroadcastJob)
+            .where(BroadcastJob.id == job_id)
+            .where(_claimable(now))
+            .values(status='running', locked_until=now + timedelta(seconds=LOCK_SECONDS))
+        )
+        db.session.commit()
+        if getattr(res, 'rowcount', 0) == 1:
+            return db.session.get(BroadcastJob, job_id)
+    return None
+
+
+def _send_chunk(job: BroadcastJob, provider_ids: list, idempotency_key: str) -> dict:
+    from .nolofication import nolofication
+    # Fixed batch size so the per-batch keys are the same if this chunk is re-sent
+    return nolofication.send_bulk_notification_batched(
+        provider_ids,
+        title=job.title,
+        message=job.message,
+        notification_type='info',
+        category=job.category,
+        html_message=job.html_message,
+        idempotency_key=idempotency_key,
+        batch_size=BATCH_SIZE,
+        min_batch_size=BATCH_SIZE,
+        max_batch_size=BATCH_SIZE
+    )
+
+
+def _first_error(result: dict, default: str) -> str:
+    errors = [b.get('error') for b in result.get('batch_results', []) if b.get('error')]
+    return errors[0] if errors else (result.get('error') or default)
+
+
+def _fail_chunk(job: BroadcastJob, error: str):
+    """Leave the cursor where it is and retry the chunk (or the retry recipients) later, or give up"""
+    job.attempts += 1
+    job.last_error = error[:2000]
+    job.locked_until = None
+    job.updated_at = datetime.utcnow()
+    if job.attempts >= MAX_ATTEMPTS:
+        job.status = 'failed'
+        logger.error(f"Broadcast job {job.id} failed permanently at user {job.cursor_user_id}: {error}")
+    else:
+        delay = min(BACKOFF_BASE_SECONDS * (2 ** (job.attempts - 1)), BACKOFF_MAX_SECONDS)
+        job.status = 'queued'
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning(f"Broadcast job {job.id} chunk failed (attempt {job.attempts}), retrying in {delay}s: {error}")
+    db.session.commit()
+
+
+def _retry_failed(job: BroadcastJob) -> bool:
+    """
+    Send the broadcast to the recipients of earlier failed batches. False if
+    some of them failed again; the job is then requeued with backoff.
+    """
+    owed = list(job.retry_recipients)
+    try:
+        result = _send_chunk(job, owed, f"broadcast:{job.id}:retry")
+    except Exception as e:
+        db.session.rollback()
+        _fail_chunk(job, str(e))
+        return False
+    if not result.get('batches'):
+        _fail_chunk(job, result.get('error') or 'send failed')
+        return False
+
+    remaining = result.get('failed_recipients') or []
+    job.delivered += result.get('successful', 0) + result.get('scheduled', 0)
+    job.failed -= len(owed) - len(remaining)
+    job.retry_recipients = remaining or None
+    if remaining:
+        _fail_chunk(job, _first_error(result, 'batches failed'))
+        return False
+    job.attempts = 0
+    job.last_error = None
+    job.updated_at = datetime.utcnow()
+    job.locked_until = job.updated_at + timedelta(seconds=LOCK_SECONDS)
+    db.session.commit()
+    return True
+
+
+def run_job(job: BroadcastJob, max_chunks: Optional[int] = None) -> str:
+    """
+    Send chunks of a claimed job, committing the cursor after each one.
+    Stops after `max_chunks` (so other dispatcher work is not starved) and
+    hands the job back as 'queued'. Returns the job's status.
+    """
+    job.started_at = job.started_at or datetime.utcnow()
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        rows = recipient_page(job.cursor_user_id, CHUNK_SIZE)
+        if not rows and job.retry_recipients:
+            if not _retry_failed(job):
+                return job.status
+            chunks += 1
+            continue
+        if not rows:
+            job.status = 'completed'
+            job.completed_at = datetime.utcnow()
+            job.locked_until = None
+            job.updated_at = job.completed_at
+            db.session.commit()
+            logger.info(f"Broadcast job {job.id} completed: {job.delivered} delivered, {job.failed} failed")
+            return job.status
+
+        try:
+            result = _send_chunk(job, [provider_id for _, provider_id in rows],
+                                 f"broadcast:{job.id}:{job.cursor_user_id}")
+        except Exception as e:
+            db.session.rollback()
+            _fail_chunk(job, str(e))
+            return job.status
+
+        if result.get('success') is False and not result.get('batches'):
+            _fail_chunk(job, result.get('error') or 'send failed')
+            return job.status
+        if result.get('failed_batches') and result['failed_batches'] == result.get('batches'):
+            # Nothing in this chunk went through; the service is probably down
+            _fail_chunk(job, _first_error(result, 'all batches failed'))
+            return job.status
+
+        # Chunk sent: advance the cursor. Recipients of batches that failed
+        # even after send_bulk_notification_batched's own retries are sent
+        # again once the cursor reaches the end.
+        failed_recipients = result.get('failed_recipients') or []
+        if failed_recipients:
+            job.retry_recipients = (job.retry_recipients or []) + failed_recipients
+            job.last_error = _first_error(result, 'batches failed')[:2000]
+        job.cursor_user_id = rows[-1][0]
+        job.processed += len(rows)
+        job.delivered += result.get('successful', 0) + result.get('scheduled', 0)
+        job.failed += result.get('failed', 0)
+        job.attempts = 0
+        if not failed_recipients:
+            job.last_error = None
+        job.updated_at = datetime.utcnow()
+        job.locked_until = job.updated_at + timedelta(seconds=LOCK_SECONDS)
+        db.session.commit()
+        chunks += 1
+
+    job.status = 'queued'
+    job.locked_until = None
+    db.session.commit()
+    return job.status
+
+
+def process_broadcasts(max_chunks: int = 20) -> Optional[dict]:
+    """Claim one due broadcast job and advance it by up to `max_chunks` chunks"""
+    from .nolofication import nolofication
+    if not nolofication.is_configured():
+        return None
+
+    job = claim_job()
+    if not job:
+        return None
+    run_job(job, max_chunks=max_chunks)
+    return job_to_dict(job)
+
+
+def resume_job(job: BroadcastJob):
+    """Requeue a failed job from its last confirmed cursor"""
+    job.status = 'queued'
+    job.attempts = 0
+    job.next_attempt_at = datetime.utcnow()
+    job.locked_until = None
+    job.updated_at = datetime.utcnow()
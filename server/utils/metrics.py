@@ -0,0 +1,92 @@
+"""
+Prometheus metrics, served in the text exposition format at /metrics.
+
+Under gunicorn every worker (and the notification dispatcher) is a separate
+process, so prometheus_client runs in multiprocess mode: each process writes
+its samples to files in PROMETHEUS_MULTIPROC_DIR and /metrics merges them.
+run_prod.sh sets the directory and empties it on start, and gunicorn.conf.py
+marks exited workers dead. Without the variable (flask run, scripts) the
+metrics are simply this process's own.
+
+Set METRICS_TOKEN to require `Authorization: Bearer <token>` on /metrics.
+"""
+from time import perf_counter
+import os
+import logging
+
+from flask import Response, g, request, abort
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+logger = logging.getLogger(__name__)
+
+# Request latencies are mostly SQLite-bound and short; rollover phases and
+# external calls can take tens of seconds
+FAST_BUCKETS = (0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+http_request_seconds = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'endpoint', 'status'], buckets=FAST_BUCKETS
+)
+http_request_db_seconds = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL per request, by route',
+    ['endpoint'], buckets=FAST_BUCKETS
+)
+openrouter_seconds = Histogram(
+    'openrouter_request_duration_seconds', 'OpenRouter call latency by caller and outcome',
+    ['caller', 'status'], buckets=SLOW_BUCKETS
+)
+nolofication_seconds = Histogram(
+    'nolofication_request_duration_seconds', 'Nolofication call latency by operation and outcome',
+    ['operation', 'outcome'], buckets=SLOW_BUCKETS
+)
+# Fed by utils/rollover_trace.py
+rollover_phase_seconds = Histogram(
+    'rollover_phase_duration_seconds', 'Day rollover duration by phase',
+    ['phase'], buckets=SLOW_BUCKETS
+)
+votes_total = Counter('votes_total', 'Votes accepted', ['kind'])  # new, changed
+
+
+def _start_timer():
+    g.request_started = perf_counter()
+
+
+def _observe_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    # Unmatched paths share one label so 404 scans can't blow up cardinality
+    endpoint = request.endpoint or 'unmatched'
+    try:
+        http_request_seconds.labels(request.method, endpoint, str(response.status_code)).observe(
+            perf_counter() - started
+        )
+        if 'db_time' in g:
+            http_request_db_seconds.labels(endpoint).observe(g.db_time)
+    except Exception as e:
+        logger.debug(f"Failed to record request metrics: {e}")
+    return response
+
+
+def _registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view():
+    token = os.getenv('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        abort(401)
+    return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -3,22 +3,106 @@ Nolofication integration service for theSimulation.
 Sends notifications to users via the centralized Nolofication platform.
 """
 import requests
+import hashlib
 import os
-from typing import List, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from typing import Iterable, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Status codes worth retrying with backoff (rate limiting and transient server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# A batch rejected with these is too large for the service and is split in half
+SPLIT_STATUSES = (400, 413)
+# Longest Retry-After (or batch backoff) we wait for, in seconds
+RETRY_AFTER_MAX = 60
+# Times send_bulk_notification_batched() sends a batch that got a 429 or 5xx
+BATCH_ATTEMPTS = int(os.getenv('NOLOFICATION_BATCH_ATTEMPTS', '3'))
+BATCH_BACKOFF_SECONDS = float(os.getenv('NOLOFICATION_BATCH_BACKOFF_SECONDS', '1.0'))
+
+
+class NotifyRetry(Retry):
+    """
+    Retry policy for the shared session. GET and DELETE are retried on
+    RETRY_STATUSES. Nolofication doesn't document Idempotency-Key, so a POST
+    is only retried when the response says it wasn't processed: a 429, or a
+    503 with Retry-After. Retry-After is honored up to RETRY_AFTER_MAX.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == 'POST':
+            return status_code == 429 or (status_code == 503 and has_retry_after)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return min(retry_after, RETRY_AFTER_MAX) if retry_after is not None else None
+
+
+def _error_result(error: requests.exceptions.RequestException) -> dict:
+    """A failed call's result, with the HTTP status and Retry-After seconds when there was a response"""
+    result = {'success': False, 'error': str(error)}
+    response = getattr(error, 'response', None)
+    if response is not None:
+        result['status'] = response.status_code
+        retry_after = (response.headers.get('Retry-After') or '').strip()
+        if retry_after.isdigit():
+            result['retry_after'] = int(retry_after)
+    return result
+
+
+def batch_key(idempotency_key: str, batch: List[str]) -> str:
+    """Idempotency key for one batch: the send's key plus a digest of its recipients"""
+    digest = hashlib.sha256('\n'.join(batch).encode()).hexdigest()[:16]
+    return f"{idempotency_key}:{digest}"
+
 
 class NoloficationService:
     def __init__(self):
         self.base_url = os.getenv('NOLOFICATION_URL', 'https://nolofication.bynolo.ca')
         self.site_id = os.getenv('NOLOFICATION_SITE_ID', 'thesimulation')
         self.api_key = os.getenv('NOLOFICATION_API_KEY')
+        self.pool_size = int(os.getenv('NOLOFICATION_POOL_SIZE', '16'))
+        self.max_workers = int(os.getenv('NOLOFICATION_MAX_WORKERS', '8'))
+        
+        # One keep-alive session shared by every call (and every worker thread)
+        # instead of a fresh connection per request
+        self.session = requests.Session()
+        retry = NotifyRetry(
+            total=int(os.getenv('NOLOFICATION_RETRIES', '3')),
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUSES,
+            # Connection and read errors are only retried for these; POST
+            # status retries are decided by NotifyRetry.is_retry()
+            allowed_methods=frozenset(['GET', 'DELETE']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
         if not self.api_key:
             logger.warning("NOLOFICATION_API_KEY environment variable not set - notifications disabled")
     
+    def _request(self, operation: str, method: str, url: str, **kwargs) -> requests.Response:
+        """session.request, timed into the nolofication_request_duration_seconds metric"""
+        from .metrics import nolofication_seconds
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = self.session.request(method, url, **kwargs)
+            outcome = 'ok' if response.ok else f"http_{response.status_code}"
+            return response
+        finally:
+            nolofication_seconds.labels(operation, outcome).observe(time.perf_counter() - started)
+
     def is_configured(self) -> bool:
         """Check if Nolofication is properly configured."""
         return bool(self.api_key)
@@ -31,7 +115,8 @@ class NoloficationService:
         notification_type: str = 'info',
         category: Optional[str] = None,
         html_message: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        idempotency_key: Optional[str] = None
     ) -> dict:
         """
         Send notification to a single user.
@@ -44,6 +129,7 @@ class NoloficationService:
             category: Notification category (e.g., 'day_results', 'vote_reminders')
             html_message: Optional HTML version of message
             metadata: Optional additional data
+            idempotency_key: Optional key so retried sends can be deduplicated
         
         Returns:
             Response from Nolofication API
@@ -75,13 +161,16 @@ class NoloficationService:
             'Content-Type': 'application/json'
         }
         
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = self._request('notify', 'POST', url, json=payload, headers=headers, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to send notification to {user_id}: {e}")
-            return {'success': False, 'error': str(e)}
+            return _error_result(e)
     
     def send_bulk_notification(
         self,
@@ -91,7 +180,8 @@ class NoloficationService:
         notification_type: str = 'info',
         category: Optional[str] = None,
         html_message: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        idempotency_key: Optional[str] = None
     ) -> dict:
         """
         Send notification to multiple users.
@@ -104,6 +194,7 @@ class NoloficationService:
             category: Notification category (e.g., 'day_results', 'vote_reminders')
             html_message: Optional HTML version of message
             metadata: Optional additional data
+            idempotency_key: Optional key so retried sends can be deduplicated
         
         Returns:
             Response from Nolofication API
@@ -139,13 +230,169 @@ class NoloficationService:
             'Content-Type': 'application/json'
         }
         
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self._request('notify_bulk', 'POST', url, json=payload, headers=headers, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to send bulk notification to {len(user_ids)} users: {e}")
-            return {'success': False, 'error': str(e)}
+            return _error_result(e)
+    
+    def send_bulk_notification_batched(
+        self,
+        user_ids: Iterable[str],
+        title: str,
+        message: str,
+        notification_type: str = 'info',
+        category: Optional[str] = None,
+        html_message: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        batch_size: int = 100,
+        min_batch_size: int = 25,
+        max_batch_size: int = 1000,
+        max_workers: Optional[int] = None,
+        target_latency: float = 2.0,
+        max_attempts: int = BATCH_ATTEMPTS,
+        backoff: float = BATCH_BACKOFF_SECONDS
+    ) -> dict:
+        """
+        Send one notification to any number of users as concurrent bulk batches.
+        
+        `user_ids` may be any iterable (including a generator), and batches are
+        sent as soon as they are filled. At most `max_workers` batches are in
+        flight at once. The batch size adapts to the service: it grows while
+        batches come back faster than `target_latency` seconds, and halves when a
+        batch is slow or fails. A batch rejected as too large (SPLIT_STATUSES)
+        is split in half and re-sent, and the size never grows back past it.
+        
+        A batch that gets a 429 or 5xx is sent again, up to `max_attempts`
+        times. Before that nothing new is sent for its Retry-After, or for
+        `backoff` seconds doubling with each attempt.
+        
+        With an `idempotency_key` the batches are fixed at `batch_size` and
+        failed ones aren't split, so a retried send (same recipients in the same
+        order) produces the same batches. Each batch's key is derived from its
+        recipients, never from its position, so it always covers the same users.
+        
+        Returns aggregated counts, one entry per batch in 'batch_results', and
+        the recipients of the batches that still failed in 'failed_recipients'.
+        """
+        if not self.is_configured():
+            logger.warning("Nolofication not configured - skipping bulk notification")
+            return {'success': False, 'error': 'Not configured'}
+        
+        max_workers = max_workers or self.max_workers
+        ids = iter(user_ids)
+        adaptive = not idempotency_key
+        size = max(min_batch_size, min(batch_size, max_batch_size)) if adaptive else batch_size
+        ceiling = max_batch_size
+        retry = deque()  # (batch, attempt) to send before reading more ids
+        paused_until = 0.0
+        batch_results = []
+        unconfirmed = {}
+        
+        def send_batch(index: int, batch: List[str], attempt: int) -> dict:
+            started = time.perf_counter()
+            result = self.send_bulk_notification(
+                user_ids=batch,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                category=category,
+                html_message=html_message,
+                metadata=metadata,
+                idempotency_key=batch_key(idempotency_key, batch) if idempotency_key else None
+            )
+            return {
+                'index': index,
+                'size': len(batch),
+                'latency_ms': int((time.perf_counter() - started) * 1000),
+                'success': result.get('success') is not False,
+                'successful': result.get('successful', 0),
+                'scheduled': result.get('scheduled', 0),
+                'failed': result.get('failed', 0) if result.get('success') is not False else len(batch),
+                'error': result.get('error'),
+                'status': result.get('status'),
+                'retry_after': result.get('retry_after'),
+                'attempts': attempt,
+                'batch': batch
+            }
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            in_flight = set()
+            index = 0
+            exhausted = False
+            while in_flight or retry or not exhausted:
+                while time.monotonic() >= paused_until and (retry or not exhausted) and len(in_flight) < max_workers:
+                    batch, attempt = retry.popleft() if retry else (list(islice(ids, size)), 1)
+                    if not batch:
+                        exhausted = True
+                        break
+                    in_flight.add(pool.submit(send_batch, index, batch, attempt))
+                    index += 1
+                
+                pause = paused_until - time.monotonic()
+                if not in_flight:
+                    if pause > 0 and (retry or not exhausted):
+                        time.sleep(pause)
+                        continue
+                    break
+                
+                done, in_flight = wait(in_flight, timeout=pause if pause > 0 else None, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_result = future.result()
+                    batch = batch_result.pop('batch')
+                    status = batch_result['status']
+                    
+                    if not batch_result['success']:
+                        # Too large for the service: split it and try the halves again
+                        if adaptive and status in SPLIT_STATUSES and len(batch) > min_batch_size:
+                            ceiling = max(min_batch_size, min(ceiling, len(batch) // 2))
+                            half = len(batch) // 2
+                            retry.append((batch[:half], 1))
+                            retry.append((batch[half:], 1))
+                            size = min(size, ceiling)
+                            continue
+                        # Rate limited or a server error: hold off, then send the same batch again
+                        attempt = batch_result['attempts']
+                        if status and (status == 429 or status >= 500) and attempt < max_attempts:
+                            delay = min(batch_result['retry_after'] or backoff * (2 ** (attempt - 1)), RETRY_AFTER_MAX)
+                            paused_until = max(paused_until, time.monotonic() + delay)
+                            retry.append((batch, attempt + 1))
+                            if adaptive:
+                                size = max(min_batch_size, size // 2)
+                            continue
+                        unconfirmed[batch_result['index']] = batch
+                    batch_results.append(batch_result)
+                    
+                    # Adapt the batch size to how the service is coping
+                    if not adaptive:
+                        continue
+                    if not batch_result['success'] or batch_result['latency_ms'] > target_latency * 1000:
+                        size = max(min_batch_size, size // 2)
+                    elif batch_result['latency_ms'] < target_latency * 500:
+                        size = min(ceiling, int(size * 1.5))
+        
+        batch_results.sort(key=lambda b: b['index'])
+        failed_batches = [b for b in batch_results if not b['success']]
+        if failed_batches:
+            logger.error(f"{len(failed_batches)} of {len(batch_results)} notification batches failed")
+        
+        return {
+            'success': not failed_batches,
+            'batches': len(batch_results),
+            'failed_batches': len(failed_batches),
+            'recipients': sum(b['size'] for b in batch_results),
+            'successful': sum(b['successful'] for b in batch_results),
+            'scheduled': sum(b['scheduled'] for b in batch_results),
+            'failed': sum(b['failed'] for b in batch_results),
+            'batch_results': batch_results,
+            'failed_recipients': [uid for index in sorted(unconfirmed) for uid in unconfirmed[index]]
+        }
     
     def get_pending_notifications(
         self,
@@ -185,7 +432,7 @@ class NoloficationService:
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self._request('pending', 'GET', url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -212,7 +459,7 @@ class NoloficationService:
         }
         
         try:
-            response = requests.delete(url, headers=headers, timeout=10)
+            response = self._request('cancel', 'DELETE', url, headers=headers, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,101 @@
+"""
+Claim-before-send log for per-day notification broadcasts.
+
+claim_notification_send() inserts the (category, day_id) row; the unique key
+makes the insert the dedup check, so only one caller ever gets to send.
+
+A send whose batches partly failed is marked 'failed' with the recipients of
+the failed batches in retry_recipients. The retry (recipients_for()) goes to
+them only, so recipients of confirmed batches never get it twice. A send
+where no batch was confirmed is retried in full.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+import logging
+
+from sqlalchemy import update, or_, and_
+from sqlalchemy.exc import IntegrityError
+
+from ..db import db
+from ..models_notifications import NotificationSend
+from .recipients import iter_recipient_ids
+
+logger = logging.getLogger(__name__)
+
+# A claim still 'sending' after this long is assumed to belong to a crashed process.
+# Outbox retries meanwhile back off (utils/outbox.py) and outlast it.
+STALE_CLAIM_SECONDS = 1800
+
+
+def claim_notification_send(category: str, day_id: int) -> Optional[NotificationSend]:
+    """
+    Claim the right to send `category` for `day_id`.
+    Returns the claimed row, or None if it was already sent or is being sent.
+    A previous failed (or abandoned) attempt can be claimed again.
+    """
+    try:
+        send = NotificationSend(category=category, day_id=day_id, status='sending')
+        db.session.add(send)
+        db.session.commit()
+        return send
+    except IntegrityError:
+        db.session.rollback()
+
+    now = datetime.utcnow()
+    res = db.session.execute(
+        update(NotificationSend)
+        .where(NotificationSend.category == category)
+        .where(NotificationSend.day_id == day_id)
+        .where(or_(
+            NotificationSend.status == 'failed',
+            and_(
+                NotificationSend.status == 'sending',
+                NotificationSend.claimed_at < now - timedelta(seconds=STALE_CLAIM_SECONDS)
+            )
+        ))
+        .values(status='sending', claimed_at=now, attempts=NotificationSend.attempts + 1)
+    )
+    db.session.commit()
+
+    if getattr(res, 'rowcount', 0) != 1:
+        return None
+    return NotificationSend.query.filter_by(category=category, day_id=day_id).first()
+
+
+def unclaimed_send_result(category: str, day_id: int) -> dict:
+    """
+    Result for a caller that couldn't claim the send. Skipped once it was sent;
+    a failure (so the outbox retries later) while another process still holds
+    the claim, because that send may yet fail.
+    """
+    send = NotificationSend.query.filter_by(category=category, day_id=day_id).first()
+    if send is not None and send.status == 'sending':
+        logger.info(f"{category} for day {day_id} is being sent by another process; retry later")
+        return {'success': False, 'error': f"{category} for day {day_id} is being sent by another process"}
+    logger.info(f"{category} for day {day_id} already sent; skipping duplicate send")
+    return {'skipped': True, 'reason': 'already_sent'}
+
+
+def recipients_for(send: NotificationSend) -> Iterable[str]:
+    """Everyone, or after a partial failure only the recipients still owed the send"""
+    if send.retry_recipients is not None:
+        return list(send.retry_recipients)
+    return iter_recipient_ids()
+
+
+def complete_notification_send(send: NotificationSend, result: Optional[dict], ok: bool,
+                               failed_recipients: Optional[List[str]] = None):
+    """
+    Record the outcome of a claimed send. A failed send can be claimed again
+    later; if some of its batches were confirmed, only `failed_recipients`
+    are sent to then.
+    """
+    send.status = 'sent' if ok else 'failed'
+    if ok:
+        send.retry_recipients = None
+    elif result and result.get('batches', 0) > result.get('failed_batches', 0):
+        send.retry_recipients = list(failed_recipients or [])
+    send.completed_at = datetime.utcnow()
+    send.result = result
+    db.session.add(send)
+    db.session.commit()
@@ -0,0 +1,168 @@
+"""
+Notification outbox.
+
+Request handlers and rollovers call enqueue_notification() inside their own
+transaction, so a notification exists if and only if the change that caused
+it was committed. The dispatcher (scripts/dispatch_notifications.py) drains
+the outbox with dispatch_pending(), retrying failures with exponential backoff.
+While Nolofication isn't configured nothing is claimed, so the outbox waits
+for a dispatcher that has NOLOFICATION_API_KEY.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import logging
+
+from sqlalchemy import update, or_, and_
+
+from ..db import db
+from ..models_notifications import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+# How long a dispatcher may hold a claimed row before another one may retry it
+CLAIM_SECONDS = 300
+MAX_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue_notification(kind: str, idempotency_key: str, payload: dict) -> NotificationOutbox:
+    """
+    Add a notification to the outbox as part of the caller's transaction.
+    Nothing is sent until the caller commits and the dispatcher picks it up.
+    """
+    item = NotificationOutbox(kind=kind, idempotency_key=idempotency_key, payload=payload)
+    db.session.add(item)
+    return item
+
+
+def _send_day_results(item: NotificationOutbox):
+    from ..scripts.send_day_notifications import send_day_result_notifications
+    payload = item.payload
+    return send_day_result_notifications(
+        payload['day_id'],
+        payload['chosen_option_label'],
+        payload['new_state'],
+        idempotency_key=item.idempotency_key
+    )
+
+
+def _send_vote_reminders(item: NotificationOutbox):
+    from ..scripts.send_day_notifications import send_vote_reminder_for_new_day
+    return send_vote_reminder_for_new_day(item.payload['day_id'], idempotency_key=item.idempotency_key)
+
+
+HANDLERS = {
+    'day_results': _send_day_results,
+    'vote_reminders': _send_vote_reminders,
+}
+
+
+def _is_failure(result) -> bool:
+    return isinstance(result, dict) and result.get('success') is False
+
+
+def _claim(item_id: int, now: datetime) -> bool:
+    """Atomically move one due row to 'sending'. Returns False if another dispatcher got it."""
+    res = db.session.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id == item_id)
+        .where(NotificationOutbox.next_attempt_at <= now)
+        .where(or_(
+            NotificationOutbox.status == 'pending',
+            and_(NotificationOutbox.status == 'sending', NotificationOutbox.locked_until < now)
+        ))
+        .values(
+            status='sending',
+            locked_until=now + timedelta(seconds=CLAIM_SECONDS),
+            attempts=NotificationOutbox.attempts + 1
+        )
+    )
+    return getattr(res, 'rowcount', 0) == 1
+
+
+def claim_batch(limit: int = 20) -> list:
+    """Claim up to `limit` due outbox rows for this dispatcher"""
+    now = datetime.utcnow()
+    candidates = db.session.query(NotificationOutbox.id).filter(
+        NotificationOutbox.next_attempt_at <= now,
+        or_(
+            NotificationOutbox.status == 'pending',
+            and_(NotificationOutbox.status == 'sending', NotificationOutbox.locked_until < now)
+        )
+    ).order_by(NotificationOutbox.id).limit(limit).all()
+
+    claimed_ids = [item_id for (item_id,) in candidates if _claim(item_id, now)]
+    db.session.commit()
+
+    if not claimed_ids:
+        return []
+    return NotificationOutbox.query.filter(NotificationOutbox.id.in_(claimed_ids)).order_by(NotificationOutbox.id).all()
+
+
+def _finish(item: NotificationOutbox, error: Optional[str] = None):
+    item.locked_until = None
+    if error is None:
+        item.status = 'sent'
+        item.sent_at = datetime.utcnow()
+        item.last_error = None
+        return
+
+    item.last_error = error[:2000]
+    if item.attempts >= MAX_ATTEMPTS:
+        item.status = 'failed'
+        logger.error(f"Outbox item {item.idempotency_key} failed permanently after {item.attempts} attempts: {error}")
+    else:
+        delay = min(BACKOFF_BASE_SECONDS * (2 ** (item.attempts - 1)), BACKOFF_MAX_SECONDS)
+        item.status = 'pending'
+        item.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        logger.warning(f"Outbox item {item.idempotency_key} failed (attempt {item.attempts}), retrying in {delay}s: {error}")
+
+
+def dispatch_pending(batch_size: int = 20) -> dict:
+    """
+    Deliver one batch of due outbox rows.
+    Returns counts of sent, retried/failed and skipped items.
+    """
+    from .nolofication import nolofication
+
+    stats = {'claimed': 0, 'sent': 0, 'failed': 0, 'skipped': 0}
+    if not nolofication.is_configured():
+        # Leave everything pending rather than dropping it; NoloficationService
+        # already warned at startup
+        return stats
+
+    items = claim_batch(batch_size)
+    stats['claimed'] = len(items)
+    if not items:
+        return stats
+
+    for item in items:
+        handler = HANDLERS.get(item.kind)
+        if not handler:
+            item.attempts = MAX_ATTEMPTS
+            _finish(item, error=f"Unknown outbox kind: {item.kind}")
+            stats['failed'] += 1
+        else:
+            try:
+                result = handler(item)
+                error = (result.get('error') or 'send failed') if _is_failure(result) else None
+            except Exception as e:
+                db.session.rollback()
+                error = str(e)
+            _finish(item, error)
+            stats['failed' if error else 'sent'] += 1
+        db.session.commit()
+
+    return stats
+
+
+def prune_outbox(days: int = 14) -> int:
+    """Delete delivered/skipped rows older than `days`. Failed rows are kept for inspection."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = NotificationOutbox.query.filter(
+        NotificationOutbox.status.in_(['sent', 'skipped']),
+        NotificationOutbox.created_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
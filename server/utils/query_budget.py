@@ -0,0 +1,224 @@
+"""
+Query budgets for the api and admin endpoints.
+
+Each endpoint in api_bp and admin_bp has a maximum number of SQL statements
+it may run against the seeded dataset below. The dataset has enough users,
+days, votes and message replies that an N+1 loop blows through its budget.
+server/tests/test_query_budgets.py checks every budget with pytest (run in
+CI); scripts/check_query_budgets.py prints the same checks with each
+endpoint's statements.
+
+budget_env() points DATABASE_URL at a fresh SQLite file, so call it before
+anything else creates the app. New endpoints must get a Budget entry;
+missing_budgets() lists the ones without one.
+"""
+from datetime import timedelta
+from typing import List, NamedTuple, Optional
+import os
+
+from .query_stats import count_queries
+
+
+class Budget(NamedTuple):
+    endpoint: str  # Flask endpoint name
+    path: str  # may use {user_id}, {other_user_id}, {day_id}, {event_id}, {project_id}, {job_id}
+    max_queries: int
+    method: str = 'GET'
+    json: Optional[dict] = None
+    as_admin: bool = True
+    skip: Optional[str] = None  # why it can't run offline
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+SEED_USERS = 25
+SEED_DAYS = 12
+SEED_MESSAGES_PER_DAY = 4
+SEED_REPLIES_PER_MESSAGE = 3
+
+EXTERNAL = 'calls an external service'
+
+BUDGETS: List[Budget] = [
+    # api_bp
+    Budget('api.api_state', '/api/state', 6),
+    Budget('api.api_me', '/api/me', 3),
+    Budget('api.api_event', '/api/event', 5),
+    Budget('api.api_tally', '/api/tally', 5),
+    Budget('api.api_vote', '/api/vote', 12, 'POST', {'choice': '{option}'}),
+    Budget('api.api_my_vote', '/api/my-vote', 5),
+    Budget('api.api_history', '/api/history', 7),
+    Budget('api.api_messages', '/api/messages', 6),
+    Budget('api.api_projects', '/api/projects', 10),
+    Budget('api.api_project_vote', '/api/projects/vote', 12, 'POST', {'project_id': '{project_id}'}),
+    Budget('api.get_announcement', '/api/announcement', 3),
+    # admin_bp
+    Budget('admin.api_tick', '/api/admin/tick', 0, 'POST', skip=EXTERNAL),
+    Budget('admin.reset_simulation_route', '/api/admin/reset-simulation', 0, 'POST', skip='destroys the dataset'),
+    Budget('admin.test_notification', '/api/admin/test-notification', 0, 'POST', skip=EXTERNAL),
+    Budget('admin.test_ai_generation', '/api/admin/test-ai', 0, 'POST', skip=EXTERNAL),
+    Budget('admin.cancel_test_reminders', '/api/admin/cancel-test-reminders', 0, 'POST', skip=EXTERNAL),
+    Budget('admin.list_projects', '/api/admin/projects', 3),
+    Budget('admin.create_project', '/api/admin/projects', 4, 'POST', {
+        'name': 'Budget Project', 'description': 'x', 'cost': 10, 'buff_type': 'morale', 'buff_value': 1, 'icon': 'x'
+    }),
+    Budget('admin.update_project', '/api/admin/projects/{project_id}', 4, 'PUT', {'cost': 11}),
+    Budget('admin.api_metrics', '/api/admin/metrics', 7),
+    Budget('admin.api_metrics_timeline', '/api/admin/metrics/timeline', 5),
+    Budget('admin.api_history', '/api/admin/history', 7),
+    # Flushes this worker's telemetry buffers first (two executemany inserts)
+    Budget('admin.api_telemetry', '/api/admin/telemetry', 4),
+    Budget('admin.api_db_stats', '/api/admin/db-stats', 1),
+    Budget('admin.api_slow_queries', '/api/admin/slow-queries', 3),
+    Budget('admin.api_telemetry_daily', '/api/admin/telemetry/daily', 5),
+    Budget('admin.api_llm_usage', '/api/admin/llm-usage', 3),
+    Budget('admin.list_events', '/api/admin/events', 3),
+    Budget('admin.create_event', '/api/admin/events', 5, 'POST', {
+        'event_id': 'budget_event_new', 'headline': 'h', 'description': 'd',
+        'options': [{'key': 'a', 'label': 'A', 'deltas': {'morale': 1, 'supplies': 0, 'threat': 0}},
+                    {'key': 'b', 'label': 'B', 'deltas': {'morale': 0, 'supplies': 1, 'threat': 0}}]
+    }),
+    Budget('admin.update_event', '/api/admin/events/{event_id}', 4, 'PUT', {'headline': 'h2'}),
+    Budget('admin.toggle_event', '/api/admin/events/{event_id}/toggle', 4, 'POST'),
+    Budget('admin.delete_event', '/api/admin/events/{event_id}', 4, 'DELETE'),
+    Budget('admin.list_users', '/api/admin/users', 3),
+    Budget('admin.get_user', '/api/admin/users/{user_id}', 7),
+    Budget('admin.toggle_admin', '/api/admin/users/{other_user_id}/admin', 6, 'POST'),
+    Budget('admin.delete_user', '/api/admin/users/{other_user_id}', 12, 'DELETE'),
+    Budget('admin.user_stats', '/api/admin/users/stats', 2),
+    Budget('admin.create_announcement', '/api/admin/announce', 8, 'POST', {
+        'title': 'Budget', 'content': 'Announcement', 'send_notification': False
+    }),
+    Budget('admin.list_broadcasts', '/api/admin/broadcasts', 2),
+    Budget('admin.get_broadcast', '/api/admin/broadcasts/{job_id}', 2),
+    Budget('admin.resume_broadcast', '/api/admin/broadcasts/{job_id}/resume', 4, 'POST'),
+]
+
+
+def missing_budgets(app) -> List[str]:
+    """api/admin endpoints without a Budget entry"""
+    covered = {b.endpoint for b in BUDGETS}
+    return sorted(
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.endpoint.split('.')[0] in ('api', 'admin') and rule.endpoint not in covered
+    )
+
+
+def _seed(app) -> dict:
+    """Users, finalized past days with votes, today's votes and threaded messages"""
+    from ..db import db
+    from ..models import User, Day, Event, WorldState, Vote, CommunityMessage
+    from ..models_custom_events import CustomEvent
+    from ..models_projects import Project
+    from ..routes.api import get_current
+    from .broadcasts import create_broadcast_job
+    from .user_stats import rebuild_user_stats
+
+    with app.app_context():
+        users = [User(provider='keyn', provider_user_id=f'budget-{i}', display_name=f'User {i}',
+                      email=f'user{i}@example.com', is_admin=(i == 0)) for i in range(SEED_USERS)]
+        db.session.add_all(users)
+        db.session.flush()
+
+        today, _, today_event = get_current()
+        options = [o['key'] if isinstance(o, dict) else o for o in today_event.options]
+        for n in range(SEED_DAYS, 0, -1):
+            day = Day(est_date=today.est_date - timedelta(days=n), chosen_option=options[0])
+            db.session.add(day)
+            db.session.flush()
+            db.session.add(Event(day_id=day.id, headline=f'Day {n}', description='Seeded', options=today_event.options))
+            db.session.add(WorldState(day_id=day.id, morale=60, supplies=60, threat=20, last_event='Seeded'))
+            db.session.add_all([Vote(day_id=day.id, user_id=u.id, option=options[i % len(options)])
+                                for i, u in enumerate(users)])
+
+        # Today: every user but the first two has voted, and the feed has threads
+        db.session.add_all([Vote(day_id=today.id, user_id=u.id, option=options[i % len(options)])
+                            for i, u in enumerate(users[2:])])
+        for m in range(SEED_MESSAGES_PER_DAY):
+            msg = CommunityMessage(day_id=today.id, author_name=f'Citizen {m}', avatar_seed=str(m),
+                                   content='Seeded message', sentiment='neutral')
+            db.session.add(msg)
+            db.session.flush()
+            db.session.add_all([CommunityMessage(day_id=today.id, parent_id=msg.id, author_name=f'Reply {r}',
+                                                 avatar_seed=str(r), content='Seeded reply', sentiment='neutral')
+                                for r in range(SEED_REPLIES_PER_MESSAGE)])
+
+        event = CustomEvent(event_id='budget_event', headline='h', description='d', options=[
+            {'key': 'a', 'label': 'A', 'deltas': {'morale': 1, 'supplies': 0, 'threat': 0}},
+            {'key': 'b', 'label': 'B', 'deltas': {'morale': 0, 'supplies': 1, 'threat': 0}},
+        ], created_by=users[0].id)
+        db.session.add(event)
+        project = Project(name='Budget Wall', description='Seeded', cost=50, buff_type='threat',
+                          buff_value=1, icon='wall', hidden=False)
+        db.session.add(project)
+        job = create_broadcast_job('announcements', 'Seeded', 'Seeded broadcast')
+        job.status = 'failed'  # so it can be resumed
+        rebuild_user_stats(db.session)
+        db.session.commit()
+
+        return {
+            'user_id': users[0].id,
+            'other_user_id': users[-1].id,
+            'voter_id': users[1].id,
+            'day_id': today.id,
+            'event_id': event.id,
+            'project_id': project.id,
+            'job_id': job.id,
+            'option': options[0],
+        }
+
+
+def budget_env(directory) -> dict:
+    """
+    Create an app on a fresh SQLite database in `directory`, seed it and
+    return {'app', 'client', 'ids'} for assert_query_budget().
+    """
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(str(directory), 'budget.db')}"
+    from .. import create_app
+    app = create_app(init_db=True)
+    ids = _seed(app)
+    client = app.test_client()
+    # Warm up lazy per-day work (message generation) so it isn't counted
+    client.get('/api/messages')
+    return {'app': app, 'client': client, 'ids': ids}
+
+
+def _fill(value, ids: dict):
+    if isinstance(value, str):
+        filled = value.format(**ids)
+        return int(filled) if value.startswith('{') and filled.isdigit() else filled
+    if isinstance(value, dict):
+        return {k: _fill(v, ids) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, ids) for v in value]
+    return value
+
+
+def measure(env: dict, budget: Budget) -> dict:
+    """Run one request for `budget` and return its status and statements"""
+    client, ids = env['client'], env['ids']
+    with client.session_transaction() as session:
+        session['user_id'] = ids['user_id'] if budget.as_admin else ids['voter_id']
+    with count_queries() as statements:
+        response = client.open(budget.path.format(**ids), method=budget.method, json=_fill(budget.json, ids))
+    return {'status': response.status_code, 'queries': len(statements), 'statements': statements}
+
+
+def assert_query_budget(env: dict, budget: Budget) -> int:
+    """Fail if the endpoint errors or runs more statements than its budget. Returns the count."""
+    if budget.skip:
+        try:
+            import pytest
+            pytest.skip(budget.skip)
+        except ImportError:
+            return 0
+    result = measure(env, budget)
+    if result['status'] >= 500:
+        raise QueryBudgetExceeded(f"{budget.method} {budget.path} returned {result['status']}")
+    if result['queries'] > budget.max_queries:
+        listing = '\n'.join(f"  {i + 1}. {s.splitlines()[0][:160]}" for i, s in enumerate(result['statements']))
+        raise QueryBudgetExceeded(
+            f"{budget.method} {budget.path} ran {result['queries']} queries, budget is {budget.max_queries}:\n{listing}"
+        )
+    return result['queries']
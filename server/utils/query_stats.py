@@ -0,0 +1,129 @@
+"""
+Per-request SQL query counting.
+
+Cursor-execute hooks on the engine count the statements each request runs
+and the time spent in the database. Outside production (APP_ENV) every
+response carries X-DB-Queries and X-DB-Time headers, and each worker keeps
+per-endpoint aggregates that admins can read from /api/admin/db-stats, so
+an N+1 shows up in development instead of in production.
+
+count_queries() records statements outside a request too; query_budget.py
+builds the endpoint query budgets on it. Statements slower than
+SLOW_QUERY_MS go to the slow-query log (slow_queries.py).
+"""
+from contextlib import contextmanager
+from time import perf_counter
+from typing import List
+import os
+import threading
+import logging
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+from ..db import db
+from . import slow_queries
+
+logger = logging.getLogger(__name__)
+
+# Log requests that run more statements than this
+WARN_QUERIES = int(os.getenv('DB_QUERY_WARN', '50'))
+SLOW_SECONDS = slow_queries.SLOW_QUERY_MS / 1000
+
+_routes = {}
+_routes_lock = threading.Lock()
+_recorders = threading.local()
+
+
+def _on_before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(perf_counter())
+
+
+def _on_after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    elapsed = perf_counter() - starts.pop() if starts else 0.0
+    if SLOW_SECONDS and elapsed >= SLOW_SECONDS:
+        slow_queries.capture(conn, statement, parameters, executemany, elapsed)
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_time += elapsed
+    for recorder in getattr(_recorders, 'stack', ()):
+        recorder.append(statement)
+
+
+def _after_request(response):
+    if 'db_queries' not in g:
+        return response
+    queries, db_ms = g.db_queries, g.db_time * 1000
+    endpoint = request.endpoint or request.path
+    with _routes_lock:
+        stats = _routes.setdefault(endpoint, {
+            'endpoint': endpoint, 'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'max_db_ms': 0.0
+        })
+        stats['requests'] += 1
+        stats['queries'] += queries
+        stats['max_queries'] = max(stats['max_queries'], queries)
+        stats['db_ms'] += db_ms
+        stats['max_db_ms'] = max(stats['max_db_ms'], db_ms)
+    if queries > WARN_QUERIES:
+        logger.warning(f"{request.method} {request.path} ran {queries} queries ({db_ms:.1f} ms)")
+    if g.get('db_headers'):
+        response.headers['X-DB-Queries'] = str(queries)
+        response.headers['X-DB-Time'] = f"{db_ms:.1f}"
+    return response
+
+
+def init_app(app):
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _on_before_execute):
+        event.listen(engine, 'before_cursor_execute', _on_before_execute)
+        event.listen(engine, 'after_cursor_execute', _on_after_execute)
+    slow_queries.init_app(app)
+
+    headers = app.config.get('APP_ENV', 'development') != 'production'
+
+    @app.before_request
+    def _start_query_count():
+        g.db_queries = 0
+        g.db_time = 0.0
+        g.db_headers = headers
+
+    app.after_request(_after_request)
+
+
+def route_stats() -> List[dict]:
+    """Per-endpoint aggregates for this worker, heaviest total DB time first"""
+    with _routes_lock:
+        rows = [dict(s) for s in _routes.values()]
+    for row in rows:
+        row['avg_queries'] = round(row['queries'] / row['requests'], 1)
+        row['avg_db_ms'] = round(row['db_ms'] / row['requests'], 2)
+        row['db_ms'] = round(row['db_ms'], 1)
+        row['max_db_ms'] = round(row['max_db_ms'], 1)
+    return sorted(rows, key=lambda r: r['db_ms'], reverse=True)
+
+
+def reset_route_stats():
+    with _routes_lock:
+        _routes.clear()
+
+
+@contextmanager
+def count_queries():
+    """
+    Collect the SQL statements run on this thread inside the block:
+
+        with count_queries() as statements:
+            client.get('/api/state')
+        assert len(statements) <= 5
+    """
+    statements = []
+    stack = getattr(_recorders, 'stack', None)
+    if stack is None:
+        stack = _recorders.stack = []
+    stack.append(statements)
+    try:
+        yield statements
+    finally:
+        stack.remove(statements)
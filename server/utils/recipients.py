@@ -0,0 +1,117 @@
+"""
+Streaming notification recipients.
+
+Bulk senders only need users.provider_user_id, so these helpers select that
+one column instead of loading a User object per row, and stream it in
+fixed-size chunks so memory stays flat however many users there are. Pass
+iter_recipient_ids() straight to nolofication.send_bulk_notification_batched()
+and the first batches go out before the rest of the list has been read.
+"""
+from typing import Iterator, List, Tuple
+import os
+
+from sqlalchemy import select, func, exists
+
+from ..db import db
+
+CHUNK_SIZE = int(os.getenv('RECIPIENT_CHUNK_SIZE', '1000'))
+# Fixed bulk batch size for per-day sends. Batches keep the same idempotency
+# keys when a failed send is retried, so Nolofication can drop repeats.
+BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', '500'))
+
+
+def _users():
+    # Core table rather than the mapped class: these queries return plain
+    # column values, and skipping the ORM result layer halves the per-row cost
+    from ..models import User
+    return User.__table__
+
+
+def _recipients():
+    users = _users()
+    return select(users.c.provider_user_id).where(users.c.provider_user_id.isnot(None)).order_by(users.c.id)
+
+
+def has_recipients() -> bool:
+    from ..models import User
+    return db.session.query(User.id).filter(User.provider_user_id.isnot(None)).first() is not None
+
+
+def count_recipients() -> int:
+    from ..models import User
+    return db.session.query(func.count(User.id)).filter(User.provider_user_id.isnot(None)).scalar() or 0
+
+
+def iter_recipient_chunks(chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    Yield provider_user_ids in lists of `chunk_size`, in users.id order, from a
+    single streamed (server-side cursor) query.
+
+    The query stays open until the generator is exhausted or closed. With
+    SQLite that holds a read transaction for the whole send, which is fine
+    under WAL; for jobs that must survive restarts use iter_recipient_pages().
+    """
+    result = db.session.execute(
+        _recipients().execution_options(yield_per=chunk_size, stream_results=True)
+    )
+    try:
+        for partition in result.scalars().partitions(chunk_size):
+            yield list(partition)
+    finally:
+        result.close()
+
+
+def iter_recipient_ids(chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Every recipient's provider_user_id, streamed one at a time"""
+    for chunk in iter_recipient_chunks(chunk_size):
+        yield from chunk
+
+
+def _non_voters(day_id: int):
+    """
+    Recipients with no vote on `day_id`, as a NOT EXISTS anti-join. The probe
+    is answered from the (day_id, user_id) index behind uq_vote_user_per_day,
+    so the database never materializes the day's votes.
+    """
+    from ..models import Vote
+    votes = Vote.__table__
+    voted = exists().where(votes.c.day_id == day_id).where(votes.c.user_id == _users().c.id)
+    return _recipients().where(~voted)
+
+
+def iter_non_voter_ids(day_id: int, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """provider_user_ids of users who haven't voted on `day_id`, streamed"""
+    result = db.session.execute(
+        _non_voters(day_id).execution_options(yield_per=chunk_size, stream_results=True)
+    )
+    try:
+        for partition in result.scalars().partitions(chunk_size):
+            yield from partition
+    finally:
+        result.close()
+
+
+def recipient_page(after_user_id: int, limit: int = CHUNK_SIZE) -> List[Tuple[int, str]]:
+    """
+    One keyset page of (users.id, provider_user_id) after `after_user_id`.
+    Each page is a short independent query, so a caller can persist the last
+    id as a cursor and resume from it later.
+    """
+    users = _users()
+    return db.session.execute(
+        select(users.c.id, users.c.provider_user_id)
+        .where(users.c.id > after_user_id)
+        .where(users.c.provider_user_id.isnot(None))
+        .order_by(users.c.id)
+        .limit(limit)
+    ).all()
+
+
+def iter_recipient_pages(after_user_id: int = 0, limit: int = CHUNK_SIZE) -> Iterator[List[Tuple[int, str]]]:
+    """Keyset pages of (users.id, provider_user_id), starting after `after_user_id`"""
+    while True:
+        page = recipient_page(after_user_id, limit)
+        if not page:
+            return
+        yield page
+        after_user_id = page[-1][0]
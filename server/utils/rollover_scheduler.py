@@ -0,0 +1,199 @@
+"""
+Leader-elected day rollover.
+
+With ROLLOVER_SCHEDULER=1 every gunicorn worker runs a scheduler thread
+(started from gunicorn.conf.py), but only the holder of the 'rollover' lease
+acts on it. The lease is a row in rollover_leases with the holder's host:pid
+and an expiry, renewed by the leader every LEASE_SECONDS / 3. The other
+workers only read it on that cadence and try to take it once it has expired,
+so a dead leader is replaced within a lease without every worker writing.
+The threads wake right after EST midnight and the leader finalizes yesterday
+and creates today.
+
+Meanwhile requests don't start the rollover themselves: get_current() keeps
+serving the latest committed day for up to ROLLOVER_GRACE_SECONDS after
+midnight (see defer_rollover()), then falls back to ensure_today() in case
+no leader is alive. scripts/tick_day.py takes the same lease, so a cron tick
+and the scheduler don't roll over together; once the rollover is overdue
+(see rollover_overdue()) it goes ahead anyway, as a fallback for a leader
+that holds the lease but isn't rolling over.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import os
+import socket
+import threading
+import logging
+
+from sqlalchemy import update, insert, select, or_, case
+from sqlalchemy.exc import IntegrityError
+
+from ..db import db
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = 'rollover'
+LEASE_SECONDS = int(os.getenv('ROLLOVER_LEASE_SECONDS', '60'))
+# Held through the rollover itself, which waits on OpenRouter
+ROLLOVER_HOLD_SECONDS = 600
+GRACE_SECONDS = int(os.getenv('ROLLOVER_GRACE_SECONDS', '300'))
+
+
+def enabled() -> bool:
+    return os.getenv('ROLLOVER_SCHEDULER', '0').lower() in ('1', 'true', 'yes')
+
+
+def holder_id(prefix: str = '') -> str:
+    return f"{prefix}{socket.gethostname()}:{os.getpid()}"
+
+
+def _table():
+    from ..models import RolloverLease
+    return RolloverLease.__table__
+
+
+def acquire(holder: str, seconds: int = LEASE_SECONDS) -> bool:
+    """Take or renew the lease for `seconds`. False while someone else holds it."""
+    table = _table()
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=seconds)
+    with db.engine.begin() as conn:
+        # Write first: a read followed by a write can fail on SQLite if another
+        # process commits in between
+        res = conn.execute(
+            update(table)
+            .where(table.c.name == LEASE_NAME)
+            .where(or_(table.c.holder == holder, table.c.expires_at < now))
+            .values(holder=holder, heartbeat_at=now, expires_at=expires,
+                    acquired_at=case((table.c.holder == holder, table.c.acquired_at), else_=now))
+        )
+        if res.rowcount == 1:
+            return True
+        if conn.execute(select(table.c.name).where(table.c.name == LEASE_NAME)).first():
+            return False
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(table).values(
+                name=LEASE_NAME, holder=holder, acquired_at=now, heartbeat_at=now, expires_at=expires
+            ))
+        return True
+    except IntegrityError:
+        return False
+
+
+def held_by_other(holder: str) -> bool:
+    """Whether someone else holds an unexpired lease (a read, no write)"""
+    table = _table()
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            select(table.c.holder, table.c.expires_at).where(table.c.name == LEASE_NAME)
+        ).first()
+    return row is not None and row.holder != holder and row.expires_at >= datetime.utcnow()
+
+
+def release(holder: str):
+    """Let the lease go now instead of at expiry"""
+    table = _table()
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(table)
+            .where(table.c.name == LEASE_NAME, table.c.holder == holder)
+            .values(expires_at=datetime.utcnow())
+        )
+
+
+def _est_now() -> datetime:
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo('America/New_York'))
+
+
+def seconds_since_midnight() -> float:
+    now = _est_now()
+    return (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+
+
+def seconds_until_midnight() -> float:
+    now = _est_now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def defer_rollover() -> bool:
+    """Whether a request that finds no day for today should leave the rollover to the leader"""
+    return enabled() and seconds_since_midnight() < GRACE_SECONDS
+
+
+def _today_missing() -> bool:
+    from ..models import Day
+    from ..routes import api
+    return Day.query.filter_by(est_date=api.est_today()).first() is None
+
+
+def rollover_overdue() -> bool:
+    """Today's day still doesn't exist ROLLOVER_GRACE_SECONDS after midnight"""
+    return seconds_since_midnight() >= GRACE_SECONDS and _today_missing()
+
+
+class RolloverScheduler(threading.Thread):
+    def __init__(self, app):
+        super().__init__(name='rollover-scheduler', daemon=True)
+        self.app = app
+        self.holder = holder_id()
+        self.leader = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        with self.app.app_context():
+            while not self._stop_event.is_set():
+                try:
+                    self.tick()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.exception(f"Rollover scheduler tick failed: {e}")
+                finally:
+                    db.session.remove()
+                # Heartbeat, or wake just after midnight, whichever is first
+                self._stop_event.wait(max(0.05, min(LEASE_SECONDS / 3, seconds_until_midnight() + 0.05)))
+
+    def tick(self):
+        # Followers only write once the leader's lease has run out
+        leader = (self.leader or not held_by_other(self.holder)) and acquire(self.holder)
+        if leader != self.leader:
+            logger.info(f"{self.holder} {'now leads' if leader else 'no longer leads'} the day rollover")
+            self.leader = leader
+        if leader and _today_missing():
+            self.rollover()
+
+    def rollover(self):
+        from ..routes.api import ensure_today
+        acquire(self.holder, ROLLOVER_HOLD_SECONDS)
+        try:
+            day = ensure_today()
+            logger.info(f"Rolled over to day {day.id if day else None} as leader")
+        finally:
+            acquire(self.holder)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.leader:
+            with self.app.app_context():
+                release(self.holder)
+
+
+_scheduler: Optional[RolloverScheduler] = None
+
+
+def start(app) -> Optional[RolloverScheduler]:
+    """Start this process's scheduler thread (a no-op unless ROLLOVER_SCHEDULER is set)"""
+    global _scheduler
+    if enabled() and _scheduler is None:
+        _scheduler = RolloverScheduler(app)
+        _scheduler.start()
+    return _scheduler
+
+
+def stop():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
@@ -0,0 +1,82 @@
+"""
+Phase timings for the day rollover.
+
+finalize_day and ensure_today each run a RolloverTrace. finalize_day marks
+its steps in sequence with phase(); ensure_today wraps its steps in span().
+Every phase also feeds the rollover_phase_duration_seconds metric, and the
+finished trace is stored in rollover_traces (after the rollover's own commit,
+on a separate connection) for the admin history waterfall.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
+import logging
+
+from ..db import db
+from .metrics import rollover_phase_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class RolloverTrace:
+    def __init__(self, kind: str, day_id: Optional[int] = None):
+        self.kind = kind  # finalize, create_day
+        # finish() status: ok, skipped (finalized elsewhere), race (day created
+        # elsewhere) or error (the rollover raised)
+        self.day_id = day_id
+        self.started_at = datetime.utcnow()
+        self._start = perf_counter()
+        self._current = None  # (name, start) of the open phase()
+        self.spans = []
+        self.finished = False
+
+    def _record(self, name: str, started: float):
+        ended = perf_counter()
+        self.spans.append({
+            'name': name,
+            'start_ms': round((started - self._start) * 1000, 2),
+            'duration_ms': round((ended - started) * 1000, 2)
+        })
+        # ensure_today's phases keep their plain names (finalize, event, ...)
+        label = name if self.kind == 'create_day' else f"{self.kind}.{name}"
+        rollover_phase_seconds.labels(label).observe(ended - started)
+
+    def phase(self, name: str):
+        """End the open phase, if any, and start `name`"""
+        if self._current:
+            self._record(*self._current)
+        self._current = (name, perf_counter())
+
+    @contextmanager
+    def span(self, name: str):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, started)
+
+    def finish(self, status: str = 'ok'):
+        """Close the open phase and store the trace (once). Never raises."""
+        if self.finished:
+            return
+        self.finished = True
+        if self._current:
+            self._record(*self._current)
+            self._current = None
+        total_ms = round((perf_counter() - self._start) * 1000, 2)
+        try:
+            from ..models_metrics import RolloverTrace as RolloverTraceRow
+            with db.engine.begin() as conn:
+                conn.execute(RolloverTraceRow.__table__.insert(), {
+                    'day_id': self.day_id,
+                    'kind': self.kind,
+                    'status': status,
+                    'started_at': self.started_at,
+                    'total_ms': total_ms,
+                    'spans': self.spans
+                })
+        except Exception as e:
+            logger.warning(f"Failed to store {self.kind} trace for day {self.day_id}: {e}")
+        logger.info(f"Rollover {self.kind} for day {self.day_id} took {total_ms:.0f} ms ({status}): " +
+                    ', '.join(f"{s['name']} {s['duration_ms']:.0f}" for s in self.spans))
@@ -0,0 +1,103 @@
+"""
+Slow-query log.
+
+query_stats' cursor hooks hand any statement that ran longer than
+SLOW_QUERY_MS to capture(), which records its SQL, the types of its bound
+parameters, the duration, the route (or background thread) that ran it and,
+on SQLite, its EXPLAIN QUERY PLAN. Rows are buffered like telemetry and the
+table is trimmed to the newest SLOW_QUERY_KEEP after each insert, so it acts
+as a ring buffer. Fast statements cost one float comparison.
+"""
+from datetime import datetime
+from typing import Optional
+import os
+import re
+import threading
+import logging
+
+from flask import request, has_request_context
+from sqlalchemy import delete, select, func
+
+from .telemetry import BufferedWriter
+
+logger = logging.getLogger(__name__)
+
+# 0 turns the log off
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+SLOW_QUERY_KEEP = int(os.getenv('SLOW_QUERY_KEEP', '500'))
+
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+# "SCAN votes" / "SCAN TABLE votes" (older SQLite); index scans say "USING"
+_FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+
+def _table():
+    from ..models_metrics import SlowQuery
+    return SlowQuery.__table__
+
+
+def _trim(conn):
+    table = _table()
+    newest = conn.execute(select(func.max(table.c.id))).scalar() or 0
+    conn.execute(delete(table).where(table.c.id <= newest - SLOW_QUERY_KEEP))
+
+
+# Never flushed inline: capture() runs inside another statement's hook, possibly
+# while that connection holds SQLite's write lock
+slow_query_writer = BufferedWriter(_table, 'slow_queries', flush_size=0, after_insert=_trim)
+
+
+def init_app(app):
+    slow_query_writer.init_app(app)
+
+
+def _param_shape(parameters, executemany: bool) -> Optional[str]:
+    """Parameter types, e.g. '(int, str)'; values are never stored"""
+    if not parameters:
+        return None
+    prefix = ''
+    if executemany:
+        prefix = f"{len(parameters)} x "
+        parameters = parameters[0]
+    if isinstance(parameters, dict):
+        shape = '{' + ', '.join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + '}'
+    else:
+        shape = '(' + ', '.join(type(v).__name__ for v in parameters) + ')'
+    return (prefix + shape)[:255]
+
+
+def _explain(conn, statement: str, parameters, executemany: bool) -> Optional[str]:
+    if conn.dialect.name != 'sqlite' or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    try:
+        # A raw DBAPI cursor, so this doesn't go through the engine hooks again
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"(plan unavailable: {e})"
+    return '\n'.join(row[3] for row in rows)
+
+
+def capture(conn, statement: str, parameters, executemany: bool, elapsed: float):
+    """Record one slow statement (called from query_stats' after_cursor_execute hook)"""
+    if 'slow_queries' in statement:
+        return
+    try:
+        plan = _explain(conn, statement, parameters, executemany)
+        route = (request.endpoint or request.path) if has_request_context() else threading.current_thread().name
+        slow_query_writer.add({
+            'created_at': datetime.utcnow(),
+            'duration_ms': round(elapsed * 1000, 2),
+            'statement': statement,
+            'params': _param_shape(parameters, executemany),
+            'route': route[:128],
+            'plan': plan,
+            'full_scan': any(_FULL_SCAN.match(line) for line in (plan or '').splitlines()),
+        })
+    except Exception as e:
+        logger.warning(f"Failed to record slow query: {e}")
@@ -0,0 +1,165 @@
+"""
+Buffered telemetry writer.
+
+record_event() appends to an in-process buffer instead of adding a Telemetry
+row to the request's transaction. A background thread bulk-inserts the buffer
+with a single executemany on its own connection every FLUSH_SECONDS, or as
+soon as FLUSH_SIZE rows are waiting, and at interpreter exit; requests never
+write it themselves. Events that
+must not be lost on a crash (auto_tick, admin actions) pass durable=True and
+are written in the caller's transaction as before.
+"""
+from datetime import datetime
+from typing import Optional
+import atexit
+import os
+import threading
+import logging
+
+from ..db import db
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = int(os.getenv('TELEMETRY_FLUSH_SIZE', '200'))
+FLUSH_SECONDS = float(os.getenv('TELEMETRY_FLUSH_SECONDS', '2.0'))
+# Rows kept for retry while the database is unavailable; older ones are dropped
+MAX_BUFFERED = int(os.getenv('TELEMETRY_MAX_BUFFERED', '10000'))
+
+
+class BufferedWriter:
+    """Collects rows for one table and inserts them in batches"""
+
+    def __init__(self, table_getter, name: str, flush_size: int = FLUSH_SIZE, flush_seconds: float = FLUSH_SECONDS,
+                 after_insert=None):
+        self._table_getter = table_getter
+        self._after_insert = after_insert  # called with the connection, in the insert's transaction
+        # flush_size=0: the background thread only flushes on its timer
+        self.name = name
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._engine = None
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.dropped = 0
+        atexit.register(self.close)
+
+    def init_app(self, app):
+        with app.app_context():
+            self._engine = db.engine
+
+    def _ensure_thread(self):
+        # Started lazily and restarted after a fork (gunicorn workers), since
+        # threads don't survive fork
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        stop, wake = self._stop, self._wake
+        while not stop.is_set():
+            wake.wait(self.flush_seconds)
+            wake.clear()
+            if not stop.is_set():
+                self.flush()
+
+    def add(self, row: dict):
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) > MAX_BUFFERED:
+                del self._rows[0]
+                self.dropped += 1
+            size = len(self._rows)
+        if self._engine is None:
+            return
+        self._ensure_thread()
+        # Hand the insert to the flusher rather than doing it on the request
+        # thread. Only on crossing the threshold, so a failing flush retries
+        # on the timer instead of on every add.
+        if self.flush_size and size == self.flush_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Insert everything buffered so far. Returns the number of rows written."""
+        if self._engine is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with self._engine.begin() as conn:
+                    conn.execute(self._table_getter().insert(), rows)
+                    if self._after_insert:
+                        self._after_insert(conn)
+                return len(rows)
+            except Exception as e:
+                with self._lock:
+                    # Put them back in front of anything added meanwhile
+                    self._rows = rows + self._rows
+                    overflow = len(self._rows) - MAX_BUFFERED
+                    if overflow > 0:
+                        del self._rows[:overflow]
+                        self.dropped += overflow
+                logger.warning(f"Failed to flush {len(rows)} {self.name} rows, will retry: {e}")
+                return 0
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+
+def _telemetry_table():
+    from ..models import Telemetry
+    return Telemetry.__table__
+
+
+def _llm_usage_table():
+    from ..models_metrics import LlmUsage
+    return LlmUsage.__table__
+
+
+telemetry_writer = BufferedWriter(_telemetry_table, 'telemetry')
+llm_usage_writer = BufferedWriter(_llm_usage_table, 'llm_usage')
+
+
+def init_app(app):
+    telemetry_writer.init_app(app)
+    llm_usage_writer.init_app(app)
+
+
+def record_event(event_type: str, payload: Optional[dict] = None, user_id: Optional[int] = None,
+                 durable: bool = False):
+    """
+    Record a telemetry event.
+    durable=True writes it in the caller's transaction (committed with it);
+    otherwise it is buffered and bulk-inserted shortly after.
+    """
+    if durable:
+        from ..models import Telemetry
+        db.session.add(Telemetry(event_type=event_type, payload=payload or {}, user_id=user_id))
+        return
+    telemetry_writer.add({
+        'event_type': event_type,
+        'payload': payload or {},
+        'user_id': user_id,
+        'created_at': datetime.utcnow()
+    })
+
+
+def flush_all() -> int:
+    return telemetry_writer.flush() + llm_usage_writer.flush()
@@ -0,0 +1,216 @@
+"""
+Telemetry rollups and retention.
+
+rollup_telemetry() aggregates raw telemetry into telemetry_daily (counts per
+UTC date, event type and key) and tick_outcomes (one row per auto_tick).
+Rolling up a date replaces its previous rollup, so it is safe to re-run, and
+today is re-rolled on every run so admin stats stay current.
+
+prune_telemetry() then deletes raw rows older than the retention window
+(only dates that have been rolled up), in small batches so votes are never
+blocked for long, and incremental_vacuum() returns the freed pages to the
+filesystem. Audit events (AUDIT_EVENTS) are kept regardless of age.
+
+run_nightly() records each run as a 'telemetry_retention' audit event, so
+last_nightly_run() survives dispatcher restarts.
+"""
+from datetime import datetime, date, timedelta
+from typing import Optional
+import os
+import logging
+
+from sqlalchemy import func, case, select, delete, text, literal
+
+from ..db import db
+from ..models import Telemetry
+from ..models_metrics import TelemetryDaily, TickOutcome
+from .telemetry import flush_all, record_event
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv('TELEMETRY_RETENTION_DAYS', '30'))
+PRUNE_BATCH_SIZE = 5000
+NIGHTLY_EVENT = 'telemetry_retention'
+# Durable records of who did what; retention never deletes these
+AUDIT_EVENTS = ('auto_tick', 'admin_toggle', 'user_delete', NIGHTLY_EVENT)
+
+
+def _day_range(day: date):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def _key_expr():
+    """The per-event-type breakdown key, read from the JSON payload"""
+    return case(
+        (Telemetry.event_type == 'vote', Telemetry.payload['choice'].as_string()),
+        (Telemetry.event_type == 'vote_changed', Telemetry.payload['new_choice'].as_string()),
+        (Telemetry.event_type == 'notification', Telemetry.payload['category'].as_string()),
+        else_=literal('')
+    )
+
+
+def rollup_date(day: date) -> int:
+    """Rebuild telemetry_daily and tick_outcomes for one UTC date. Returns rows written."""
+    start, end = _day_range(day)
+    key = func.coalesce(_key_expr(), '')
+    is_notification = Telemetry.event_type == 'notification'
+    rows = db.session.execute(
+        select(
+            Telemetry.event_type,
+            key.label('key'),
+            func.count().label('events'),
+            func.count(func.distinct(Telemetry.user_id)).label('unique_users'),
+            func.sum(case((is_notification, func.coalesce(
+                Telemetry.payload[('result', 'successful')].as_integer(), 0
+            ) + func.coalesce(
+                Telemetry.payload[('result', 'scheduled')].as_integer(), 0
+            )), else_=0)).label('sent'),
+            func.sum(case((is_notification, func.coalesce(
+                Telemetry.payload[('result', 'failed')].as_integer(), 0
+            )), else_=0)).label('failed'),
+        )
+        .where(Telemetry.created_at >= start, Telemetry.created_at < end)
+        .group_by(Telemetry.event_type, key)
+    ).all()
+
+    now = datetime.utcnow()
+    db.session.execute(delete(TelemetryDaily).where(TelemetryDaily.date == day))
+    if rows:
+        db.session.execute(TelemetryDaily.__table__.insert(), [{
+            'date': day,
+            'event_type': r.event_type,
+            'key': (r.key or '')[:64],
+            'events': r.events,
+            'unique_users': r.unique_users,
+            'sent': int(r.sent or 0),
+            'failed': int(r.failed or 0),
+            'updated_at': now
+        } for r in rows])
+
+    # Tick outcomes: at most one auto_tick per day, so these are few rows
+    ticks = db.session.execute(
+        select(Telemetry.payload, Telemetry.created_at)
+        .where(Telemetry.event_type == 'auto_tick')
+        .where(Telemetry.created_at >= start, Telemetry.created_at < end)
+    ).all()
+    for payload, created_at in ticks:
+        payload = payload or {}
+        if payload.get('day_id') is None:
+            continue
+        state = payload.get('new_state') or {}
+        values = {
+            'date': day,
+            'chosen': payload.get('chosen'),
+            'votes': sum((payload.get('tally') or {}).values()),
+            'disaster': payload.get('disaster'),
+            'morale': state.get('morale'),
+            'supplies': state.get('supplies'),
+            'threat': state.get('threat'),
+            'population': state.get('population'),
+            'created_at': created_at
+        }
+        outcome = TickOutcome.query.filter_by(day_id=payload['day_id']).first()
+        if outcome:
+            for k, v in values.items():
+                setattr(outcome, k, v)
+        else:
+            db.session.add(TickOutcome(day_id=payload['day_id'], **values))
+
+    db.session.commit()
+    return len(rows) + len(ticks)
+
+
+def rollup_telemetry(since: Optional[date] = None) -> dict:
+    """
+    Roll up every date from `since` (default: the last rolled-up date, or the
+    oldest raw row) through today.
+    """
+    # Include events still sitting in this process's write buffer
+    flush_all()
+    today = datetime.utcnow().date()
+    if since is None:
+        since = db.session.query(func.max(TelemetryDaily.date)).scalar()
+    if since is None:
+        oldest = db.session.query(func.min(Telemetry.created_at)).scalar()
+        since = oldest.date() if oldest else today
+
+    stats = {'dates': 0, 'rows': 0}
+    day = since
+    while day <= today:
+        stats['rows'] += rollup_date(day)
+        stats['dates'] += 1
+        day += timedelta(days=1)
+    return stats
+
+
+def prune_telemetry(retention_days: int = RETENTION_DAYS) -> int:
+    """Delete raw telemetry older than `retention_days` whose date has been rolled up (audit events are kept)"""
+    cutoff = datetime.combine(datetime.utcnow().date() - timedelta(days=retention_days), datetime.min.time())
+    rolled_through = db.session.query(func.max(TelemetryDaily.date)).scalar()
+    if rolled_through is None:
+        return 0
+    cutoff = min(cutoff, _day_range(rolled_through)[0])
+
+    deleted = 0
+    while True:
+        ids = select(Telemetry.id).where(
+            Telemetry.created_at < cutoff, Telemetry.event_type.notin_(AUDIT_EVENTS)
+        ).limit(PRUNE_BATCH_SIZE)
+        res = db.session.execute(delete(Telemetry).where(Telemetry.id.in_(ids)))
+        db.session.commit()
+        count = getattr(res, 'rowcount', 0) or 0
+        deleted += count
+        if count < PRUNE_BATCH_SIZE:
+            return deleted
+
+
+def incremental_vacuum(pages: int = 0) -> dict:
+    """
+    Return free pages to the filesystem (SQLite only). pages=0 frees all of
+    them. Needs auto_vacuum=INCREMENTAL, which new databases get from
+    db.configure_sqlite; older ones need a one-time enable_incremental_vacuum().
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return {}
+    with db.engine.connect() as conn:
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        free_before = conn.execute(text("PRAGMA freelist_count")).scalar()
+        if mode != 2:
+            return {'auto_vacuum': mode, 'free_pages': free_before, 'vacuumed': False}
+        # sqlite3's execute() only steps this pragma once (freeing a single
+        # page); executescript() runs it to completion
+        sql = f"PRAGMA incremental_vacuum({int(pages)});" if pages else "PRAGMA incremental_vacuum;"
+        conn.connection.driver_connection.executescript(sql)
+        free_after = conn.execute(text("PRAGMA freelist_count")).scalar()
+    return {'auto_vacuum': mode, 'freed_pages': free_before - free_after, 'free_pages': free_after, 'vacuumed': True}
+
+
+def enable_incremental_vacuum():
+    """Switch an existing database to auto_vacuum=INCREMENTAL (runs a full VACUUM once)"""
+    with db.engine.connect() as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return False
+        conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+        conn.commit()
+        # VACUUM can't run inside a transaction
+        conn.exec_driver_sql("VACUUM")
+    return True
+
+
+def run_nightly(retention_days: int = RETENTION_DAYS, vacuum_pages: int = 0) -> dict:
+    """Roll up, prune past the retention window, then vacuum"""
+    stats = rollup_telemetry()
+    stats['pruned'] = prune_telemetry(retention_days)
+    stats['vacuum'] = incremental_vacuum(vacuum_pages)
+    record_event(NIGHTLY_EVENT, stats, durable=True)
+    db.session.commit()
+    logger.info(f"Telemetry maintenance: {stats}")
+    return stats
+
+
+def last_nightly_run() -> Optional[datetime]:
+    """When run_nightly() last completed (from any process), or None"""
+    return db.session.query(func.max(Telemetry.created_at)).filter(
+        Telemetry.event_type == NIGHTLY_EVENT
+    ).scalar()
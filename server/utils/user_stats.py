@@ -0,0 +1,152 @@
+"""
+Incrementally maintained admin user statistics.
+
+The dashboard used to recompute these with full-table COUNTs and a DISTINCT
+scan of votes on every load. Instead, each change that affects them bumps a
+counter in user_stat_counters inside the same transaction:
+
+- signup:           total_users, provider:<name>, signups:<date>
+- admin toggle:     admin_users
+- first-ever vote:  active_users
+- user deletion:    all of the above that applied to the user
+
+compute_user_stats() recomputes everything from scratch; verify_user_stats.py
+compares the two and can rewrite the counters.
+"""
+from datetime import datetime, timedelta
+from typing import Dict
+import logging
+
+from sqlalchemy import select, delete, func, exists
+
+from ..db import db, upsert_insert
+from ..models import User, Vote
+from ..models_metrics import UserStatCounter
+
+logger = logging.getLogger(__name__)
+
+SIGNUP_WINDOW_DAYS = 30
+
+
+def _signup_key(created_at: datetime) -> str:
+    return f"signups:{created_at.date().isoformat()}"
+
+
+def bump(deltas: Dict[str, int]):
+    """Add `deltas` to the counters in the caller's session (committed with it)"""
+    insert = upsert_insert(db.session.get_bind())
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        stmt = insert(UserStatCounter).values(key=key, value=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['key'], set_={'value': UserStatCounter.value + delta}
+        )
+        db.session.execute(stmt)
+
+
+def user_created(user: User):
+    bump({
+        'total_users': 1,
+        f"provider:{user.provider}": 1,
+        _signup_key(user.created_at or datetime.utcnow()): 1,
+        'admin_users': 1 if user.is_admin else 0
+    })
+
+
+def admin_changed(is_admin: bool):
+    bump({'admin_users': 1 if is_admin else -1})
+
+
+def first_vote():
+    bump({'active_users': 1})
+
+
+def user_deleted(user: User):
+    has_voted = has_voted_before(user.id)
+    bump({
+        'total_users': -1,
+        f"provider:{user.provider}": -1,
+        _signup_key(user.created_at or datetime.utcnow()): -1,
+        'admin_users': -1 if user.is_admin else 0,
+        'active_users': -1 if has_voted else 0
+    })
+
+
+def has_voted_before(user_id: int) -> bool:
+    return db.session.query(exists().where(Vote.user_id == user_id)).scalar()
+
+
+def compute_user_stats(conn) -> Dict[str, int]:
+    """Every counter, recomputed from the users and votes tables"""
+    users = User.__table__
+    votes = Vote.__table__
+    counters = {
+        'total_users': conn.execute(select(func.count()).select_from(users)).scalar() or 0,
+        'admin_users': conn.execute(
+            select(func.count()).select_from(users).where(users.c.is_admin.is_(True))
+        ).scalar() or 0,
+        # Voters that still exist (votes of deleted users are left behind)
+        'active_users': conn.execute(
+            select(func.count()).select_from(users).where(
+                exists().where(votes.c.user_id == users.c.id)
+            )
+        ).scalar() or 0,
+    }
+    for provider, count in conn.execute(
+        select(users.c.provider, func.count()).group_by(users.c.provider)
+    ):
+        counters[f"provider:{provider}"] = count
+    for day, count in conn.execute(
+        select(func.date(users.c.created_at), func.count()).group_by(func.date(users.c.created_at))
+    ):
+        if day:
+            counters[f"signups:{day}"] = count
+    return counters
+
+
+def rebuild_user_stats(conn) -> Dict[str, int]:
+    """Replace the counters with freshly computed values"""
+    counters = compute_user_stats(conn)
+    conn.execute(delete(UserStatCounter.__table__))
+    conn.execute(UserStatCounter.__table__.insert(), [
+        {'key': key, 'value': value} for key, value in counters.items()
+    ])
+    return counters
+
+
+def verify_user_stats() -> Dict[str, tuple]:
+    """Counters that differ from a full recomputation, as {key: (stored, actual)}"""
+    stored = {c.key: c.value for c in UserStatCounter.query.all()}
+    actual = compute_user_stats(db.session)
+    return {
+        key: (stored.get(key, 0), actual.get(key, 0))
+        for key in set(stored) | set(actual)
+        if stored.get(key, 0) != actual.get(key, 0)
+    }
+
+
+def read_user_stats() -> dict:
+    """The admin dashboard numbers, from a single read of the counters"""
+    since = (datetime.utcnow() - timedelta(days=SIGNUP_WINDOW_DAYS)).date().isoformat()
+    rows = db.session.execute(
+        select(UserStatCounter.key, UserStatCounter.value).where(
+            ~UserStatCounter.key.startswith('signups:') | (UserStatCounter.key >= f"signups:{since}")
+        )
+    ).all()
+    counters = dict(rows)
+    total = counters.get('total_users', 0)
+    active = counters.get('active_users', 0)
+    admins = counters.get('admin_users', 0)
+    return {
+        'total_users': total,
+        'admin_users': admins,
+        'regular_users': total - admins,
+        'provider_breakdown': {
+            key.split(':', 1)[1]: value for key, value in counters.items()
+            if key.startswith('provider:') and value
+        },
+        'recent_signups_30d': sum(v for k, v in counters.items() if k.startswith('signups:')),
+        'active_users': active,
+        'inactive_users': total - active
+    }
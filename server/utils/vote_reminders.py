@@ -0,0 +1,84 @@
+"""
+Periodic reconciliation of pending vote reminders.
+
+Instead of cancelling a voter's reminders inside the vote request, the
+notification dispatcher periodically lists every pending `vote_reminders`
+notification once, diffs it against today's voters in bulk and cancels the
+stale ones with a bounded pool of workers.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from ..db import db
+from ..models import Day, Vote, User
+from .nolofication import nolofication
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def _list_pending_vote_reminders() -> list:
+    """Page through every pending vote reminder. Returns None if Nolofication errored."""
+    pending = []
+    offset = 0
+    while True:
+        page = nolofication.get_pending_notifications(category='vote_reminders', limit=PAGE_SIZE, offset=offset)
+        if 'error' in page:
+            logger.error(f"Failed to list pending vote reminders: {page['error']}")
+            return None
+        items = page.get('pending_notifications', [])
+        pending.extend(items)
+        if len(items) < PAGE_SIZE:
+            return pending
+        offset += len(items)
+
+
+def reconcile_vote_reminders(max_workers: int = 8) -> dict:
+    """
+    Cancel pending vote reminders that are no longer needed: the user has
+    already voted today, or the reminder is for an earlier day.
+    """
+    stats = {'pending': 0, 'stale': 0, 'cancelled': 0, 'errors': 0}
+    if not nolofication.is_configured():
+        return stats
+
+    day = Day.query.order_by(Day.id.desc()).first()
+    if not day:
+        return stats
+
+    # Everyone who voted today, as KeyN ids (one query)
+    voters = {
+        pid for (pid,) in db.session.query(User.provider_user_id)
+        .join(Vote, Vote.user_id == User.id)
+        .filter(Vote.day_id == day.id)
+        .all()
+        if pid
+    }
+
+    pending = _list_pending_vote_reminders()
+    if pending is None:
+        stats['errors'] += 1
+        return stats
+    stats['pending'] = len(pending)
+
+    stale_ids = []
+    for notif in pending:
+        meta = notif.get('metadata') or {}
+        reminder_day = meta.get('day_id')
+        if notif.get('user_id') in voters or (reminder_day is not None and reminder_day < day.id):
+            stale_ids.append(notif['id'])
+    stats['stale'] = len(stale_ids)
+
+    if not stale_ids:
+        return stats
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for result in pool.map(nolofication.cancel_pending_notification, stale_ids):
+            if result.get('message'):
+                stats['cancelled'] += 1
+            else:
+                stats['errors'] += 1
+
+    logger.info(f"Vote reminder reconcile for day {day.id}: {stats}")
+    return stats
@@ -42,24 +42,43 @@ const UserManager: React.FC = () => {
   const [selectedUser, setSelectedUser] = useState<UserDetail | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
-  const [page, setPage] = useState(1)
-  const [totalPages, setTotalPages] = useState(1)
+  // Keyset pagination: cursors[i] is the cursor that loads page i
+  const [cursors, setCursors] = useState<(number | null)[]>([null])
+  const [nextCursor, setNextCursor] = useState<number | null>(null)
+  const [total, setTotal] = useState(0)
+  const [searchInput, setSearchInput] = useState('')
+  const [search, setSearch] = useState('')
   const [showUserModal, setShowUserModal] = useState(false)
 
+  const page = cursors.length
+  const perPage = 50
+
   useEffect(() => {
     loadData()
-  }, [page])
+  }, [cursors, search])
+
+  // Debounce the search box, and start again from the first page
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      if (searchInput.trim() !== search) {
+        setSearch(searchInput.trim())
+        setCursors([null])
+      }
+    }, 300)
+    return () => clearTimeout(timer)
+  }, [searchInput])
 
   const loadData = async () => {
     setLoading(true)
     setError(null)
     try {
       const [usersData, statsData] = await Promise.all([
-        api.listUsers(page, 50),
+        api.listUsers(cursors[cursors.length - 1], perPage, search),
         api.getUserStats()
       ])
       setUsers(usersData.users)
-      setTotalPages(usersData.pages)
+      setNextCursor(usersData.next_cursor)
+      setTotal(usersData.total)
       setStats(statsData)
     } catch (e: any) {
       setError(e?.error || e?.message || 'Failed to load users')
@@ -172,12 +191,21 @@ const UserManager: React.FC = () => {
             </svg>
             User Management
           </h3>
-          <button
-            onClick={loadData}
-            className="px-4 py-2 glass-effect-dark rounded-lg hover:bg-white/10 transition-all duration-200"
-          >
-            🔄 Refresh
-          </button>
+          <div className="flex items-center gap-2">
+            <input
+              type="search"
+              value={searchInput}
+              onChange={(e) => setSearchInput(e.target.value)}
+              placeholder="Search name or email…"
+              className="px-4 py-2 bg-black/30 border border-white/10 rounded-lg text-sm focus:outline-none focus:border-indigo-500"
+            />
+            <button
+              onClick={loadData}
+              className="px-4 py-2 glass-effect-dark rounded-lg hover:bg-white/10 transition-all duration-200"
+            >
+              🔄 Refresh
+            </button>
+          </div>
         </div>
 
         {/* Users Table */}
@@ -265,21 +293,21 @@ const UserManager: React.FC = () => {
         </div>
 
         {/* Pagination */}
-        {totalPages > 1 && (
+        {(page > 1 || nextCursor) && (
           <div className="mt-6 flex items-center justify-center gap-2">
             <button
-              onClick={() => setPage(p => Math.max(1, p - 1))}
+              onClick={() => setCursors(c => c.slice(0, -1))}
               disabled={page === 1}
               className="px-4 py-2 glass-effect-dark rounded-lg hover:bg-white/10 disabled:opacity-50 disabled:cursor-not-allowed transition-all"
             >
               ← Previous
             </button>
             <span className="px-4 py-2 text-sm text-gray-400">
-              Page {page} of {totalPages}
+              Page {page} of {Math.max(1, Math.ceil(total / perPage))}
             </span>
             <button
-              onClick={() => setPage(p => Math.min(totalPages, p + 1))}
-              disabled={page === totalPages}
+              onClick={() => nextCursor && setCursors(c => [...c, nextCursor])}
+              disabled={!nextCursor}
               className="px-4 py-2 glass-effect-dark rounded-lg hover:bg-white/10 disabled:opacity-50 disabled:cursor-not-allowed transition-all"
             >
               Next →
@@ -65,12 +65,53 @@ function computeEventMix(history: any[] | null, limit: number = 30): EventMix |
   return { total, byCategory }
 }
 
+const ROLLOVER_KIND_LABELS: Record<string, string> = { finalize: 'Finalize', create_day: 'New day' }
+
+// Phase timings of a day's rollover, one bar per phase on a shared time axis
+const RolloverWaterfall: React.FC<{ traces: any[] }> = ({ traces }) => (
+  <div className="mt-3 space-y-3">
+    {traces.map(trace => (
+      <div key={trace.kind}>
+        <div className="flex justify-between text-xs text-gray-400 mb-1">
+          <span>
+            {ROLLOVER_KIND_LABELS[trace.kind] || trace.kind}
+            {trace.status !== 'ok' && <span className="ml-2 text-amber-400">({trace.status})</span>}
+          </span>
+          <span className="font-mono">{Math.round(trace.total_ms)} ms</span>
+        </div>
+        <div className="space-y-1">
+          {trace.spans.map((span: any, i: number) => {
+            const total = Math.max(trace.total_ms, 1)
+            return (
+              <div key={i} className="flex items-center gap-2 text-xs">
+                <span className="w-20 shrink-0 text-gray-400 truncate">{span.name}</span>
+                <div className="relative flex-1 h-3 bg-white/5 rounded">
+                  <div
+                    className="absolute h-3 bg-indigo-500/70 rounded"
+                    style={{
+                      left: `${(span.start_ms / total) * 100}%`,
+                      width: `${Math.max((span.duration_ms / total) * 100, 0.5)}%`
+                    }}
+                  />
+                </div>
+                <span className="w-16 shrink-0 text-right font-mono text-gray-300">{Math.round(span.duration_ms)} ms</span>
+              </div>
+            )
+          })}
+        </div>
+      </div>
+    ))}
+  </div>
+)
 
 const AdminPage: React.FC = () => {
   const [me, setMe] = useState<any>(null)
   const [metrics, setMetrics] = useState<any | null>(null)
+  const [timeline, setTimeline] = useState<any | null>(null)
+  const [timelineResolution, setTimelineResolution] = useState<'minute' | 'hour'>('hour')
   const [history, setHistory] = useState<any[] | null>(null)
   const [telemetry, setTelemetry] = useState<any[] | null>(null)
+  const [telemetryDaily, setTelemetryDaily] = useState<any | null>(null)
   const [msg, setMsg] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [activeTab, setActiveTab] = useState<'overview' | 'events' | 'users' | 'projects'>('overview')
@@ -91,6 +132,15 @@ const AdminPage: React.FC = () => {
     checkAuth()
   }, [])
 
+  // Turnout timeline reads the pre-aggregated buckets, so polling it is cheap
+  useEffect(() => {
+    if (!metrics || activeTab !== 'overview') return
+    const load = () => api.getVoteTimeline(timelineResolution).then(setTimeline).catch(() => {})
+    load()
+    const timer = setInterval(load, 30000)
+    return () => clearInterval(timer)
+  }, [metrics?.day_id, activeTab, timelineResolution])
+
   const checkAuth = async () => {
     try {
       const user = await api.getMe()
@@ -109,14 +159,16 @@ const AdminPage: React.FC = () => {
 
   const loadAll = async () => {
     try {
-      const [metrics, history, telemetry] = await Promise.all([
+      const [metrics, history, telemetry, telemetryDaily] = await Promise.all([
         api.getMetrics(),
         api.getAdminHistory(),
         api.getTelemetry(),
+        api.getTelemetryDaily(14),
       ])
       setMetrics(metrics)
       setHistory(history)
       setTelemetry(telemetry)
+      setTelemetryDaily(telemetryDaily)
       setMsg(null)
     } catch (e: any) {
       setMsg(e?.error || e?.message || String(e))
@@ -197,13 +249,31 @@ const AdminPage: React.FC = () => {
     }
   }
 
+  const pollBroadcast = (jobId: number) => {
+    const timer = setInterval(async () => {
+      try {
+        const job = await api.getBroadcastJob(jobId)
+        if (job.status === 'completed' || job.status === 'failed') {
+          clearInterval(timer)
+          setMsg(job.status === 'completed'
+            ? `✅ Announcement delivered to ${job.delivered} users (${job.failed} failed)`
+            : `❌ Broadcast job #${job.id} failed at ${job.progress}%: ${job.last_error}`)
+        } else {
+          setMsg(`📣 Broadcasting announcement… ${job.progress}% (${job.processed}/${job.total_recipients})`)
+        }
+      } catch {
+        clearInterval(timer)
+      }
+    }, 3000)
+  }
+
   const handleBroadcast = async (e: React.FormEvent) => {
     e.preventDefault()
     if (!confirm('Are you sure you want to broadcast this announcement to ALL users?')) return
     
     try {
       setLoading(true)
-      await api.createAnnouncement({
+      const res = await api.createAnnouncement({
         title: announceTitle,
         content: announceContent,
         version: announceVersion,
@@ -211,7 +281,11 @@ const AdminPage: React.FC = () => {
         show_popup: announcePopup,
         send_notification: announceNotify
       })
-      setMsg('✅ Announcement broadcast successfully!')
+      const job = res?.broadcast_job
+      setMsg(job
+        ? `✅ Announcement created — sending to ${job.total_recipients} users in the background (job #${job.id})`
+        : '✅ Announcement created!')
+      if (job) pollBroadcast(job.id)
       setAnnounceTitle('')
       setAnnounceContent('')
       setAnnounceVersion('')
@@ -761,6 +835,50 @@ const AdminPage: React.FC = () => {
                     ))}
                   </div>
                 </div>
+                {timeline && (
+                  <div className="mt-6 glass-effect-dark rounded-xl p-5">
+                    <div className="flex justify-between items-center mb-3">
+                      <h4 className="text-sm text-gray-400 uppercase tracking-wider">Vote Arrivals</h4>
+                      <div className="flex gap-2">
+                        {(['hour', 'minute'] as const).map(r => (
+                          <button
+                            key={r}
+                            onClick={() => setTimelineResolution(r)}
+                            className={`px-3 py-1 rounded-lg text-xs ${timelineResolution === r ? 'bg-indigo-500 text-white' : 'bg-black/30 text-gray-400 hover:text-white'}`}
+                          >
+                            Per {r}
+                          </button>
+                        ))}
+                      </div>
+                    </div>
+                    {timeline.buckets.length === 0 ? (
+                      <div className="text-sm text-gray-500">No votes yet today.</div>
+                    ) : (
+                      <>
+                        <div className="flex items-end gap-px h-32">
+                          {(() => {
+                            const max = Math.max(...timeline.buckets.map((b: any) => b.votes), 1)
+                            return timeline.buckets.map((b: any) => (
+                              <div
+                                key={b.start}
+                                className="flex-1 bg-indigo-400/70 hover:bg-indigo-300 rounded-t-sm min-w-[1px]"
+                                style={{ height: `${(b.votes / max) * 100}%` }}
+                                title={`${new Date(b.start).toLocaleTimeString()}: ${b.votes} votes, ${b.changes} changes (${b.cumulative} total)`}
+                              />
+                            ))
+                          })()}
+                        </div>
+                        <div className="flex justify-between text-xs text-gray-500 mt-2">
+                          <span>{new Date(timeline.buckets[0].start).toLocaleTimeString()}</span>
+                          {timeline.peak && (
+                            <span>Peak: {timeline.peak.votes} at {new Date(timeline.peak.start).toLocaleTimeString()}</span>
+                          )}
+                          <span>{new Date(timeline.buckets[timeline.buckets.length - 1].start).toLocaleTimeString()}</span>
+                        </div>
+                      </>
+                    )}
+                  </div>
+                )}
               </section>
             )}
 
@@ -801,12 +919,57 @@ const AdminPage: React.FC = () => {
                           </div>
                         </div>
                       </div>
+                      {h.rollover?.length > 0 && <RolloverWaterfall traces={h.rollover} />}
                     </div>
                   ))}
                 </div>
               </section>
             )}
 
+            {/* Daily stats, from the telemetry rollups */}
+            {telemetryDaily && (
+              <section className="glass-effect rounded-2xl p-6">
+                <h3 className="text-xl font-bold mb-2 flex items-center gap-2">
+                  <svg className="w-6 h-6 text-indigo-400" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                    <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 19v-6a2 2 0 00-2-2H5a2 2 0 00-2 2v6a2 2 0 002 2h2a2 2 0 002-2zm0 0V9a2 2 0 012-2h2a2 2 0 012 2v10m-6 0a2 2 0 002 2h2a2 2 0 002-2m0 0V5a2 2 0 012-2h2a2 2 0 012 2v14a2 2 0 01-2 2h-2a2 2 0 01-2-2z" />
+                  </svg>
+                  Daily Stats
+                </h3>
+                <p className="text-xs text-gray-400 mb-4">
+                  Last {telemetryDaily.days} days
+                  {telemetryDaily.updated_at && <> · updated {new Date(telemetryDaily.updated_at).toLocaleString()}</>}
+                </p>
+                {telemetryDaily.daily.length === 0 ? (
+                  <div className="text-sm text-gray-400">No rollups yet</div>
+                ) : (
+                  <div className="overflow-x-auto">
+                    <table className="w-full text-sm">
+                      <thead>
+                        <tr className="text-left text-gray-400">
+                          <th className="py-2 pr-4 font-medium">Date</th>
+                          <th className="py-2 pr-4 font-medium text-right">Votes</th>
+                          <th className="py-2 pr-4 font-medium text-right">Changes</th>
+                          <th className="py-2 pr-4 font-medium text-right">Notified</th>
+                          <th className="py-2 font-medium text-right">Failed</th>
+                        </tr>
+                      </thead>
+                      <tbody>
+                        {telemetryDaily.daily.map((d: any) => (
+                          <tr key={d.date} className="border-t border-white/5">
+                            <td className="py-2 pr-4 text-white">{d.date}</td>
+                            <td className="py-2 pr-4 text-right font-bold text-indigo-400">{d.votes}</td>
+                            <td className="py-2 pr-4 text-right text-gray-300">{d.vote_changes}</td>
+                            <td className="py-2 pr-4 text-right text-green-400">{d.notifications_sent}</td>
+                            <td className={`py-2 text-right ${d.notifications_failed ? 'text-red-400' : 'text-gray-500'}`}>{d.notifications_failed}</td>
+                          </tr>
+                        ))}
+                      </tbody>
+                    </table>
+                  </div>
+                )}
+              </section>
+            )}
+
             {/* Telemetry */}
             {telemetry && (
               <section className="glass-effect rounded-2xl p-6">
@@ -69,6 +69,12 @@ export async function getMetrics() {
   return fetchJson('/api/admin/metrics', { credentials: 'include' })
 }
 
+export async function getVoteTimeline(resolution: 'minute' | 'hour' = 'hour', dayId?: number) {
+  const params = new URLSearchParams({ resolution })
+  if (dayId) params.set('day_id', String(dayId))
+  return fetchJson(`/api/admin/metrics/timeline?${params.toString()}`, { credentials: 'include' })
+}
+
 export async function getAdminHistory() {
   return fetchJson('/api/admin/history', { credentials: 'include' })
 }
@@ -77,6 +83,10 @@ export async function getTelemetry() {
   return fetchJson('/api/admin/telemetry', { credentials: 'include' })
 }
 
+export async function getTelemetryDaily(days = 30) {
+  return fetchJson(`/api/admin/telemetry/daily?days=${days}`, { credentials: 'include' })
+}
+
 export async function adminTick() {
   return fetchJson('/api/admin/tick', {
     method: 'POST',
@@ -170,9 +180,18 @@ export async function createAnnouncement(data: {
   })
 }
 
+export async function getBroadcastJob(jobId: number) {
+  return fetchJson(`/api/admin/broadcasts/${jobId}`, {
+    credentials: 'include'
+  })
+}
+
 // User management endpoints
-export async function listUsers(page = 1, perPage = 50) {
-  return fetchJson(`/api/admin/users?page=${page}&per_page=${perPage}`, {
+export async function listUsers(cursor: number | null = null, perPage = 50, q = '') {
+  const params = new URLSearchParams({ per_page: String(perPage) })
+  if (cursor) params.set('cursor', String(cursor))
+  if (q) params.set('q', q)
+  return fetchJson(`/api/admin/users?${params.toString()}`, {
     credentials: 'include'
   })
 }
@@ -205,9 +224,9 @@ export async function getUserStats() {
 
 export default {
   getMe, getState, getEvent, vote, getTally, getMyVote, getHistory,
-  getMetrics, getAdminHistory, getTelemetry, adminTick, adminTestAi, testNotification, cancelTestReminders,
+  getMetrics, getVoteTimeline, getAdminHistory, getTelemetry, getTelemetryDaily, adminTick, adminTestAi, testNotification, cancelTestReminders,
   listEvents, createEvent, updateEvent, deleteEvent, toggleEvent,
   listUsers, getUser, toggleUserAdmin, deleteUser, getUserStats,
   getCommunityMessages, getProjects, voteProject, getHistoryPage,
-  getAnnouncement, createAnnouncement, resetSimulation
+  getAnnouncement, createAnnouncement, getBroadcastJob, resetSimulation
 }